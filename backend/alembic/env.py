@@ -10,7 +10,7 @@ from alembic import context
 
 # Import models to ensure they are registered
 from app.database import Base
-from app.models import User, Task, Payment, LLMAnswer
+from app.models import User, Task, TaskMinHash, TaskMinHashBucket, Payment, PaymentWebhookEvent, LLMAnswer, UserTopicStats, InterviewReport, IdempotencyKey
 from app.config import get_settings
 
 # this is the Alembic Config object, which provides
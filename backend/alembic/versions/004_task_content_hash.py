@@ -0,0 +1,63 @@
+"""Add tasks.content_hash (normalized question hash) with backfill and unique index.
+
+Revision ID: 004_task_content_hash
+Revises: 003_password_length
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.task import task_content_hash
+
+
+revision: str = '004_task_content_hash'
+down_revision: Union[str, None] = '003_password_length'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 5000
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    insp = sa.inspect(conn)
+    if 'tasks' not in insp.get_table_names():
+        return  # created later by create_all with the column and index
+    cols = [c['name'] for c in insp.get_columns('tasks')]
+    if 'content_hash' not in cols:
+        op.add_column('tasks', sa.Column('content_hash', sa.String(64), nullable=True))
+
+    # Backfill in task_id order, keyset-paginated (same hash function as the app)
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT task_id, task_question FROM tasks "
+                "WHERE task_id > :last AND content_hash IS NULL ORDER BY task_id LIMIT :n"
+            ),
+            {"last": last_id, "n": BACKFILL_BATCH},
+        ).fetchall()
+        if not rows:
+            break
+        conn.execute(
+            sa.text("UPDATE tasks SET content_hash = :h WHERE task_id = :id"),
+            [{"h": task_content_hash(q), "id": tid} for tid, q in rows],
+        )
+        last_id = rows[-1][0]
+
+    # Existing case/whitespace duplicates: the oldest task keeps the hash, the rest get NULL
+    conn.execute(sa.text(
+        "UPDATE tasks SET content_hash = NULL WHERE task_id IN ("
+        " SELECT task_id FROM ("
+        "  SELECT task_id, row_number() OVER (PARTITION BY content_hash ORDER BY task_id) AS rn"
+        "  FROM tasks WHERE content_hash IS NOT NULL"
+        " ) d WHERE rn > 1)"
+    ))
+    op.create_index('ix_tasks_content_hash', 'tasks', ['content_hash'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_content_hash', table_name='tasks')
+    op.drop_column('tasks', 'content_hash')
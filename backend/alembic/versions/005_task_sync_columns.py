@@ -0,0 +1,55 @@
+"""Add tasks.payload_hash and tasks.retired_at for incremental catalog sync.
+
+Revision ID: 005_task_sync_columns
+Revises: 004_task_content_hash
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.task import TASK_PAYLOAD_FIELDS, task_payload_hash
+
+
+revision: str = '005_task_sync_columns'
+down_revision: Union[str, None] = '004_task_content_hash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 5000
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    insp = sa.inspect(conn)
+    if 'tasks' not in insp.get_table_names():
+        return  # created later by create_all with the columns
+    cols = [c['name'] for c in insp.get_columns('tasks')]
+    if 'payload_hash' not in cols:
+        op.add_column('tasks', sa.Column('payload_hash', sa.String(64), nullable=True))
+    if 'retired_at' not in cols:
+        op.add_column('tasks', sa.Column('retired_at', sa.DateTime(), nullable=True))
+
+    fields = ", ".join(TASK_PAYLOAD_FIELDS)
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                f"SELECT task_id, {fields} FROM tasks "
+                "WHERE task_id > :last AND payload_hash IS NULL ORDER BY task_id LIMIT :n"
+            ),
+            {"last": last_id, "n": BACKFILL_BATCH},
+        ).mappings().fetchall()
+        if not rows:
+            break
+        conn.execute(
+            sa.text("UPDATE tasks SET payload_hash = :h WHERE task_id = :id"),
+            [{"h": task_payload_hash(r), "id": r["task_id"]} for r in rows],
+        )
+        last_id = rows[-1]["task_id"]
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'retired_at')
+    op.drop_column('tasks', 'payload_hash')
@@ -0,0 +1,39 @@
+"""Add task_minhash (MinHash signatures) and task_minhash_buckets (LSH postings).
+
+Revision ID: 006_task_minhash
+Revises: 005_task_sync_columns
+Create Date: 2026-10-19
+
+Signatures of existing tasks are computed by `python -m task_migrator.near_duplicates`.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '006_task_minhash'
+down_revision: Union[str, None] = '005_task_sync_columns'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    tables = sa.inspect(conn).get_table_names()
+    if 'tasks' not in tables or 'task_minhash' in tables:
+        return  # created by create_all together with tasks
+    op.create_table(
+        'task_minhash',
+        sa.Column('task_id', sa.Integer(), sa.ForeignKey('tasks.task_id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('signature', sa.LargeBinary(), nullable=False),
+    )
+    op.create_table(
+        'task_minhash_buckets',
+        sa.Column('bucket', sa.BigInteger(), primary_key=True),
+        sa.Column('task_id', sa.Integer(), primary_key=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('task_minhash_buckets')
+    op.drop_table('task_minhash')
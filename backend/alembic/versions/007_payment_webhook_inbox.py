@@ -0,0 +1,46 @@
+"""Add payment_webhook_inbox (YooKassa notifications, applied by a background consumer).
+
+Revision ID: 007_payment_webhook_inbox
+Revises: 006_task_minhash
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '007_payment_webhook_inbox'
+down_revision: Union[str, None] = '006_task_minhash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    tables = sa.inspect(conn).get_table_names()
+    if 'payments' not in tables or 'payment_webhook_inbox' in tables:
+        return  # created by create_all together with payments
+    op.create_table(
+        'payment_webhook_inbox',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('event', sa.String(), nullable=False),
+        sa.Column('payment_id', sa.String(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('received_dttm', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('next_attempt_dttm', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('processed_dttm', sa.DateTime(), nullable=True),
+        sa.Column('result', sa.String(), nullable=True),
+        sa.UniqueConstraint('event', 'payment_id', name='uq_payment_webhook_inbox_event_payment'),
+    )
+    op.create_index(
+        'ix_payment_webhook_inbox_pending', 'payment_webhook_inbox', ['next_attempt_dttm'],
+        postgresql_where=sa.text('processed_dttm IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payment_webhook_inbox_pending', table_name='payment_webhook_inbox')
+    op.drop_table('payment_webhook_inbox')
@@ -0,0 +1,33 @@
+"""Add partial index on pending payments (keyset pagination for reconciliation).
+
+Revision ID: 008_payments_pending_index
+Revises: 007_payment_webhook_inbox
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '008_payments_pending_index'
+down_revision: Union[str, None] = '007_payment_webhook_inbox'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'payments' not in inspector.get_table_names():
+        return  # created by create_all together with the index
+    if 'ix_payments_pending' in {ix['name'] for ix in inspector.get_indexes('payments')}:
+        return
+    op.create_index(
+        'ix_payments_pending', 'payments', ['id'],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payments_pending', table_name='payments')
@@ -0,0 +1,47 @@
+"""Add user_topic_stats (per-user, per-subtype score rollup) and backfill it from llm_answers.
+
+Revision ID: 009_user_topic_stats
+Revises: 008_payments_pending_index
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '009_user_topic_stats'
+down_revision: Union[str, None] = '008_payments_pending_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    tables = sa.inspect(conn).get_table_names()
+    if 'users' not in tables or 'user_topic_stats' in tables:
+        return  # created by create_all together with users
+    op.create_table(
+        'user_topic_stats',
+        sa.Column('user_id', sa.String(), sa.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('subtype', sa.String(), primary_key=True),
+        sa.Column('answers_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('score_sum', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('last_seen_dttm', sa.DateTime(), nullable=True),
+    )
+    if 'llm_answers' in tables and 'tasks' in tables:
+        # One pass over the history; from now on the analytics writer keeps it up to date
+        op.execute(sa.text(
+            """
+            INSERT INTO user_topic_stats (user_id, subtype, answers_count, score_sum, last_seen_dttm)
+            SELECT la.user_id, t.subtype, count(*), sum((la.feedback_json ->> 'score')::int), max(la.created_dttm)
+            FROM llm_answers la
+            JOIN tasks t ON t.task_id = la.task_id
+            WHERE (la.feedback_json ->> 'score') ~ '^[0-9]+$'
+            GROUP BY la.user_id, t.subtype
+            """
+        ))
+
+
+def downgrade() -> None:
+    op.drop_table('user_topic_stats')
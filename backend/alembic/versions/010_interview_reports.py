@@ -0,0 +1,56 @@
+"""Add interview_reports (interview history) and llm_answers.session_id.
+
+Revision ID: 010_interview_reports
+Revises: 009_user_topic_stats
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '010_interview_reports'
+down_revision: Union[str, None] = '009_user_topic_stats'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+    if 'users' not in tables:
+        return  # created by create_all
+    if 'interview_reports' not in tables:
+        op.create_table(
+            'interview_reports',
+            sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('session_id', sa.String(), nullable=False, unique=True),
+            sa.Column('user_id', sa.String(), sa.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False),
+            sa.Column('created_dttm', sa.DateTime(), nullable=False),
+            sa.Column('started_dttm', sa.DateTime(), nullable=True),
+            sa.Column('specialization', sa.String(), nullable=True),
+            sa.Column('experience_level', sa.String(), nullable=True),
+            sa.Column('company_tier', sa.String(), nullable=True),
+            sa.Column('topic', sa.String(), nullable=True),
+            sa.Column('tasks_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('overall_score', sa.Integer(), nullable=False, server_default='0'),
+        )
+        op.create_index(
+            'ix_interview_reports_user_history', 'interview_reports', ['user_id', 'created_dttm', 'id'],
+            postgresql_include=[
+                'session_id', 'started_dttm', 'specialization', 'experience_level', 'company_tier', 'topic',
+                'tasks_count', 'overall_score',
+            ],
+        )
+    if 'llm_answers' in tables and 'session_id' not in {c['name'] for c in inspector.get_columns('llm_answers')}:
+        # Older answers keep NULL: sessions were never persisted before this revision
+        op.add_column('llm_answers', sa.Column('session_id', sa.String(), nullable=True))
+        op.create_index('ix_llm_answers_session_id', 'llm_answers', ['session_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_llm_answers_session_id', table_name='llm_answers')
+    op.drop_column('llm_answers', 'session_id')
+    op.drop_table('interview_reports')
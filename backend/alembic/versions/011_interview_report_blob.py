@@ -0,0 +1,30 @@
+"""Add interview_reports.report_blob (compressed final report).
+
+Revision ID: 011_interview_report_blob
+Revises: 010_interview_reports
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '011_interview_report_blob'
+down_revision: Union[str, None] = '010_interview_reports'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'interview_reports' not in inspector.get_table_names():
+        return  # created by create_all with the column
+    if 'report_blob' in {c['name'] for c in inspector.get_columns('interview_reports')}:
+        return
+    op.add_column('interview_reports', sa.Column('report_blob', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('interview_reports', 'report_blob')
@@ -0,0 +1,38 @@
+"""Add idempotency_keys (shared Idempotency-Key store).
+
+Revision ID: 012_idempotency_keys
+Revises: 011_interview_report_blob
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '012_idempotency_keys'
+down_revision: Union[str, None] = '011_interview_report_blob'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    tables = sa.inspect(conn).get_table_names()
+    if 'users' not in tables or 'idempotency_keys' in tables:
+        return  # created by create_all
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('key', sa.String(64), primary_key=True),
+        sa.Column('fingerprint', sa.String(64), nullable=False),
+        sa.Column('created_dttm', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('headers', sa.JSON(), nullable=True),
+        sa.Column('body', sa.LargeBinary(), nullable=True),
+    )
+    op.create_index('ix_idempotency_keys_expires_at', 'idempotency_keys', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('idempotency_keys')
@@ -0,0 +1,36 @@
+"""Add interview_sessions (shared interview session store).
+
+Revision ID: 013_interview_sessions
+Revises: 012_idempotency_keys
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '013_interview_sessions'
+down_revision: Union[str, None] = '012_idempotency_keys'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    tables = sa.inspect(conn).get_table_names()
+    if 'users' not in tables or 'interview_sessions' in tables:
+        return  # created by create_all
+    op.create_table(
+        'interview_sessions',
+        sa.Column('session_id', sa.String(36), primary_key=True),
+        sa.Column('user_id', sa.String(), sa.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False),
+        sa.Column('status', sa.String(16), nullable=False),
+        sa.Column('state', sa.JSON(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_dttm', sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('interview_sessions')
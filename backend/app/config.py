@@ -19,11 +19,100 @@ class Settings(BaseSettings):
     openai_api_key: str = ""
     # Опционально: OpenAI-compatible API (прокси), если 403 unsupported_country с api.openai.com
     openai_base_url: str = ""
+    # Как часто проверять app/llm_config.yaml на изменения (секунды); 0 = без hot reload
+    llm_config_reload_interval_seconds: float = 2.0
+    # Телеметрия каждого вызова LLM (JSONL, см. app/llm_telemetry.py); пусто = выключено
+    llm_telemetry_path: str = "llm_calls.jsonl"
     
     # YooKassa Payment
     yookassa_shop_id: str = ""
     yookassa_secret_key: str = ""
+    # Async YooKassa client (app/services/yookassa_client.py): API base URL (a local stub:
+    # http://127.0.0.1:8765/v3), read/connect timeouts, retries with the same idempotence key, pool size
+    yookassa_api_url: str = "https://api.yookassa.ru/v3"
+    yookassa_timeout_seconds: float = 10.0
+    yookassa_connect_timeout_seconds: float = 3.0
+    yookassa_max_retries: int = 3
+    yookassa_max_connections: int = 20
+    # Webhook inbox consumer (app/services/payment_inbox.py): events per transaction,
+    # polling interval (new events also wake it), attempts before giving up on an event
+    payment_inbox_batch_size: int = 50
+    payment_inbox_poll_interval_seconds: float = 5.0
+    payment_inbox_max_attempts: int = 10
+    # Reconciliation of pending payments (app/services/payment_reconciler.py): how often
+    # (0 = only from the CLI), which payments (older than min age, newer than max age),
+    # page size, concurrent YooKassa requests and their rate limit
+    payment_reconcile_interval_seconds: float = 600.0
+    payment_reconcile_min_age_seconds: float = 600.0
+    payment_reconcile_max_age_hours: float = 72.0
+    payment_reconcile_page_size: int = 200
+    payment_reconcile_concurrency: int = 10
+    payment_reconcile_rate_per_second: float = 20.0
     
+    # Analytics write-behind for llm_answers (see app/services/analytics_writer.py)
+    analytics_batch_size: int = 50
+    analytics_flush_interval_seconds: float = 2.0
+    analytics_max_buffer: int = 5000
+    analytics_spill_path: str = "analytics_spill.jsonl"
+
+    # Idempotency-Key on answer / finish / payment create (app/idempotency.py): store memory |
+    # database (shared by workers, required with WEB_WORKERS > 1), how long responses are kept, bounds of the memory store,
+    # how long a duplicate waits for the first request before a 409
+    idempotency_store: str = "memory"
+    idempotency_ttl_seconds: float = 86400.0
+    idempotency_max_entries: int = 10000
+    idempotency_max_bytes: int = 64 * 1024 * 1024
+    idempotency_wait_seconds: float = 120.0
+
+    # Interview sessions in progress (app/services/session_store.py): memory | database
+    # (required with WEB_WORKERS > 1: a session's requests may land on any worker);
+    # sessions not touched for session_ttl_hours are purged from the database store;
+    # a /finish claims its session for finish_claim_seconds (then another worker may take over)
+    session_store: str = "memory"
+    session_ttl_hours: float = 24.0
+    finish_claim_seconds: float = 300.0
+
+    # Web server (start.sh, gunicorn.conf.py): worker processes (1 = plain uvicorn), bind
+    # address, import the app once in the master, recycle a worker after max_requests
+    # (+ random jitter so workers don't restart together), graceful stop / hung worker timeouts
+    web_workers: int = 1
+    web_bind: str = "0.0.0.0:8000"
+    web_preload: bool = True
+    web_max_requests: int = 10000
+    web_max_requests_jitter: int = 1000
+    web_graceful_timeout: int = 30
+    web_timeout: int = 120
+    # Warmup of each worker before it serves (app/warmup.py): DB connections opened up front
+    warmup_db_connections: int = 2
+
+    # Readiness (/health/ready, app/health.py): how often probes are refreshed in the background,
+    # per-probe timeout, whether the LLM endpoint is called (false: only the API key is checked)
+    health_probe_interval_seconds: float = 10.0
+    health_probe_timeout_seconds: float = 3.0
+    health_llm_probe: bool = True
+
+    # Catalog endpoints (/interview/specializations etc.): browser cache lifetime, seconds
+    catalog_cache_max_age: int = 300
+    # Interview history (/interview/history): default and maximum page size
+    history_page_size: int = 20
+    history_max_page_size: int = 100
+
+    # Startup: skip create_all when the Alembic head is already applied;
+    # startup_profile prints per-phase import/init timings (app/startup_profiler.py)
+    fast_startup: bool = True
+    startup_profile: bool = False
+
+    # SQL instrumentation (app/db_instrumentation.py): slow-query log threshold and
+    # how many identical statements per request count as a possible N+1
+    sql_slow_query_ms: float = 200.0
+    sql_repeat_threshold: int = 3
+
+    # Tracing (app/tracing.py): share of requests traced (0 = off), exporter jsonl | otlp | none
+    tracing_sample_rate: float = 0.0
+    tracing_exporter: str = "jsonl"
+    tracing_jsonl_path: str = "traces.jsonl"
+    tracing_otlp_endpoint: str = "http://127.0.0.1:4318/v1/traces"
+
     # App Settings
     secret_key: str = "change-me-in-production"
     debug: bool = True
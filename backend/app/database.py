@@ -1,8 +1,14 @@
 """Database connection and session management."""
+import re
+from pathlib import Path
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import get_settings
+from app.tracing import span
 
 settings = get_settings()
 
@@ -29,7 +35,8 @@ async def get_db() -> AsyncSession:
     async with async_session_maker() as session:
         try:
             yield session
-            await session.commit()
+            with span("db.commit"):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
@@ -37,7 +44,47 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
-async def init_db():
-    """Initialize database tables."""
+_MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "alembic" / "versions"
+_REVISION_RE = re.compile(r"^(down_revision|revision)\b[^=]*=\s*['\"]([^'\"]+)['\"]", re.MULTILINE)
+
+
+def get_alembic_head() -> str | None:
+    """
+    Head revision of the migration scripts, parsed from alembic/versions without importing
+    Alembic (importing it costs more than the check itself). None if there is no single head.
+    """
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for path in _MIGRATIONS_DIR.glob("*.py"):
+        for kind, rev in _REVISION_RE.findall(path.read_text(encoding="utf-8")):
+            (revisions if kind == "revision" else parents).add(rev)
+    heads = revisions - parents
+    return heads.pop() if len(heads) == 1 else None
+
+
+def _schema_is_current(conn: Connection, head: str | None) -> bool:
+    """Alembic head applied and every model table present (two cheap catalog queries)."""
+    if head is None:
+        return False
+    try:
+        with conn.begin_nested():
+            applied = conn.execute(text("SELECT version_num FROM alembic_version")).scalars().all()
+    except Exception:
+        return False
+    if applied != [head]:
+        return False
+    existing = set(inspect(conn).get_table_names())
+    return set(Base.metadata.tables) <= existing
+
+
+async def init_db(fast: bool = False):
+    """
+    Initialize database tables.
+    fast=True: skip create_all when the Alembic head is applied and all tables exist
+    (start.sh has already run `alembic upgrade head`).
+    """
+    head = get_alembic_head() if fast else None
     async with engine.begin() as conn:
+        if fast and await conn.run_sync(_schema_is_current, head):
+            return
         await conn.run_sync(Base.metadata.create_all)
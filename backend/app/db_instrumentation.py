@@ -0,0 +1,124 @@
+"""Per-request SQL instrumentation: query count, DB time, slow-query log, N+1 detection.
+
+SQLAlchemy cursor events feed a per-request QueryStats held in a context variable
+(set by SQLStatsMiddleware). In debug mode the totals are returned as response
+headers (X-DB-Query-Count, X-DB-Time-Ms). Statements slower than SQL_SLOW_QUERY_MS
+are logged with the shape of their bound parameters (types, never values), and
+identical statements repeated within one request are flagged as a possible N+1.
+"""
+import logging
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import get_settings
+from app.tracing import add_span
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class QueryStats:
+    """SQL statements executed while serving one request."""
+    count: int = 0
+    seconds: float = 0.0
+    statements: dict[str, int] = field(default_factory=dict)
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        return {sql: n for sql, n in self.statements.items() if n >= threshold}
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def param_shape(parameters: Any, executemany: bool = False) -> str:
+    """Types of bound parameters, e.g. (str, int) or {user_id: str}; executemany → N x shape."""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return f"{len(parameters)} x {param_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started_at"].pop()
+    elapsed = perf_counter() - started
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.statements[statement] = stats.statements.get(statement, 0) + 1
+    add_span("db.query", elapsed, statement=statement.split(None, 1)[0].upper() if statement else "")
+    if elapsed * 1000 >= settings.sql_slow_query_ms:
+        logger.warning(
+            "Slow query %.1f ms: %s | params: %s",
+            elapsed * 1000,
+            " ".join(statement.split()),
+            param_shape(parameters, executemany),
+        )
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute: drop its start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started_at"):
+        conn.info["query_started_at"].pop()
+
+
+def install_sql_instrumentation(engine: AsyncEngine) -> None:
+    """Attach cursor event hooks to an engine (idempotent)."""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class SQLStatsMiddleware:
+    """Pure ASGI middleware: collects QueryStats per request, debug headers, N+1 warnings."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.debug:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.seconds * 1000:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            for statement, n in stats.repeated(settings.sql_repeat_threshold).items():
+                logger.warning(
+                    "Possible N+1: statement executed %d times in %s %s: %s",
+                    n,
+                    scope["method"],
+                    scope["path"],
+                    " ".join(statement.split()),
+                )
@@ -0,0 +1,181 @@
+"""Liveness and readiness (/health/live, /health/ready).
+
+Readiness is answered from probe results kept in memory and refreshed in the background every
+HEALTH_PROBE_INTERVAL_SECONDS, so a load balancer polling it costs a dict lookup, not a query:
+    database  — SELECT 1 over a dedicated connection
+    llm       — GET {base_url}/models with the API key (HEALTH_LLM_PROBE=false: key check only)
+    catalog   — catalog bodies built, topics listed
+    config    — llm_config.yaml loaded, model and API key set
+The process is ready once its warmup (app/warmup.py) has finished and every probe passed at
+the last refresh; results older than three intervals count as failed (the refresher is stuck).
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.config import get_settings
+from app.llm_config_loader import get_llm_config, get_openai_base_url, resolve_openai_api_key
+from app.services.catalog import CATALOG_BUNDLE, get_catalog_entry, get_topic_ids
+from app.warmup import warmup_state
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+
+@dataclass
+class ProbeResult:
+    ok: bool
+    detail: str
+    latency_ms: float
+    checked_at: float  # time.monotonic()
+
+
+class HealthMonitor:
+    """Background refresher of the readiness probes of this process."""
+
+    def __init__(self, database_url: str, interval: float = 10.0, timeout: float = 3.0, llm_probe: bool = True):
+        self.database_url = database_url
+        self.interval = interval
+        self.timeout = timeout
+        self.llm_probe = llm_probe
+        self.results: dict[str, ProbeResult] = {}
+        self._engine: Optional[AsyncEngine] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Open the probe connections and start refreshing (the first round runs at once)."""
+        if self._task is not None:
+            return
+        self._engine = create_async_engine(self.database_url, pool_size=1, max_overflow=0)
+        self._client = httpx.AsyncClient(timeout=self.timeout)
+        self._task = asyncio.create_task(self._run(), name="health-monitor")
+
+    async def stop(self) -> None:
+        """Stop refreshing; the process reports not ready from here on."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.results = {}
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Health probes failed to run")
+            await asyncio.sleep(self.interval)
+
+    async def refresh(self) -> dict[str, ProbeResult]:
+        """Run all probes concurrently and keep their results."""
+        probes = {
+            "database": self._probe_database,
+            "llm": self._probe_llm,
+            "catalog": self._probe_catalog,
+            "config": self._probe_config,
+        }
+        results = dict(zip(probes, await asyncio.gather(*(self._timed(probe) for probe in probes.values()))))
+        for name, result in results.items():
+            # Only changes are logged: a missing key would otherwise warn every interval
+            previous = self.results.get(name)
+            if not result.ok and (previous is None or previous.ok or previous.detail != result.detail):
+                logger.warning("Health probe %s failed: %s", name, result.detail)
+            elif result.ok and previous is not None and not previous.ok:
+                logger.info("Health probe %s recovered", name)
+        self.results = results
+        return self.results
+
+    async def _timed(self, probe) -> ProbeResult:
+        t0 = time.monotonic()
+        try:
+            detail = await asyncio.wait_for(probe(), self.timeout)
+            ok = True
+        except asyncio.TimeoutError:
+            ok, detail = False, f"timed out after {self.timeout:g} s"
+        except Exception as e:
+            ok, detail = False, str(e) or type(e).__name__
+        return ProbeResult(ok, detail, (time.monotonic() - t0) * 1000, time.monotonic())
+
+    async def _probe_database(self) -> str:
+        assert self._engine is not None
+        async with self._engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return "ok"
+
+    async def _probe_llm(self) -> str:
+        key = resolve_openai_api_key()
+        if not key:
+            raise RuntimeError("no OpenAI API key")
+        if not self.llm_probe:
+            return "key set, endpoint not probed"
+        assert self._client is not None
+        base_url = get_openai_base_url() or DEFAULT_OPENAI_BASE_URL
+        response = await self._client.get(f"{base_url}/models", headers={"Authorization": f"Bearer {key}"})
+        if response.status_code in (401, 403) or response.status_code >= 500:
+            raise RuntimeError(f"{base_url} answered HTTP {response.status_code}")
+        return f"HTTP {response.status_code}"
+
+    async def _probe_catalog(self) -> str:
+        get_catalog_entry(CATALOG_BUNDLE)
+        topics = get_topic_ids()
+        if not topics:
+            raise RuntimeError("no topics in interview_catalog")
+        return f"{len(topics)} topics"
+
+    async def _probe_config(self) -> str:
+        config = get_llm_config()
+        if not config.model:
+            raise RuntimeError("no model in llm_config.yaml")
+        if not resolve_openai_api_key():
+            raise RuntimeError("no OpenAI API key")
+        return f"model {config.model}"
+
+    def readiness(self) -> tuple[bool, dict[str, Any]]:
+        """(ready, per-check state) from the last refresh; no I/O."""
+        now = time.monotonic()
+        checks: dict[str, Any] = {
+            "warmup": {
+                "ok": warmup_state.done,
+                "detail": "; ".join(f"{k}: {v}" for k, v in warmup_state.errors.items()) or (
+                    "done" if warmup_state.done else "in progress"),
+            },
+        }
+        for name, result in self.results.items():
+            stale = now - result.checked_at > 3 * self.interval
+            checks[name] = {
+                "ok": result.ok and not stale,
+                "detail": f"stale: {result.detail}" if stale else result.detail,
+                "latency_ms": round(result.latency_ms, 1),
+            }
+        ready = bool(self.results) and all(check["ok"] for check in checks.values())
+        return ready, checks
+
+
+@lru_cache()
+def get_health_monitor() -> HealthMonitor:
+    """Get the process-wide health monitor."""
+    settings = get_settings()
+    return HealthMonitor(
+        database_url=settings.database_url,
+        interval=settings.health_probe_interval_seconds,
+        timeout=settings.health_probe_timeout_seconds,
+        llm_probe=settings.health_llm_probe,
+    )
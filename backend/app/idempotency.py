@@ -0,0 +1,406 @@
+"""Idempotency-Key support for mutating routes (pure ASGI middleware).
+
+A client that retries POST /interview/session/{id}/answer, /finish or /payment/create with
+the same Idempotency-Key header gets the first response back byte for byte (plus
+Idempotent-Replayed: true) without the route running again: no second consume_one_question,
+no second YooKassa payment, no second LLM call. A duplicate that arrives while the first
+request is still running waits for it (up to IDEMPOTENCY_WAIT_SECONDS, then 409).
+
+Keys are scoped by method, path and the Authorization header, so one user can't replay
+another user's response; reusing a key with a different body is a 422. 5xx responses and
+failed requests release the key, so the retry runs for real.
+
+Stores (IDEMPOTENCY_STORE):
+    memory    — per process, bounded by entries and bytes, TTL (a single worker)
+    database  — idempotency_keys table, shared by all workers and instances
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional, Union
+
+import orjson
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.config import get_settings
+from app.metrics import observe_idempotent_request
+from app.models.idempotency import IdempotencyKey
+from app.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# (method, path) of routes that honour the header
+IDEMPOTENT_ROUTES: tuple[tuple[str, re.Pattern], ...] = (
+    ("POST", re.compile(r"/interview/session/[^/]+/answer")),
+    ("POST", re.compile(r"/interview/session/[^/]+/finish")),
+    ("POST", re.compile(r"/payment/create")),
+)
+HEADER = b"idempotency-key"
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+MAX_KEY_LENGTH = 255
+
+BEGIN_STARTED = "started"  # the caller runs the request and must complete() or release()
+BEGIN_REPLAY = "replay"
+BEGIN_IN_PROGRESS = "in_progress"
+BEGIN_MISMATCH = "mismatch"
+
+
+@dataclass
+class StoredResponse:
+    """Response as sent by the app: status, raw header pairs, full body."""
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers)
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    expires_at: float
+    response: Optional[StoredResponse] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class MemoryIdempotencyStore:
+    """Per-process store: insertion-ordered, expired by TTL, evicted oldest-first over the bounds."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int, max_bytes: int, wait_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.wait_seconds = wait_seconds
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def begin(self, key: str, fingerprint: str) -> tuple[str, Optional[StoredResponse]]:
+        while True:
+            self._purge()
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = _Entry(fingerprint, time.monotonic() + self.ttl_seconds)
+                return BEGIN_STARTED, None
+            if entry.fingerprint != fingerprint:
+                return BEGIN_MISMATCH, None
+            if entry.response is not None:
+                return BEGIN_REPLAY, entry.response
+            try:
+                await asyncio.wait_for(entry.done.wait(), timeout=self.wait_seconds)
+            except asyncio.TimeoutError:
+                return BEGIN_IN_PROGRESS, None
+            # Completed → replay on the next pass; released → whoever comes first runs it again
+
+    async def complete(self, key: str, response: StoredResponse) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.response = response
+        self._bytes += response.size
+        entry.done.set()
+        self._purge()
+
+    def usage(self) -> tuple[int, int]:
+        """(entries, bytes of stored responses) currently held."""
+        return len(self._entries), self._bytes
+
+    async def release(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.done.set()
+
+    def _purge(self) -> None:
+        now = time.monotonic()
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+            self._drop(key)
+        if len(self._entries) <= self.max_entries and self._bytes <= self.max_bytes:
+            return
+        # Over the bounds: evict the oldest completed responses (in-flight ones stay)
+        for key in [k for k, e in self._entries.items() if e.response is not None]:
+            if len(self._entries) <= self.max_entries and self._bytes <= self.max_bytes:
+                break
+            self._drop(key)
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        if entry.response is not None:
+            self._bytes -= entry.response.size
+        entry.done.set()
+
+
+class DatabaseIdempotencyStore:
+    """Shared store in idempotency_keys; duplicates in flight poll the row until it completes."""
+
+    def __init__(
+        self,
+        database_url: str,
+        ttl_seconds: float,
+        wait_seconds: float,
+        purge_interval: float = 600.0,
+    ):
+        self.database_url = database_url
+        self.ttl_seconds = ttl_seconds
+        self.wait_seconds = wait_seconds
+        self.purge_interval = purge_interval
+        self._engine: Optional[AsyncEngine] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._engine is not None:
+            return
+        self._engine = create_async_engine(
+            self.database_url,
+            pool_size=2,
+            max_overflow=2,
+            pool_pre_ping=True,
+        )
+        self._task = asyncio.create_task(self._run(), name="idempotency-purge")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+    async def begin(self, key: str, fingerprint: str) -> tuple[str, Optional[StoredResponse]]:
+        assert self._engine is not None, "idempotency store is not started"
+        deadline = time.monotonic() + self.wait_seconds
+        delay = 0.05
+        while True:
+            now = datetime.utcnow()
+            async with self._engine.begin() as conn:
+                inserted = (await conn.execute(
+                    pg_insert(IdempotencyKey)
+                    .values(
+                        key=key, fingerprint=fingerprint, created_dttm=now,
+                        expires_at=now + timedelta(seconds=self.ttl_seconds),
+                    )
+                    .on_conflict_do_nothing(index_elements=[IdempotencyKey.key])
+                    .returning(IdempotencyKey.key)
+                )).first()
+                if inserted is not None:
+                    return BEGIN_STARTED, None
+                row = (await conn.execute(
+                    select(
+                        IdempotencyKey.fingerprint, IdempotencyKey.created_dttm, IdempotencyKey.expires_at,
+                        IdempotencyKey.status_code, IdempotencyKey.headers, IdempotencyKey.body,
+                    ).where(IdempotencyKey.key == key)
+                )).first()
+                if row is None:
+                    continue  # deleted meanwhile
+                if row.expires_at <= now:
+                    await conn.execute(delete(IdempotencyKey).where(
+                        IdempotencyKey.key == key, IdempotencyKey.expires_at <= now))
+                    continue
+                if row.fingerprint != fingerprint:
+                    return BEGIN_MISMATCH, None
+                if row.status_code is not None:
+                    headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in row.headers or []]
+                    return BEGIN_REPLAY, StoredResponse(row.status_code, headers, row.body or b"")
+                if row.created_dttm < now - timedelta(seconds=self.wait_seconds):
+                    # In flight for longer than anyone waits: its worker is gone, take the key over
+                    taken = (await conn.execute(
+                        update(IdempotencyKey)
+                        .where(
+                            IdempotencyKey.key == key,
+                            IdempotencyKey.status_code.is_(None),
+                            IdempotencyKey.created_dttm == row.created_dttm,
+                        )
+                        .values(created_dttm=now)
+                        .returning(IdempotencyKey.key)
+                    )).first()
+                    if taken is not None:
+                        return BEGIN_STARTED, None
+            if time.monotonic() >= deadline:
+                return BEGIN_IN_PROGRESS, None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+    async def complete(self, key: str, response: StoredResponse) -> None:
+        assert self._engine is not None
+        async with self._engine.begin() as conn:
+            await conn.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key)
+                .values(
+                    status_code=response.status,
+                    headers=[[k.decode("latin-1"), v.decode("latin-1")] for k, v in response.headers],
+                    body=response.body,
+                )
+            )
+
+    async def release(self, key: str) -> None:
+        assert self._engine is not None
+        async with self._engine.begin() as conn:
+            await conn.execute(delete(IdempotencyKey).where(
+                IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None)))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.purge_interval)
+            try:
+                assert self._engine is not None
+                async with self._engine.begin() as conn:
+                    await conn.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow()))
+            except Exception:
+                logger.exception("Idempotency key purge failed")
+
+
+IdempotencyStore = Union[MemoryIdempotencyStore, DatabaseIdempotencyStore]
+
+
+@lru_cache()
+def get_idempotency_store() -> IdempotencyStore:
+    """Get the process-wide idempotency store (IDEMPOTENCY_STORE=memory | database)."""
+    settings = get_settings()
+    if settings.idempotency_store == "database":
+        return DatabaseIdempotencyStore(
+            database_url=settings.database_url,
+            ttl_seconds=settings.idempotency_ttl_seconds,
+            wait_seconds=settings.idempotency_wait_seconds,
+        )
+    return MemoryIdempotencyStore(
+        ttl_seconds=settings.idempotency_ttl_seconds,
+        max_entries=settings.idempotency_max_entries,
+        max_bytes=settings.idempotency_max_bytes,
+        wait_seconds=settings.idempotency_wait_seconds,
+    )
+
+
+def _applies(method: str, path: str) -> bool:
+    return any(method == m and pattern.fullmatch(path) for m, pattern in IDEMPOTENT_ROUTES)
+
+
+def scoped_key(scope, key: bytes) -> str:
+    """Store key: the header value scoped by method, path and credentials."""
+    credentials = b""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            credentials = value
+            break
+    raw = b"\0".join((scope["method"].encode(), scope["path"].encode(), credentials, key))
+    return hashlib.sha256(raw).hexdigest()
+
+
+async def _send_error(send, status: int, detail: str, extra_headers: tuple = ()) -> None:
+    body = orjson.dumps({"detail": detail})
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                    *extra_headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """Pure ASGI middleware: run once, replay the stored response for the same Idempotency-Key."""
+
+    def __init__(self, app, store: Optional[IdempotencyStore] = None):
+        self.app = app
+        self.store = store  # None → get_idempotency_store()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _applies(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        key = next((v for k, v in scope["headers"] if k == HEADER), None)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key.strip() or len(key) > MAX_KEY_LENGTH:
+            await _send_error(send, 400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+            return
+
+        # The body is part of the fingerprint, so read it up front and hand it to the app again
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                await self.app(scope, receive, send)  # client went away before sending the body
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        store = self.store or get_idempotency_store()
+        scoped = scoped_key(scope, key)
+        with span("idempotency.begin"):
+            outcome, stored = await store.begin(scoped, hashlib.sha256(body).hexdigest())
+        if outcome == BEGIN_REPLAY:
+            observe_idempotent_request("replayed")
+            await send({"type": "http.response.start", "status": stored.status,
+                        "headers": [*stored.headers, REPLAYED_HEADER]})
+            await send({"type": "http.response.body", "body": stored.body})
+            return
+        if outcome == BEGIN_MISMATCH:
+            observe_idempotent_request("mismatch")
+            await _send_error(send, 422, "Idempotency-Key was already used with a different request body")
+            return
+        if outcome == BEGIN_IN_PROGRESS:
+            observe_idempotent_request("in_progress")
+            await _send_error(send, 409, "A request with this Idempotency-Key is still in progress",
+                              ((b"retry-after", b"1"),))
+            return
+
+        status = 500
+        headers: list[tuple[bytes, bytes]] = []
+        body_parts: list[bytes] = []
+        finished = False
+
+        async def send_wrapper(message):
+            nonlocal status, headers, finished
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                body_parts.append(message.get("body", b""))
+                finished = not message.get("more_body", False)
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, send_wrapper)
+        except BaseException:
+            await store.release(scoped)
+            observe_idempotent_request("released")
+            raise
+        if finished and status < 500:
+            await store.complete(scoped, StoredResponse(status, headers, b"".join(body_parts)))
+            observe_idempotent_request("executed")
+        else:
+            await store.release(scoped)
+            observe_idempotent_request("released")
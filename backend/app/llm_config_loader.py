@@ -1,27 +1,213 @@
-"""Load LLM YAML config (prompts, OpenAI model). API key: yaml inline or .env."""
+"""Load LLM YAML config (prompts, OpenAI model). API key: yaml inline or .env.
+
+Файл компилируется в неизменяемый LLMConfig; LLMConfigWatcher следит за файлом
+(mtime + хэш содержимого) и атомарно подменяет активный конфиг без перезапуска бэкенда.
+"""
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import logging
 import os
-from functools import lru_cache
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 import yaml
 
 from app.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 _CONFIG_FILE = Path(__file__).resolve().parent / "llm_config.yaml"
 
 
-@lru_cache
-def load_llm_yaml() -> dict[str, Any]:
-    if not _CONFIG_FILE.is_file():
-        raise FileNotFoundError(f"LLM config not found: {_CONFIG_FILE}")
-    with open(_CONFIG_FILE, encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+@dataclass(frozen=True)
+class PrescoreConfig:
+    """Локальная предоценка тривиальных ответов без LLM (секция prescore, app/services/prescorer.py)."""
+    enabled: bool = True
+    # Ответы-отказы («не знаю», «пропуск»): оцениваются локально; короткие ответы по существу идут в LLM
+    non_answers: tuple[str, ...] = ()
+    near_empty_score: int = 0
+    verbatim_similarity: float = 0.9
+    verbatim_score: int = 100
+
+
+@dataclass(frozen=True)
+class LLMConfig:
+    """Validated, typed snapshot of llm_config.yaml."""
+    version: str
+    prompt_version: str
+    base_url: Optional[str]
+    model: str
+    full_interview_temperature: float
+    max_tokens_full_interview: int
+    full_interview_system_prompt: str
+    inline_api_key: str
+    api_key_env: str
+    interview_catalog: dict[str, Any] = field(default_factory=dict)
+    prescore: PrescoreConfig = field(default_factory=PrescoreConfig)
+    raw: dict[str, Any] = field(default_factory=dict)
+
+
+def compile_llm_config(content: bytes) -> LLMConfig:
+    """Parse and validate YAML content. Raises ValueError on an invalid config."""
+    try:
+        data = yaml.safe_load(content)
+    except yaml.YAMLError as e:
+        raise ValueError(f"llm_config.yaml: invalid YAML: {e}") from e
     if not isinstance(data, dict):
         raise ValueError("llm_config.yaml must be a mapping at the root")
-    return data
+
+    oa = data.get("openai") or {}
+    base_url = str(oa.get("base_url", "")).strip().rstrip("/") or None
+
+    model = str((data.get("models") or {}).get("openai", "gpt-4o-mini")).strip()
+    if model.lower().startswith("openai/"):
+        model = model[7:]
+
+    try:
+        temperature = float((data.get("temperature") or {}).get("full_interview", 0.7))
+        max_tokens = int((data.get("max_tokens") or {}).get("openai_full_interview", 4096))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"llm_config.yaml: temperature/max_tokens must be numbers: {e}") from e
+
+    prompt = (data.get("prompts") or {}).get("full_interview_system")
+    if not prompt or not str(prompt).strip():
+        raise ValueError("llm_config.yaml: prompts.full_interview_system is required")
+
+    ps = data.get("prescore") or {}
+    try:
+        prescore = PrescoreConfig(
+            enabled=bool(ps.get("enabled", True)),
+            non_answers=tuple(str(a) for a in ps.get("non_answers") or ()),
+            near_empty_score=int(ps.get("near_empty_score", 0)),
+            verbatim_similarity=float(ps.get("verbatim_similarity", 0.9)),
+            verbatim_score=int(ps.get("verbatim_score", 100)),
+        )
+    except (TypeError, ValueError, AttributeError) as e:
+        raise ValueError(f"llm_config.yaml: prescore values must be numbers: {e}") from e
+    if not (0 <= prescore.near_empty_score <= 100 and 0 <= prescore.verbatim_score <= 100):
+        raise ValueError("llm_config.yaml: prescore scores must be within 0..100")
+
+    sec = data.get("secrets") or {}
+    catalog = data.get("interview_catalog")
+
+    return LLMConfig(
+        version=hashlib.sha256(content).hexdigest()[:12],
+        prompt_version=hashlib.sha256(str(prompt).strip().encode("utf-8")).hexdigest()[:8],
+        base_url=base_url,
+        model=model,
+        full_interview_temperature=temperature,
+        max_tokens_full_interview=max_tokens,
+        full_interview_system_prompt=str(prompt).strip(),
+        inline_api_key=str(sec.get("openai_api_key", "")).strip(),
+        api_key_env=str(sec.get("openai_api_key_env", "OPENAI_API_KEY")),
+        interview_catalog=catalog if isinstance(catalog, dict) else {},
+        prescore=prescore,
+        raw=data,
+    )
+
+
+def _read_config_file() -> LLMConfig:
+    if not _CONFIG_FILE.is_file():
+        raise FileNotFoundError(f"LLM config not found: {_CONFIG_FILE}")
+    return compile_llm_config(_CONFIG_FILE.read_bytes())
+
+
+_active: Optional[LLMConfig] = None
+
+
+def get_llm_config() -> LLMConfig:
+    """Active config (loaded from disk on first use, then swapped by LLMConfigWatcher)."""
+    global _active
+    if _active is None:
+        _active = _read_config_file()
+    return _active
+
+
+def set_llm_config(config: LLMConfig) -> None:
+    """Atomically replace the active config."""
+    global _active
+    _active = config
+
+
+def load_llm_yaml() -> dict[str, Any]:
+    """Raw mapping of the active config."""
+    return get_llm_config().raw
+
+
+def get_llm_config_version() -> str:
+    """Short content hash of the active llm_config.yaml."""
+    return get_llm_config().version
+
+
+class LLMConfigWatcher:
+    """Polls llm_config.yaml and hot-swaps the active config when its content changes."""
+
+    def __init__(self, path: Path = _CONFIG_FILE, interval: float = 2.0):
+        self.path = path
+        self.interval = interval
+        self.last_error: Optional[str] = None
+        self._stat: Optional[tuple[int, int]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _file_stat(self) -> Optional[tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    async def start(self) -> None:
+        if self._task is not None or self.interval <= 0:
+            return
+        get_llm_config()
+        self._stat = self._file_stat()
+        self._task = asyncio.create_task(self._run(), name="llm-config-watcher")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def check(self) -> bool:
+        """Reload if the file changed on disk. Returns True if a new config was activated."""
+        stat = self._file_stat()
+        if stat is None or stat == self._stat:
+            return False
+        self._stat = stat
+        try:
+            # Parsing and validation happen off the event loop
+            config = await asyncio.to_thread(self._load, self.path)
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error("llm_config.yaml reload failed, keeping version %s: %s",
+                         get_llm_config_version(), e)
+            return False
+        self.last_error = None
+        if config.version == get_llm_config_version():
+            return False
+        set_llm_config(config)
+        logger.info("llm_config.yaml reloaded, version %s", config.version)
+        return True
+
+    @staticmethod
+    def _load(path: Path) -> LLMConfig:
+        return compile_llm_config(path.read_bytes())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception:
+                logger.exception("llm_config.yaml watcher iteration failed")
 
 
 def get_openai_base_url() -> str | None:
@@ -36,55 +222,40 @@ def get_openai_base_url() -> str | None:
     s = get_settings().openai_base_url.strip()
     if s:
         return s.rstrip("/")
-    cfg = load_llm_yaml()
-    oa = cfg.get("openai") or {}
-    y = str(oa.get("base_url", "")).strip()
-    return y.rstrip("/") if y else None
+    return get_llm_config().base_url
 
 
 def resolve_openai_api_key() -> str:
-    cfg = load_llm_yaml()
-    sec = cfg.get("secrets") or {}
-    inline = str(sec.get("openai_api_key", "")).strip()
-    if inline:
-        return inline
-    env_name = str(sec.get("openai_api_key_env", "OPENAI_API_KEY"))
-    return os.getenv(env_name, "") or get_settings().openai_api_key
+    cfg = get_llm_config()
+    if cfg.inline_api_key:
+        return cfg.inline_api_key
+    return os.getenv(cfg.api_key_env, "") or get_settings().openai_api_key
 
 
 def get_openai_model() -> str:
-    cfg = load_llm_yaml()
-    models = cfg.get("models") or {}
-    m = str(models.get("openai", "gpt-4o-mini")).strip()
-    if m.lower().startswith("openai/"):
-        m = m[7:]
-    return m
+    return get_llm_config().model
 
 
 def get_full_interview_temperature() -> float:
-    cfg = load_llm_yaml()
-    t = (cfg.get("temperature") or {}).get("full_interview", 0.7)
-    return float(t)
+    return get_llm_config().full_interview_temperature
 
 
 def get_max_tokens_openai_full_interview() -> int:
-    cfg = load_llm_yaml()
-    mt = (cfg.get("max_tokens") or {}).get("openai_full_interview", 4096)
-    return int(mt)
+    return get_llm_config().max_tokens_full_interview
 
 
 def get_full_interview_system_prompt() -> str:
-    cfg = load_llm_yaml()
-    prompts = cfg.get("prompts") or {}
-    text = prompts.get("full_interview_system")
-    if not text or not str(text).strip():
-        raise ValueError("llm_config.yaml: prompts.full_interview_system is required")
-    return str(text).strip()
+    return get_llm_config().full_interview_system_prompt
+
+
+def get_prompt_version() -> str:
+    """Short hash of the system prompt (for telemetry: which prompt produced a result)."""
+    return get_llm_config().prompt_version
 
 
 def get_interview_catalog() -> dict[str, Any]:
-    cfg = load_llm_yaml()
-    cat = cfg.get("interview_catalog")
-    if not isinstance(cat, dict):
-        return {}
-    return cat
+    return get_llm_config().interview_catalog
+
+
+def get_prescore_config() -> PrescoreConfig:
+    return get_llm_config().prescore
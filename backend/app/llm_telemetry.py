@@ -0,0 +1,175 @@
+"""Per-call LLM telemetry: append-only JSONL store and rollups for capacity planning.
+
+Every LLM call (including fallbacks) is recorded with token usage, wall time,
+finish_reason, model, prompt version and input size. Rollups answer questions like
+"does max_tokens truncate output?" (finish_reason=length) and "how does latency grow
+with the number of items / answer length?".
+
+Usage (from backend/):
+    python -m app.llm_telemetry                 # rollup by item count
+    python -m app.llm_telemetry --by answer_len --since-hours 24
+"""
+import argparse
+import asyncio
+import logging
+import math
+import threading
+import time
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+import orjson
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Total user-answer characters per call → rollup bucket upper bounds
+ANSWER_LEN_BUCKETS = (500, 1500, 3000, 6000, 9000)
+
+
+@dataclass
+class LLMCallRecord:
+    """One LLM call. Token fields are None when the provider returned no usage (or no call was made)."""
+    ts: float
+    endpoint: str
+    model: str
+    prompt_version: str
+    outcome: str  # success, fallback_no_key, fallback_error
+    fallback: bool
+    item_count: int  # items sent to the model (prescored ones are not)
+    answer_chars: int
+    prompt_chars: int
+    max_tokens: int
+    wall_ms: float
+    ttft_ms: Optional[float] = None  # only for streaming calls
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    finish_reason: Optional[str] = None
+    error: Optional[str] = None
+    prescored_items: int = 0  # items of the same interview graded locally (app/services/prescorer.py)
+
+
+class LLMTelemetryStore:
+    """Append-only JSONL file of LLMCallRecord (one compact line per call)."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+
+    def record(self, rec: LLMCallRecord) -> None:
+        """Append without blocking the event loop (the write runs in the default executor)."""
+        if self.path is None:
+            return
+        line = orjson.dumps(asdict(rec)) + b"\n"
+        try:
+            asyncio.get_running_loop().run_in_executor(None, self._append, line)
+        except RuntimeError:
+            self._append(line)
+
+    def _append(self, line: bytes) -> None:
+        try:
+            with self._lock, open(self.path, "ab") as f:
+                f.write(line)
+        except OSError:
+            logger.exception("Failed to write LLM telemetry to %s", self.path)
+
+    def read(self, since_ts: float = 0.0) -> Iterator[dict[str, Any]]:
+        if self.path is None or not self.path.is_file():
+            return
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                rec = orjson.loads(line)
+                if rec.get("ts", 0) >= since_ts:
+                    yield rec
+
+
+@lru_cache()
+def get_llm_telemetry() -> LLMTelemetryStore:
+    """Get the process-wide telemetry store (path from settings; empty path disables it)."""
+    return LLMTelemetryStore(get_settings().llm_telemetry_path)
+
+
+def _percentile(sorted_values: list[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    idx = max(0, min(len(sorted_values) - 1, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+def answer_len_bucket(chars: int) -> str:
+    lower = 0
+    for upper in ANSWER_LEN_BUCKETS:
+        if chars < upper:
+            return f"{lower}-{upper}"
+        lower = upper
+    return f"{lower}+"
+
+
+def rollup(records: Iterator[dict[str, Any]], by: str = "items") -> list[dict[str, Any]]:
+    """
+    Group calls by item count ("items") or total answer length ("answer_len") and compute
+    p50/p95 of wall time and tokens, plus truncation (finish_reason=length) and fallback rates.
+    """
+    groups: dict[Any, list[dict[str, Any]]] = {}
+    for rec in records:
+        key = rec["item_count"] if by == "items" else answer_len_bucket(rec["answer_chars"])
+        groups.setdefault(key, []).append(rec)
+
+    def sort_key(key: Any) -> Any:
+        return key if by == "items" else int(str(key).split("-")[0].rstrip("+"))
+
+    rows = []
+    for key in sorted(groups, key=sort_key):
+        recs = groups[key]
+        called = [r for r in recs if r["outcome"] != "fallback_no_key"]
+        wall = sorted(r["wall_ms"] for r in called)
+        prompt = sorted(r["prompt_tokens"] for r in called if r.get("prompt_tokens") is not None)
+        completion = sorted(r["completion_tokens"] for r in called if r.get("completion_tokens") is not None)
+        rows.append(
+            {
+                by: key,
+                "calls": len(recs),
+                "wall_ms_p50": _percentile(wall, 0.5),
+                "wall_ms_p95": _percentile(wall, 0.95),
+                "prompt_tokens_p50": _percentile(prompt, 0.5),
+                "prompt_tokens_p95": _percentile(prompt, 0.95),
+                "completion_tokens_p50": _percentile(completion, 0.5),
+                "completion_tokens_p95": _percentile(completion, 0.95),
+                "truncated_pct": 100.0 * sum(r.get("finish_reason") == "length" for r in recs) / len(recs),
+                "fallback_pct": 100.0 * sum(bool(r["fallback"]) for r in recs) / len(recs),
+            }
+        )
+    return rows
+
+
+def _print_rollup(rows: list[dict[str, Any]]) -> None:
+    if not rows:
+        print("No LLM calls recorded.")
+        return
+    headers = list(rows[0].keys())
+    widths = [max(len(h), 8) for h in headers]
+    print("  ".join(h.rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        cells = []
+        for h, w in zip(headers, widths):
+            v = row[h]
+            cells.append(("-" if v is None else f"{v:.1f}" if isinstance(v, float) else str(v)).rjust(w))
+        print("  ".join(cells))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM call telemetry rollups")
+    parser.add_argument("--by", choices=("items", "answer_len"), default="items")
+    parser.add_argument("--since-hours", type=float, default=0.0, help="Only calls from the last N hours (0 = all)")
+    parser.add_argument("--path", default=None, help="Telemetry file (default: LLM_TELEMETRY_PATH)")
+    args = parser.parse_args()
+
+    store = LLMTelemetryStore(args.path) if args.path else get_llm_telemetry()
+    since = time.time() - args.since_hours * 3600 if args.since_hours else 0.0
+    _print_rollup(rollup(store.read(since), by=args.by))
@@ -1,11 +1,33 @@
 """Main FastAPI application."""
+import sys
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
 
-from app.config import get_settings
-from app.database import init_db
-from app.routers import auth_router, interview_router, payment_router
+from app.startup_profiler import startup_profiler
+
+with startup_profiler.phase("import fastapi"):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import ORJSONResponse, PlainTextResponse
+
+with startup_profiler.phase("import config + database"):
+    from app.config import get_settings
+    from app.database import engine, init_db
+    from app.db_instrumentation import SQLStatsMiddleware, install_sql_instrumentation
+    from app.health import get_health_monitor
+    from app.idempotency import IdempotencyMiddleware, get_idempotency_store
+    from app.llm_config_loader import LLMConfigWatcher, get_llm_config, get_llm_config_version
+    from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, registry
+    from app.tracing import TracingMiddleware, get_tracer
+
+with startup_profiler.phase("import routers + services"):
+    from app.routers import auth_router, interview_router, payment_router
+    from app.services.analytics_writer import get_analytics_writer
+    from app.services.payment_inbox import get_payment_inbox
+    from app.services.payment_reconciler import get_payment_reconciler
+    from app.services.session_store import get_session_store
+    from app.services.yookassa_client import get_yookassa_client
+    from app.warmup import warm_up
+startup_profiler.imports_done()
 
 settings = get_settings()
 
@@ -14,10 +36,47 @@ settings = get_settings()
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
-    await init_db()
+    with startup_profiler.phase("init_db"):
+        await init_db(fast=settings.fast_startup)
+    with startup_profiler.phase("llm config"):
+        get_llm_config()
+        config_watcher = LLMConfigWatcher(interval=settings.llm_config_reload_interval_seconds)
+        await config_watcher.start()
+    with startup_profiler.phase("analytics writer"):
+        analytics_writer = get_analytics_writer()
+        await analytics_writer.start()
+    with startup_profiler.phase("payment inbox"):
+        payment_inbox = get_payment_inbox()
+        await payment_inbox.start()
+    with startup_profiler.phase("session store"):
+        session_store = get_session_store()
+        await session_store.start()
+    with startup_profiler.phase("idempotency store"):
+        idempotency_store = get_idempotency_store()
+        await idempotency_store.start()
+    with startup_profiler.phase("yookassa client + reconciler"):
+        yookassa_client = get_yookassa_client()
+        await yookassa_client.start()
+        payment_reconciler = get_payment_reconciler()
+        await payment_reconciler.start()
+    with startup_profiler.phase("health monitor"):
+        health_monitor = get_health_monitor()
+        await health_monitor.start()
+    # Own phases per step ("warmup: ..."); /health/ready stays 503 until it is done
+    await warm_up(settings.warmup_db_connections)
+    if settings.startup_profile:
+        print(startup_profiler.report(), file=sys.stderr, flush=True)
     yield
-    # Shutdown
-    pass
+    # Shutdown: not ready first; drain buffered analytics rows; unapplied webhook events stay in the inbox
+    await health_monitor.stop()
+    await payment_inbox.stop()
+    await payment_reconciler.stop()
+    await yookassa_client.stop()
+    await analytics_writer.stop()
+    await config_watcher.stop()
+    await idempotency_store.stop()
+    await session_store.stop()
+    get_tracer().stop()
 
 
 app = FastAPI(
@@ -25,8 +84,12 @@ app = FastAPI(
     description="API for conducting mock interviews for Data/Product Analyst positions",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+# Idempotency-Key replays (innermost: CORS headers are added to replayed responses as usual)
+app.add_middleware(IdempotencyMiddleware)
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -40,6 +103,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request SQL query count / DB time (headers in debug mode)
+install_sql_instrumentation(engine)
+app.add_middleware(SQLStatsMiddleware)
+
+# Root span per request (sampled, see TRACING_SAMPLE_RATE)
+app.add_middleware(TracingMiddleware)
+
+# Outermost middleware, so latency includes CORS handling
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(interview_router)
@@ -53,10 +126,33 @@ async def root():
         "message": "AI Mock Interview API",
         "version": "1.0.0",
         "docs": "/docs",
+        "llm_config_version": get_llm_config_version(),
     }
 
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Health check endpoint (liveness only; load balancers should use /health/ready)."""
     return {"status": "healthy"}
+
+
+@app.get("/health/live")
+async def liveness():
+    """The process is up and its event loop answers."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Ready to serve: warmup done and dependency probes passing (cached, refreshed in the background)."""
+    ready, checks = get_health_monitor().readiness()
+    return ORJSONResponse(
+        {"status": "ready" if ready else "not_ready", "checks": checks},
+        status_code=200 if ready else 503,
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics (text exposition format)."""
+    return PlainTextResponse(registry.render(), media_type=METRICS_CONTENT_TYPE)
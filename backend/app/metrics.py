@@ -0,0 +1,277 @@
+"""Prometheus-style metrics: counters, gauges, histograms and the /metrics text exposition.
+
+Metrics are updated only from the event loop thread, so plain dict/list updates are
+enough — no locks on the hot path. Values that are cheap to read on demand (DB pool,
+live interview sessions) are collected at scrape time via callbacks.
+"""
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Iterable, Optional
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request/LLM latency buckets, seconds (LLM calls take seconds, API calls milliseconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        head = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        return head + "".join(line + "\n" for line in self.samples())
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_fmt(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) - amount
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+
+class CallbackGauge(Metric):
+    """Gauge whose samples are read at scrape time: callback() → {label values: value}."""
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[LabelValues, float]],
+        labelnames: Iterable[str] = (),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.callback().items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_fmt(value)}"
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels → [per-bucket counts (+Inf last)..., sum]; cumulated only when rendering
+        self._series: dict[LabelValues, list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> Iterable[str]:
+        bounds = self.buckets + (float("inf"),)
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, n in zip(bounds, series):
+                cumulative += n
+                le = f'le="{_fmt(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_fmt(series[-1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "".join(m.render() for m in self._metrics.values())
+
+
+registry = Registry()
+
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+))
+HTTP_REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+    ("method",),
+))
+LLM_REQUEST_DURATION = registry.register(Histogram(
+    "llm_request_duration_seconds",
+    "LLM call latency by outcome",
+    ("outcome",),
+))
+LLM_REQUESTS = registry.register(Counter(
+    "llm_requests_total",
+    "LLM calls by outcome (success, fallback_no_key, fallback_error)",
+    ("outcome",),
+))
+LLM_PRESCORED_ITEMS = registry.register(Counter(
+    "llm_prescored_items_total",
+    "Answers graded locally without the LLM, by verdict (empty, near_empty, verbatim)",
+    ("verdict",),
+))
+YOOKASSA_REQUEST_DURATION = registry.register(Histogram(
+    "yookassa_request_duration_seconds",
+    "YooKassa API call latency (retries included) by operation and outcome",
+    ("operation", "outcome"),
+))
+IDEMPOTENT_REQUESTS = registry.register(Counter(
+    "idempotent_requests_total",
+    "Requests with an Idempotency-Key by outcome (executed, replayed, in_progress, mismatch, released)",
+    ("outcome",),
+))
+
+
+def _db_pool_stats() -> dict[LabelValues, float]:
+    from app.database import engine
+
+    pool = engine.pool
+    stats: dict[LabelValues, float] = {}
+    for state in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, state, None)
+        if callable(fn):
+            stats[(state,)] = fn()
+    return stats
+
+
+def _live_sessions() -> dict[LabelValues, float]:
+    from app.services.interview import count_sessions_by_status
+
+    return {(status,): n for status, n in count_sessions_by_status().items()}
+
+
+def _health_checks() -> dict[LabelValues, float]:
+    from app.health import get_health_monitor
+
+    return {(name,): float(result.ok) for name, result in get_health_monitor().results.items()}
+
+
+registry.register(CallbackGauge(
+    "db_pool_connections",
+    "SQLAlchemy pool state of the main engine",
+    _db_pool_stats,
+    ("state",),
+))
+registry.register(CallbackGauge(
+    "interview_sessions",
+    "Interview sessions in progress by status (SESSION_STORE=database: all workers' sessions)",
+    _live_sessions,
+    ("status",),
+))
+registry.register(CallbackGauge(
+    "health_check_up",
+    "Readiness probes at their last refresh (1 = passed)",
+    _health_checks,
+    ("check",),
+))
+
+
+def observe_llm_call(outcome: str, seconds: float) -> None:
+    LLM_REQUESTS.inc(outcome)
+    LLM_REQUEST_DURATION.observe(seconds, outcome)
+
+
+def observe_prescored(verdict: str) -> None:
+    LLM_PRESCORED_ITEMS.inc(verdict)
+
+
+def observe_yookassa_call(operation: str, outcome: str, seconds: float) -> None:
+    YOOKASSA_REQUEST_DURATION.observe(seconds, operation, outcome)
+
+
+def observe_idempotent_request(outcome: str) -> None:
+    IDEMPOTENT_REQUESTS.inc(outcome)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: latency histogram per route template and in-flight gauge."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc(method)
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # FastAPI puts the matched APIRoute into the (shared) scope during routing
+            route = scope.get("route")
+            template: Optional[str] = getattr(route, "path", None)
+            HTTP_REQUEST_DURATION.observe(perf_counter() - start, method, template or "unmatched", status)
+            HTTP_REQUESTS_IN_FLIGHT.dec(method)
@@ -1,7 +1,13 @@
 """Database models."""
 from app.models.user import User
-from app.models.task import Task
-from app.models.payment import Payment
-from app.models.llm_answer import LLMAnswer
+from app.models.task import Task, TaskMinHash, TaskMinHashBucket
+from app.models.payment import Payment, PaymentWebhookEvent
+from app.models.llm_answer import LLMAnswer, UserTopicStats
+from app.models.interview_report import InterviewReport
+from app.models.idempotency import IdempotencyKey
+from app.models.interview_session import InterviewSessionState
 
-__all__ = ["User", "Task", "Payment", "LLMAnswer"]
+__all__ = [
+    "User", "Task", "TaskMinHash", "TaskMinHashBucket", "Payment", "PaymentWebhookEvent", "LLMAnswer", "UserTopicStats",
+    "InterviewReport", "IdempotencyKey", "InterviewSessionState",
+]
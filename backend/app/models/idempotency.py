@@ -0,0 +1,20 @@
+"""Idempotency key model (shared store for the Idempotency-Key header)."""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, JSON, LargeBinary
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Responses of mutating requests sent with an Idempotency-Key (IDEMPOTENCY_STORE=database).
+    status_code is NULL while the first request is still running.
+    """
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(64), primary_key=True)  # sha256 of method, path, credentials and the header
+    fingerprint = Column(String(64), nullable=False)  # sha256 of the request body
+    created_dttm = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    status_code = Column(Integer, nullable=True)
+    headers = Column(JSON, nullable=True)  # [[name, value], ...] as sent
+    body = Column(LargeBinary, nullable=True)
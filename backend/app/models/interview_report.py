@@ -0,0 +1,37 @@
+"""Interview report model: one row per finished interview (history)."""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Index, LargeBinary
+from app.database import Base
+
+
+class InterviewReport(Base):
+    """
+    Completed interview sessions, written by /finish.
+    The history list is served from the covering index alone (keyset on created_dttm, id);
+    the full report is kept compressed and replayed by repeated /finish and GET .../report.
+    """
+    __tablename__ = "interview_reports"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    session_id = Column(String, unique=True, nullable=False)
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    created_dttm = Column(DateTime, default=datetime.utcnow, nullable=False)  # completion time
+    started_dttm = Column(DateTime, nullable=True)
+    specialization = Column(String, nullable=True)
+    experience_level = Column(String, nullable=True)
+    company_tier = Column(String, nullable=True)
+    topic = Column(String, nullable=True)
+    tasks_count = Column(Integer, nullable=False, default=0)
+    overall_score = Column(Integer, nullable=False, default=0)
+    report_blob = Column(LargeBinary, nullable=True)  # zlib-compressed JSON of FinalReport
+
+    __table_args__ = (
+        # GET /interview/history: index-only keyset scan per user, newest first
+        Index(
+            "ix_interview_reports_user_history", "user_id", "created_dttm", "id",
+            postgresql_include=[
+                "session_id", "started_dttm", "specialization", "experience_level", "company_tier", "topic",
+                "tasks_count", "overall_score",
+            ],
+        ),
+    )
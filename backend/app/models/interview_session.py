@@ -0,0 +1,19 @@
+"""Interview session model (shared session store)."""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, JSON, ForeignKey
+from app.database import Base
+
+
+class InterviewSessionState(Base):
+    """
+    State of an interview in progress (SESSION_STORE=database), so any worker can serve it.
+    version grows on every save; a save with a stale version is rejected.
+    """
+    __tablename__ = "interview_sessions"
+
+    session_id = Column(String(36), primary_key=True)
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    status = Column(String(16), nullable=False)
+    state = Column(JSON, nullable=False)  # the session dict of InterviewService
+    version = Column(Integer, nullable=False, default=1)
+    updated_dttm = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,6 +1,6 @@
 """LLM Answer model for storing AI feedback."""
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey, JSON
+from sqlalchemy import BigInteger, Column, String, DateTime, Integer, Text, ForeignKey, JSON
 from app.database import Base
 
 
@@ -19,3 +19,18 @@ class LLMAnswer(Base):
     provided_feedback = Column(Text, nullable=True)  # Raw text feedback
     task_id = Column(Integer, ForeignKey("tasks.task_id"), nullable=True)
     user_answer = Column(Text, nullable=True)  # User's original answer
+    session_id = Column(String, nullable=True, index=True)  # interview_reports.session_id (NULL for older rows)
+
+
+class UserTopicStats(Base):
+    """
+    Per-user, per-subtype rollup of llm_answers scores, updated by the analytics
+    writer in the same transaction as the answers; read by the "adaptive" topic.
+    """
+    __tablename__ = "user_topic_stats"
+
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    subtype = Column(String, primary_key=True)  # tasks.subtype
+    answers_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(BigInteger, nullable=False, default=0)  # mean = score_sum / answers_count
+    last_seen_dttm = Column(DateTime, nullable=True)
@@ -1,6 +1,6 @@
 """Payment model for transaction records."""
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Float, Integer, ForeignKey
+from sqlalchemy import Column, String, DateTime, Float, Integer, ForeignKey, Index, JSON, Text, UniqueConstraint, text
 from app.database import Base
 
 
@@ -15,10 +15,46 @@ class Payment(Base):
     user_id = Column(String, ForeignKey("users.user_id"), nullable=False)
     transaction_id = Column(String, unique=True, nullable=False)
     payment_dttm = Column(DateTime, default=datetime.utcnow)
-    status = Column(String, default="pending")  # pending, succeeded, failed, refunded
+    status = Column(String, default="pending")  # pending, succeeded, canceled, failed, refunded
     transaction_sum = Column(Float, nullable=False)
     payment_provider = Column(String, default="yookassa")
     payment_type = Column(String, nullable=True)  # card, wallet, etc.
     product_id = Column(String, nullable=False)  # 3_questions, 6_questions, etc.
     currency = Column(String, default="RUB")
     ip_address = Column(String, nullable=True)
+
+    __table_args__ = (
+        # Reconciliation pages through pending payments by id (app/services/payment_reconciler.py)
+        Index("ix_payments_pending", "id", postgresql_where=text("status = 'pending'")),
+    )
+
+
+class PaymentWebhookEvent(Base):
+    """
+    Inbox of YooKassa notifications: stored and acknowledged by /payment/webhook,
+    applied later by the background consumer (app/services/payment_inbox.py).
+    A redelivered (event, payment_id) pair is not stored twice.
+    """
+    __tablename__ = "payment_webhook_inbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event = Column(String, nullable=False)  # payment.succeeded, payment.canceled, ...
+    payment_id = Column(String, nullable=False)  # YooKassa object.id = payments.transaction_id
+    payload = Column(JSON, nullable=False)
+    received_dttm = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Retry schedule while the payment row is not visible yet (or applying failed)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_dttm = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(Text, nullable=True)
+    processed_dttm = Column(DateTime, nullable=True)
+    result = Column(String, nullable=True)  # credited, already_applied, ignored, not_found
+
+    __table_args__ = (
+        UniqueConstraint("event", "payment_id", name="uq_payment_webhook_inbox_event_payment"),
+        # The consumer only scans unprocessed rows
+        Index(
+            "ix_payment_webhook_inbox_pending",
+            "next_attempt_dttm",
+            postgresql_where=text("processed_dttm IS NULL"),
+        ),
+    )
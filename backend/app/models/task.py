@@ -1,7 +1,34 @@
 """Task model for mock interview questions."""
-from sqlalchemy import Column, String, Integer, Text
+import hashlib
+
+from typing import Any, Mapping
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, LargeBinary, String, Text
 from app.database import Base
 
+# Columns compared by the catalog sync (task_migrator.import_tasks --sync)
+TASK_PAYLOAD_FIELDS = ("task_answer", "company_tier", "employee_level", "type", "subtype", "source")
+
+
+def task_content_hash(question: str) -> str:
+    """Dedup key: sha256 of the question with case and whitespace differences removed."""
+    normalized = " ".join(str(question).split()).casefold()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def task_payload_hash(values: Mapping[str, Any]) -> str:
+    """Hash of everything but the question: tells whether a synced task changed."""
+    payload = "\x1f".join(str(values.get(f) or "") for f in TASK_PAYLOAD_FIELDS)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _content_hash_default(context) -> str:
+    return task_content_hash(context.get_current_parameters()["task_question"])
+
+
+def _payload_hash_default(context) -> str:
+    return task_payload_hash(context.get_current_parameters())
+
 
 class Task(Base):
     """
@@ -18,3 +45,24 @@ class Task(Base):
     type = Column(String, nullable=False)  # product_analyst, data_analyst
     subtype = Column(String, nullable=False)  # statistics, ab_testing, probability, python, sql, algebra_and_geometry, random
     source = Column(String, nullable=True)  # Original source of the question
+    # task_content_hash(task_question); NULL only for legacy duplicates found by the 004 backfill
+    content_hash = Column(String(64), nullable=True, unique=True, index=True, default=_content_hash_default)
+    payload_hash = Column(String(64), nullable=True, default=_payload_hash_default)
+    retired_at = Column(DateTime, nullable=True)  # soft delete: removed from the catalog by --sync
+
+
+class TaskMinHash(Base):
+    """MinHash signature of a task question (task_migrator/near_duplicates.py)."""
+    __tablename__ = "task_minhash"
+
+    task_id = Column(Integer, ForeignKey("tasks.task_id", ondelete="CASCADE"), primary_key=True)
+    signature = Column(LargeBinary, nullable=False)  # NUM_PERM little-endian uint32
+
+
+class TaskMinHashBucket(Base):
+    """LSH band bucket → task posting; tasks sharing a bucket are near-duplicate candidates.
+    No FK (16 rows per task, bulk-written): postings of deleted tasks are skipped and purged by near_duplicates."""
+    __tablename__ = "task_minhash_buckets"
+
+    bucket = Column(BigInteger, primary_key=True)
+    task_id = Column(Integer, primary_key=True)
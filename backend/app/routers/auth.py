@@ -5,6 +5,7 @@ from typing import Optional
 
 from app.database import get_db
 from app.services.auth import AuthService, decode_token
+from app.tracing import span
 from app.schemas.user import (
     RegisterRequest,
     LoginRequest,
@@ -25,13 +26,14 @@ async def get_current_user(
     """Dependency to get current authenticated user from JWT."""
     if not authorization or not authorization.startswith("Bearer "):
         return None
-    token = authorization.split(" ")[1]
-    user_id = decode_token(token)
-    if not user_id:
-        return None
-    auth_service = AuthService(db)
-    user = await auth_service.get_user_by_id(user_id)
-    return user
+    with span("auth.get_current_user"):
+        token = authorization.split(" ")[1]
+        user_id = decode_token(token)
+        if not user_id:
+            return None
+        auth_service = AuthService(db)
+        user = await auth_service.get_user_by_id(user_id)
+        return user
 
 
 async def require_auth(
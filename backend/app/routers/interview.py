@@ -1,22 +1,23 @@
 """Interview routes."""
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.database import get_db
-from app.llm_config_loader import get_interview_catalog
 from app.routers.auth import require_auth
+from app.services.catalog import CATALOG_BUNDLE, etag_matches, get_catalog_entry
+from app.services.history import HistoryService
 from app.services.interview import InterviewService
 from app.services.auth import AuthService
 from app.schemas.task import TaskSelection
-from app.schemas.interview import InterviewAnswer
-
-router = APIRouter(prefix="/interview", tags=["Interview"])
+from app.schemas.interview import FinalReport, InterviewAnswer
+from app.serialization import negotiated_response
 
+settings = get_settings()
 
-def _catalog_or(key: str, fallback: list) -> list:
-    cat = get_interview_catalog()
-    val = cat.get(key)
-    return val if isinstance(val, list) and val else fallback
+router = APIRouter(prefix="/interview", tags=["Interview"])
 
 
 @router.post("/start")
@@ -52,16 +53,28 @@ async def get_session(
 ):
     """Get current session state."""
     interview_service = InterviewService(db)
-    session = interview_service.get_session(session_id)
+    session = await interview_service.get_session(session_id)
     
     if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+        # Finished interviews live on as history entries
+        item = await HistoryService(db).get_item(user.user_id, session_id)
+        if item is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        return {
+            "session_id": session_id,
+            "status": "completed",
+            "current_task": None,
+            "tasks_completed": item.tasks_count,
+            "tasks_remaining": 0,
+            "can_continue": False,
+            "feedbacks": [],
+        }
     
     if session["user_id"] != user.user_id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    current_task = interview_service.get_current_task(session_id)
-    can_continue, completed, remaining = interview_service.can_continue(session_id)
+    current_task = interview_service.get_current_task(session)
+    can_continue, completed, remaining = interview_service.can_continue(session)
     
     return {
         "session_id": session_id,
@@ -82,7 +95,7 @@ async def get_current_task(
 ):
     """Get current task for the session."""
     interview_service = InterviewService(db)
-    session = interview_service.get_session(session_id)
+    session = await interview_service.get_session(session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -90,7 +103,7 @@ async def get_current_task(
     if session["user_id"] != user.user_id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    current_task = interview_service.get_current_task(session_id)
+    current_task = interview_service.get_current_task(session)
     
     if not current_task:
         raise HTTPException(
@@ -113,7 +126,7 @@ async def submit_answer(
         raise HTTPException(status_code=400, detail="Session ID mismatch")
     
     interview_service = InterviewService(db)
-    session = interview_service.get_session(session_id)
+    session = await interview_service.get_session(session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -122,7 +135,7 @@ async def submit_answer(
         raise HTTPException(status_code=403, detail="Access denied")
     
     try:
-        await interview_service.submit_answer(
+        session = await interview_service.submit_answer(
             session_id=session_id,
             task_id=answer_data.task_id,
             answer=answer_data.answer,
@@ -132,7 +145,7 @@ async def submit_answer(
         auth_service = AuthService(db)
         await auth_service.consume_one_question(user)
         
-        can_continue, completed, remaining = interview_service.can_continue(session_id)
+        can_continue, completed, remaining = interview_service.can_continue(session)
         
         return {
             "message": "Ответ сохранён. Разбор от модели будет после завершения всех задач интервью.",
@@ -144,93 +157,110 @@ async def submit_answer(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/session/{session_id}/finish")
+@router.post("/session/{session_id}/finish", response_model=FinalReport)
 async def finish_interview(
     session_id: str,
+    request: Request,
     user = Depends(require_auth),
     db: AsyncSession = Depends(get_db),
 ):
-    """Finish interview and get final report."""
+    """Finish interview and get final report (repeated calls return the stored report)."""
     interview_service = InterviewService(db)
-    session = interview_service.get_session(session_id)
-    
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+    session = await interview_service.get_session(session_id)
     
-    if session["user_id"] != user.user_id:
+    if session is not None and session["user_id"] != user.user_id:
         raise HTTPException(status_code=403, detail="Access denied")
     
     try:
         report = await interview_service.finish_interview(session_id, user)
-        return report
+        return negotiated_response(request, report)
+    except ValueError as e:
+        # No live session and no stored report of this user
+        raise HTTPException(status_code=404 if session is None else 400, detail=str(e))
+
+
+@router.get("/session/{session_id}/report", response_model=FinalReport)
+async def get_report(
+    session_id: str,
+    request: Request,
+    user = Depends(require_auth),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get the final report of a finished interview."""
+    report = await InterviewService(db).get_report(session_id, user)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return negotiated_response(request, report)
+
+
+@router.get("/history")
+async def get_history(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    user = Depends(require_auth),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get finished interviews, newest first (pass next_cursor for the next page)."""
+    limit = min(limit or settings.history_page_size, settings.history_max_page_size)
+    try:
+        page = await HistoryService(db).list_reports(user.user_id, limit, cursor)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return negotiated_response(request, page)
+
+
+@router.get("/history/{session_id}")
+async def get_history_entry(
+    session_id: str,
+    request: Request,
+    detailed: bool = False,
+    user = Depends(require_auth),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get a finished interview with task results (answers and detailed feedback with detailed=true)."""
+    entry = await HistoryService(db).get_report(user.user_id, session_id, detailed)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return negotiated_response(request, entry)
+
+
+def _catalog_response(request: Request, name: str) -> Response:
+    entry = get_catalog_entry(name)
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": f"public, max-age={settings.catalog_cache_max_age}",
+    }
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+@router.get("/catalog")
+async def get_catalog(request: Request):
+    """Get all catalog sections (specializations, levels, tiers, topics) in one response."""
+    return _catalog_response(request, CATALOG_BUNDLE)
 
 
 @router.get("/specializations")
-async def get_specializations():
+async def get_specializations(request: Request):
     """Get available specializations (из app/llm_config.yaml → interview_catalog)."""
-    return {
-        "specializations": _catalog_or(
-            "specializations",
-            [
-                {"id": "product_analyst", "name": "Product Analyst"},
-                {"id": "data_analyst", "name": "Data Analyst"},
-            ],
-        )
-    }
+    return _catalog_response(request, "specializations")
 
 
 @router.get("/experience-levels")
-async def get_experience_levels():
+async def get_experience_levels(request: Request):
     """Get available experience levels."""
-    return {
-        "levels": _catalog_or(
-            "experience_levels",
-            [
-                {"id": "junior", "name": "Junior"},
-                {"id": "middle", "name": "Middle"},
-                {"id": "senior", "name": "Senior"},
-            ],
-        )
-    }
+    return _catalog_response(request, "experience-levels")
 
 
 @router.get("/company-tiers")
-async def get_company_tiers():
+async def get_company_tiers(request: Request):
     """Get available company tiers."""
-    return {
-        "tiers": _catalog_or(
-            "company_tiers",
-            [
-                {
-                    "id": "tier1",
-                    "name": "Tier 1",
-                    "description": "Яндекс, VK, Тинькофф, Ozon, Avito и др.",
-                },
-                {
-                    "id": "tier2",
-                    "name": "Tier 2",
-                    "description": "Крупные компании с сильными командами",
-                },
-            ],
-        )
-    }
+    return _catalog_response(request, "company-tiers")
 
 
 @router.get("/topics")
-async def get_topics():
+async def get_topics(request: Request):
     """Get available interview topics."""
-    return {
-        "topics": _catalog_or(
-            "topics",
-            [
-                {"id": "statistics", "name": "Статистика"},
-                {"id": "ab_testing", "name": "A/B тестирование"},
-                {"id": "probability", "name": "Теория вероятностей"},
-                {"id": "python", "name": "Python"},
-                {"id": "sql", "name": "SQL"},
-                {"id": "random", "name": "Рандом (микс тем)"},
-            ],
-        )
-    }
+    return _catalog_response(request, "topics")
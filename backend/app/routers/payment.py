@@ -1,4 +1,5 @@
 """Payment routes."""
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
@@ -6,6 +7,7 @@ from typing import Optional
 from app.database import get_db
 from app.routers.auth import require_auth
 from app.services.payment import PaymentService
+from app.services.payment_inbox import get_payment_inbox, record_webhook_event
 from app.schemas.payment import PaymentCreate, PaymentResponse, PricingPlan
 
 router = APIRouter(prefix="/payment", tags=["Payment"])
@@ -50,20 +52,19 @@ async def payment_webhook(
     request: Request,
     db: AsyncSession = Depends(get_db),
 ):
-    """Handle YooKassa webhook notifications."""
+    """
+    Handle YooKassa webhook notifications: store in the inbox and acknowledge at once.
+    Crediting happens in the background consumer; redeliveries are acknowledged too.
+    """
     # TODO: Verify webhook signature from YooKassa
     try:
-        webhook_data = await request.json()
-        payment_service = PaymentService(db)
-        
-        success = await payment_service.process_webhook(webhook_data)
-        
-        if success:
-            return {"status": "ok"}
-        else:
-            raise HTTPException(status_code=400, detail="Failed to process webhook")
-    except Exception as e:
+        webhook_data = orjson.loads(await request.body())
+        stored = await record_webhook_event(db, webhook_data)
+    except ValueError as e:  # orjson.JSONDecodeError is a ValueError
         raise HTTPException(status_code=400, detail=str(e))
+    if stored:
+        get_payment_inbox().notify()
+    return {"status": "ok"}
 
 
 @router.post("/mock-complete/{payment_id}")
@@ -27,6 +27,8 @@ class TaskFeedback(BaseModel):
     strengths: List[str]
     improvements: List[str]
     detailed_feedback: str
+    # Not a grade: the model wasn't reached (no API key / LLM error), score is a placeholder 0
+    fallback: bool = False
 
 
 class InterviewFeedback(BaseModel):
@@ -60,3 +62,38 @@ class InterviewSession(BaseModel):
     answers: List[dict]
     started_at: datetime
     status: str  # active, completed, abandoned
+
+
+class HistoryItem(BaseModel):
+    """Compact summary of a finished interview."""
+    session_id: str
+    completed_at: datetime
+    started_at: Optional[datetime] = None
+    specialization: Optional[str] = None
+    experience_level: Optional[str] = None
+    company_tier: Optional[str] = None
+    topic: Optional[str] = None
+    tasks_count: int
+    overall_score: int
+
+
+class HistoryPage(BaseModel):
+    """A page of interview history, newest first; pass next_cursor to get the next one."""
+    items: List[HistoryItem]
+    next_cursor: Optional[str] = None
+
+
+class HistoryTask(BaseModel):
+    """Per-task result in a history entry; answer and detailed_feedback only with detailed=true."""
+    task_id: Optional[int] = None
+    task_question: Optional[str] = None
+    score: Optional[int] = None
+    strengths: List[str] = []
+    improvements: List[str] = []
+    user_answer: Optional[str] = None
+    detailed_feedback: Optional[str] = None
+
+
+class HistoryDetail(HistoryItem):
+    """A finished interview with its task results."""
+    tasks: List[HistoryTask]
@@ -8,7 +8,7 @@ class TaskSelection(BaseModel):
     specialization: str  # product_analyst, data_analyst
     experience_level: str  # junior, middle, senior
     company_tier: str  # tier1, tier2
-    topic: str  # statistics, ab_testing, probability, python, sql, random
+    topic: str  # statistics, ab_testing, probability, python, sql, random, adaptive
 
 
 class TaskResponse(BaseModel):
@@ -0,0 +1,85 @@
+"""Response serialization: orjson by default, MessagePack on request.
+
+Typed response models are dumped once and encoded directly, bypassing FastAPI's
+response_model re-validation and jsonable_encoder pass.
+Clients that send `Accept: application/msgpack` get a MessagePack body, unless the header
+prefers JSON (q-values, then specificity, then order; `application/msgpack;q=0` is a refusal).
+"""
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+class MsgPackResponse(Response):
+    """MessagePack response (content must be msgpack-serializable, e.g. model_dump(mode="json"))."""
+    media_type = MSGPACK_MEDIA_TYPES[0]
+
+    def render(self, content: Any) -> bytes:
+        import msgpack
+
+        return msgpack.packb(content, use_bin_type=True)
+
+
+def _media_ranges(accept: str) -> list[tuple[str, float]]:
+    """Accept header → [(media range, q)] in header order; a malformed q counts as 0."""
+    ranges = []
+    for part in accept.split(","):
+        media_type, *params = (p.strip() for p in part.split(";"))
+        if not media_type:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    q = 0.0
+        ranges.append((media_type.lower(), q))
+    return ranges
+
+
+@lru_cache(maxsize=256)
+def _prefers_msgpack(accept: str) -> bool:
+    # (q, specificity, -position) of the best range for each format; higher wins
+    msgpack, json = None, None
+    for position, (media_type, q) in enumerate(_media_ranges(accept)):
+        if media_type in MSGPACK_MEDIA_TYPES:
+            key = (q, 2, -position)
+            msgpack = key if msgpack is None or key > msgpack else msgpack
+        elif media_type in ("application/json", "application/*", "*/*"):
+            key = (q, {"application/json": 2, "application/*": 1, "*/*": 0}[media_type], -position)
+            json = key if json is None or key > json else json
+    if msgpack is None or msgpack[0] <= 0:
+        return False
+    return json is None or msgpack > json
+
+
+def wants_msgpack(request: Request) -> bool:
+    """True if the Accept header prefers MessagePack to JSON."""
+    accept = request.headers.get("accept", "")
+    return bool(accept) and _prefers_msgpack(accept)
+
+
+def encode_json(model: BaseModel) -> bytes:
+    """Encode a response model with orjson (datetimes → ISO 8601)."""
+    return orjson.dumps(model.model_dump())
+
+
+def negotiated_response(request: Request, model: BaseModel, status_code: int = 200) -> Response:
+    """Serialize a typed response model as JSON (orjson) or MessagePack per the Accept header."""
+    headers = {"Vary": "Accept"}
+    if wants_msgpack(request):
+        return MsgPackResponse(model.model_dump(mode="json"), status_code=status_code, headers=headers)
+    return Response(
+        encode_json(model),
+        status_code=status_code,
+        headers=headers,
+        media_type=ORJSONResponse.media_type,
+    )
@@ -0,0 +1,288 @@
+"""Write-behind writer for llm_answers analytics rows.
+
+Rows in llm_answers are only used for quality validation and template tuning,
+so they are buffered in memory and flushed in batches (by size or by time)
+through a dedicated connection instead of the request's DB session.
+Each batch also updates the per-user topic rollup (user_topic_stats) in the same transaction.
+If the DB is unavailable, batches are spilled to a JSONL file and replayed later.
+Workers of one host share the spill file: appends and the rename before a replay hold an
+flock on <spill>.lock, and one worker at a time replays (<spill>.replay.lock).
+Rows are inserted with ON CONFLICT (feedback_id) DO NOTHING and only the inserted ones reach
+the rollup, so replaying a file again after a crash mid-replay doesn't count anything twice.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.config import get_settings
+from app.models.llm_answer import LLMAnswer
+from app.services.topic_stats import apply_topic_stats
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single process, the thread lock is enough
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_DATETIME_FIELDS = ("created_dttm",)
+
+
+@contextmanager
+def _file_lock(path: Path, blocking: bool = True) -> Iterator[bool]:
+    """Exclusive lock across processes; yields False if it is held and blocking=False."""
+    if fcntl is None:
+        yield True
+        return
+    with open(path, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class AnalyticsWriter:
+    """Bounded in-process queue of LLMAnswer rows with batched flushes."""
+
+    def __init__(
+        self,
+        database_url: str,
+        batch_size: int = 50,
+        flush_interval: float = 2.0,
+        max_buffer: int = 5000,
+        spill_path: Optional[str] = None,
+    ):
+        self.database_url = database_url
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_buffer = max(self.batch_size, max_buffer)
+        self.spill_path = Path(spill_path) if spill_path else None
+        self._buffer: deque[dict[str, Any]] = deque()
+        self._engine: Optional[AsyncEngine] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+        self._spills: set[asyncio.Future] = set()  # overflow batches being written by a thread
+        self._spill_lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of rows buffered in memory."""
+        return len(self._buffer)
+
+    def submit(self, record: dict[str, Any]) -> None:
+        """Queue one llm_answers row (column name → value). Never blocks on the DB."""
+        record.setdefault("created_dttm", datetime.utcnow())
+        if len(self._buffer) >= self.max_buffer:
+            # Memory bound reached (DB is slow or down): move the oldest batch to disk.
+            overflow = [self._buffer.popleft() for _ in range(self.batch_size)]
+            logger.warning("Analytics buffer full, spilling %d rows to disk", len(overflow))
+            self._spill_in_background(overflow)
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        """Open the dedicated connection pool and start the background flusher."""
+        if self._task is not None:
+            return
+        self._engine = create_async_engine(
+            self.database_url,
+            pool_size=1,
+            max_overflow=0,
+            pool_pre_ping=True,
+        )
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="analytics-writer")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop the flusher and drain everything still buffered (DB or spill file)."""
+        stuck = False
+        if self._task is not None:
+            # Let a flush in progress finish; cancel only one stuck on the DB (its batch is put back)
+            self._stopping = True
+            if self._wakeup is not None:
+                self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._task, timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Analytics flush still running after %g s, spilling the buffer", timeout)
+                stuck = True
+            self._task = None
+        if not stuck:
+            await self.flush()
+        if self._spills:
+            await asyncio.gather(*self._spills, return_exceptions=True)
+        if self._buffer:
+            self._spill(list(self._buffer))
+            self._buffer.clear()
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+    async def flush(self) -> None:
+        """Write buffered rows in batches; on DB failure spill them to disk."""
+        if self._engine is None or self._flush_lock is None:
+            return
+        async with self._flush_lock:
+            if not await self._replay_spill():
+                return
+            while self._buffer:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                try:
+                    await self._write_batch(batch)
+                except asyncio.CancelledError:
+                    self._buffer.extendleft(reversed(batch))  # not written: stop() spills it
+                    raise
+                except Exception:
+                    logger.exception("Analytics flush failed, spilling %d rows to disk", len(batch))
+                    await asyncio.to_thread(self._spill, batch)
+                    return
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Analytics writer iteration failed")
+
+    async def _write_batch(self, batch: list[dict[str, Any]]) -> None:
+        assert self._engine is not None
+        async with self._engine.begin() as conn:
+            result = await conn.execute(
+                pg_insert(LLMAnswer).on_conflict_do_nothing(index_elements=[LLMAnswer.feedback_id])
+                .returning(LLMAnswer.feedback_id),
+                batch,
+            )
+            inserted = set(result.scalars().all())
+            await apply_topic_stats(conn, (row for row in batch if row["feedback_id"] in inserted))
+
+    async def _replay_spill(self) -> bool:
+        """Re-insert rows spilled earlier. Returns False if the DB is still unavailable."""
+        if self.spill_path is None:
+            return True
+        if not self.spill_path.is_file() and not self._sibling(".replay").is_file():
+            return True
+        with _file_lock(self._sibling(".replay.lock"), blocking=False) as acquired:
+            if not acquired:
+                return True  # another worker is replaying
+            return await self._replay_spill_locked()
+
+    def _sibling(self, suffix: str) -> Path:
+        assert self.spill_path is not None
+        return self.spill_path.with_name(self.spill_path.name + suffix)
+
+    async def _replay_spill_locked(self) -> bool:
+        assert self.spill_path is not None
+        # The spill file is renamed first so that rows spilled meanwhile go to a fresh file;
+        # a leftover .replay file (crash during replay) is picked up on the next flush, its
+        # batches committed before the crash are skipped by ON CONFLICT.
+        replay_path = self._sibling(".replay")
+        if not replay_path.is_file():
+            if not self.spill_path.is_file():
+                return True
+            if not await asyncio.to_thread(self._take_spill, replay_path):
+                return True
+        rows = await asyncio.to_thread(self._read_spill, replay_path)
+        for i in range(0, len(rows), self.batch_size):
+            try:
+                await self._write_batch(rows[i:i + self.batch_size])
+            except Exception:
+                logger.warning("Analytics DB still unavailable, keeping spill file %s", self.spill_path)
+                await asyncio.to_thread(self._spill, rows[i:])
+                replay_path.unlink(missing_ok=True)
+                return False
+        replay_path.unlink(missing_ok=True)
+        logger.info("Replayed %d spilled analytics rows", len(rows))
+        return True
+
+    def _take_spill(self, replay_path: Path) -> bool:
+        """Rename the spill file for a replay (in a thread: waits for appenders). False if it's gone."""
+        assert self.spill_path is not None
+        with self._spill_lock, _file_lock(self._sibling(".lock")):
+            if not self.spill_path.is_file():
+                return False
+            self.spill_path.replace(replay_path)
+            return True
+
+    def _spill_in_background(self, rows: list[dict[str, Any]]) -> None:
+        """Spill from a thread: the file write and its flock stay off the event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # no loop (scripts): nothing to block
+            self._spill(rows)
+            return
+        future = loop.run_in_executor(None, self._spill, rows)
+        self._spills.add(future)
+        future.add_done_callback(self._spill_done)
+
+    def _spill_done(self, future: asyncio.Future) -> None:
+        self._spills.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Analytics spill failed", exc_info=future.exception())
+
+    def _spill(self, rows: list[dict[str, Any]]) -> None:
+        if self.spill_path is None:
+            logger.error("No analytics spill path configured, dropping %d rows", len(rows))
+            return
+        lines = [json.dumps(row, ensure_ascii=False, default=_json_default) + "\n" for row in rows]
+        with self._spill_lock, _file_lock(self._sibling(".lock")), \
+                open(self.spill_path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    @staticmethod
+    def _read_spill(path: Path) -> list[dict[str, Any]]:
+        rows = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                for key in _DATETIME_FIELDS:
+                    if isinstance(row.get(key), str):
+                        row[key] = datetime.fromisoformat(row[key])
+                rows.append(row)
+        return rows
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+@lru_cache()
+def get_analytics_writer() -> AnalyticsWriter:
+    """Get the process-wide analytics writer."""
+    settings = get_settings()
+    return AnalyticsWriter(
+        database_url=settings.database_url,
+        batch_size=settings.analytics_batch_size,
+        flush_interval=settings.analytics_flush_interval_seconds,
+        max_buffer=settings.analytics_max_buffer,
+        spill_path=settings.analytics_spill_path,
+    )
@@ -1,10 +1,9 @@
 """Authentication service: JWT + Argon2 password hashing (no length limit)."""
 import uuid
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
 from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
@@ -13,18 +12,26 @@ from app.config import get_settings
 from app.models.user import User
 
 settings = get_settings()
-_ph = PasswordHasher(time_cost=2, memory_cost=65536)  # reasonable for web app
+
+
+@lru_cache()
+def _password_hasher():
+    """Argon2 hasher, imported on first use to keep startup fast."""
+    from argon2 import PasswordHasher
+    return PasswordHasher(time_cost=2, memory_cost=65536)  # reasonable for web app
 
 
 def hash_password(password: str) -> str:
     """Hash password with Argon2 (supports any length)."""
-    return _ph.hash(password)
+    return _password_hasher().hash(password)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
     """Verify password against Argon2 hash."""
+    from argon2.exceptions import VerifyMismatchError
+
     try:
-        _ph.verify(hashed, plain)
+        _password_hasher().verify(hashed, plain)
         return True
     except VerifyMismatchError:
         return False
@@ -0,0 +1,114 @@
+"""Interview catalog (specializations, levels, tiers, topics) from llm_config.yaml.
+
+Responses are serialized to bytes once per config version and served with a
+strong ETag, so repeated requests cost a dict lookup (or a 304).
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import orjson
+
+from app.llm_config_loader import get_interview_catalog, get_llm_config_version
+
+# Fallbacks used when the section is missing in interview_catalog
+DEFAULT_CATALOG: dict[str, list[dict[str, str]]] = {
+    "specializations": [
+        {"id": "product_analyst", "name": "Product Analyst"},
+        {"id": "data_analyst", "name": "Data Analyst"},
+    ],
+    "experience_levels": [
+        {"id": "junior", "name": "Junior"},
+        {"id": "middle", "name": "Middle"},
+        {"id": "senior", "name": "Senior"},
+    ],
+    "company_tiers": [
+        {
+            "id": "tier1",
+            "name": "Tier 1",
+            "description": "Яндекс, VK, Тинькофф, Ozon, Avito и др.",
+        },
+        {
+            "id": "tier2",
+            "name": "Tier 2",
+            "description": "Крупные компании с сильными командами",
+        },
+    ],
+    "topics": [
+        {"id": "statistics", "name": "Статистика"},
+        {"id": "ab_testing", "name": "A/B тестирование"},
+        {"id": "probability", "name": "Теория вероятностей"},
+        {"id": "python", "name": "Python"},
+        {"id": "sql", "name": "SQL"},
+        {"id": "random", "name": "Рандом (микс тем)"},
+        {"id": "adaptive", "name": "Адаптивно (слабые темы)"},
+    ],
+}
+
+# Endpoint name → (response key, interview_catalog key)
+CATALOG_SECTIONS: dict[str, tuple[str, str]] = {
+    "specializations": ("specializations", "specializations"),
+    "experience-levels": ("levels", "experience_levels"),
+    "company-tiers": ("tiers", "company_tiers"),
+    "topics": ("topics", "topics"),
+}
+
+# Name of the bundled response with all sections
+CATALOG_BUNDLE = "catalog"
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """Pre-serialized JSON body with its strong ETag."""
+    body: bytes
+    etag: str
+
+
+_cache: Optional[tuple[str, dict[str, CatalogEntry]]] = None
+
+
+def _section(catalog: dict[str, Any], key: str) -> list:
+    val = catalog.get(key)
+    return val if isinstance(val, list) and val else DEFAULT_CATALOG[key]
+
+
+def _entry(payload: dict[str, Any]) -> CatalogEntry:
+    body = orjson.dumps(payload)
+    return CatalogEntry(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+def _build_entries() -> dict[str, CatalogEntry]:
+    catalog = get_interview_catalog()
+    bundle: dict[str, Any] = {}
+    entries: dict[str, CatalogEntry] = {}
+    for name, (response_key, catalog_key) in CATALOG_SECTIONS.items():
+        payload = {response_key: _section(catalog, catalog_key)}
+        entries[name] = _entry(payload)
+        bundle.update(payload)
+    entries[CATALOG_BUNDLE] = _entry(bundle)
+    return entries
+
+
+def get_catalog_entry(name: str) -> CatalogEntry:
+    """Get the serialized response for a catalog endpoint (rebuilt only when the config changes)."""
+    global _cache
+    version = get_llm_config_version()
+    if _cache is None or _cache[0] != version:
+        _cache = (version, _build_entries())
+    return _cache[1][name]
+
+
+def get_topic_ids() -> list[str]:
+    """Topic ids from the catalog, in config order."""
+    return [str(t["id"]) for t in _section(get_interview_catalog(), "topics") if isinstance(t, dict) and t.get("id")]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
@@ -0,0 +1,165 @@
+"""Interview history: finished interviews of a user (interview_reports) and their task results.
+
+The list is paged by keyset on (created_dttm, id), newest first, and is answered from the
+covering index ix_interview_reports_user_history, so a page costs the same for a user with
+five interviews or five thousand. The full report is stored with the row as zlib-compressed
+JSON (pack_report / unpack_report); for rows without it task results are read from llm_answers
+by session_id (they arrive through the analytics writer, up to one flush interval after /finish).
+"""
+import base64
+import binascii
+import zlib
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.interview_report import InterviewReport
+from app.models.llm_answer import LLMAnswer
+from app.schemas.interview import FinalReport, HistoryDetail, HistoryItem, HistoryPage, HistoryTask
+from app.serialization import encode_json
+
+# Columns of the list, all in ix_interview_reports_user_history
+HISTORY_COLUMNS = (
+    InterviewReport.id,
+    InterviewReport.session_id,
+    InterviewReport.created_dttm,
+    InterviewReport.started_dttm,
+    InterviewReport.specialization,
+    InterviewReport.experience_level,
+    InterviewReport.company_tier,
+    InterviewReport.topic,
+    InterviewReport.tasks_count,
+    InterviewReport.overall_score,
+)
+
+
+def pack_report(report: FinalReport) -> bytes:
+    """FinalReport → zlib-compressed JSON for interview_reports.report_blob."""
+    return zlib.compress(encode_json(report))
+
+
+def unpack_report(blob: bytes) -> FinalReport:
+    return FinalReport.model_validate_json(zlib.decompress(blob))
+
+
+def encode_cursor(created_dttm: datetime, report_id: int) -> str:
+    """Opaque cursor for the row after which the next page starts."""
+    raw = f"{created_dttm.isoformat()}|{report_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created, report_id = raw.split("|", 1)
+        return datetime.fromisoformat(created), int(report_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Некорректный курсор истории")
+
+
+def _item(row) -> HistoryItem:
+    return HistoryItem(
+        session_id=row.session_id,
+        completed_at=row.created_dttm,
+        started_at=row.started_dttm,
+        specialization=row.specialization,
+        experience_level=row.experience_level,
+        company_tier=row.company_tier,
+        topic=row.topic,
+        tasks_count=row.tasks_count,
+        overall_score=row.overall_score,
+    )
+
+
+class HistoryService:
+    """Read side of finished interviews."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_reports(self, user_id: str, limit: int, cursor: Optional[str] = None) -> HistoryPage:
+        """One page of the user's finished interviews, newest first."""
+        query = select(*HISTORY_COLUMNS).where(InterviewReport.user_id == user_id)
+        if cursor:
+            created, report_id = decode_cursor(cursor)
+            query = query.where(tuple_(InterviewReport.created_dttm, InterviewReport.id) < tuple_(created, report_id))
+        query = query.order_by(InterviewReport.created_dttm.desc(), InterviewReport.id.desc()).limit(limit + 1)
+        rows = (await self.db.execute(query)).all()
+        next_cursor = encode_cursor(rows[limit - 1].created_dttm, rows[limit - 1].id) if len(rows) > limit else None
+        return HistoryPage(items=[_item(r) for r in rows[:limit]], next_cursor=next_cursor)
+
+    async def get_item(self, user_id: str, session_id: str) -> Optional[HistoryItem]:
+        """Summary of the user's finished interview, None if there is none."""
+        row = (await self.db.execute(
+            select(*HISTORY_COLUMNS).where(
+                InterviewReport.session_id == session_id,
+                InterviewReport.user_id == user_id,
+            )
+        )).first()
+        return _item(row) if row is not None else None
+
+    async def get_final_report(self, user_id: str, session_id: str) -> Optional[FinalReport]:
+        """Stored final report of the user's interview, None if there is none."""
+        blob = (await self.db.execute(
+            select(InterviewReport.report_blob).where(
+                InterviewReport.session_id == session_id,
+                InterviewReport.user_id == user_id,
+            )
+        )).scalar_one_or_none()
+        return unpack_report(blob) if blob else None
+
+    async def get_report(self, user_id: str, session_id: str, detailed: bool = False) -> Optional[HistoryDetail]:
+        """A finished interview with task results; None if it doesn't exist or isn't the user's."""
+        row = (await self.db.execute(
+            select(*HISTORY_COLUMNS, InterviewReport.report_blob).where(
+                InterviewReport.session_id == session_id,
+                InterviewReport.user_id == user_id,
+            )
+        )).first()
+        if row is None:
+            return None
+        if row.report_blob:
+            tasks = [
+                HistoryTask(
+                    task_id=fb.task_id,
+                    task_question=fb.task_question,
+                    score=fb.score,
+                    strengths=fb.strengths,
+                    improvements=fb.improvements,
+                    user_answer=fb.user_answer if detailed else None,
+                    detailed_feedback=fb.detailed_feedback if detailed else None,
+                )
+                for fb in unpack_report(row.report_blob).task_feedbacks
+            ]
+            return HistoryDetail(**_item(row).model_dump(), tasks=tasks)
+
+        feedback = LLMAnswer.feedback_json
+        columns = [
+            LLMAnswer.task_id,
+            feedback["task_question"].as_string(),
+            feedback["score"].as_integer(),
+            feedback["strengths"],
+            feedback["improvements"],
+        ]
+        if detailed:
+            columns += [LLMAnswer.user_answer, LLMAnswer.provided_feedback]
+        answers = (await self.db.execute(
+            select(*columns)
+            .where(LLMAnswer.session_id == session_id, LLMAnswer.user_id == user_id)
+            .order_by(LLMAnswer.id)
+        )).all()
+        tasks = [
+            HistoryTask(
+                task_id=a[0],
+                task_question=a[1],
+                score=a[2],
+                strengths=a[3] or [],
+                improvements=a[4] or [],
+                user_answer=a[5] if detailed else None,
+                detailed_feedback=a[6] if detailed else None,
+            )
+            for a in answers
+        ]
+        return HistoryDetail(**_item(row).model_dump(), tasks=tasks)
@@ -1,20 +1,50 @@
 """Interview orchestration service."""
+import asyncio
+import random
 import uuid
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timedelta
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import aliased
 
+from app.config import get_settings
+from app.database import async_session_maker
+from app.models.interview_report import InterviewReport
 from app.models.task import Task
-from app.models.llm_answer import LLMAnswer
 from app.models.user import User
 from app.schemas.task import TaskSelection, TaskResponse
-from app.schemas.interview import TaskFeedback
+from app.schemas.interview import FinalReport, TaskFeedback
+from app.services.analytics_writer import get_analytics_writer
+from app.services.catalog import get_topic_ids
+from app.services.history import HistoryService, pack_report
 from app.services.llm import LLMService
+from app.services.prescorer import warm_references
+from app.services.session_store import get_session_store
+from app.services.topic_stats import TOPIC_ADAPTIVE, TOPIC_RANDOM, load_topic_stats, sample_topics, topic_weights
+from app.tracing import span
 
 
-# In-memory session storage (use Redis in production)
-_sessions: dict[str, dict] = {}
+# session_id → report being generated (single flight for concurrent /finish calls of this process;
+# across workers the session itself is claimed, status "finishing")
+_finishing: dict[str, asyncio.Future] = {}
+# How often a /finish waiting for another worker's claim looks at the session again
+FINISH_POLL_SECONDS = 0.5
+
+
+def count_sessions_by_status() -> dict[str, int]:
+    """Number of sessions held by this process per status (for /metrics)."""
+    return get_session_store().count_by_status()
+
+
+def _forget_finishing(session_id: str):
+    def done(future: asyncio.Future) -> None:
+        _finishing.pop(session_id, None)
+        if not future.cancelled():
+            future.exception()  # mark retrieved: the caller that started it may have gone away
+    return done
 
 
 class InterviewService:
@@ -23,6 +53,8 @@ class InterviewService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.llm_service = LLMService()
+        self.sessions = get_session_store()
+        self.finish_claim_seconds = get_settings().finish_claim_seconds
     
     async def start_interview(
         self,
@@ -40,13 +72,14 @@ class InterviewService:
             raise ValueError("Нет доступных вопросов. Приобретите пакет вопросов.")
         
         # Get tasks based on selection
-        tasks = await self._select_tasks(selection)
+        tasks = await self._select_tasks(selection, user.user_id)
         if len(tasks) < 1:
             raise ValueError("Недостаточно задач для выбранных параметров.")
         
         # Limit tasks to user's question balance (max 3 per session)
         max_tasks = min(3, questions_left, len(tasks))
         tasks = tasks[:max_tasks]
+        warm_references(t.task_answer for t in tasks)
         
         # Create session
         session_id = str(uuid.uuid4())
@@ -69,7 +102,7 @@ class InterviewService:
             "status": "active",
         }
         
-        _sessions[session_id] = session
+        await self.sessions.save(session)
         
         # Create task responses
         total = len(tasks)
@@ -86,18 +119,28 @@ class InterviewService:
         
         return session_id, task_responses
     
-    async def _select_tasks(self, selection: TaskSelection) -> List[Task]:
+    async def _select_tasks(self, selection: TaskSelection, user_id: Optional[str] = None) -> List[Task]:
         """Select tasks based on user preferences."""
         tier_filters = [selection.company_tier, "common"]
         level_filters = [selection.experience_level, "common"]
-
-        query = select(Task).where(
+        conditions = [
+            Task.retired_at.is_(None),
             Task.company_tier.in_(tier_filters),
             Task.employee_level.in_(level_filters),
             Task.type == selection.specialization,
-        )
-        
-        if selection.topic != "random":
+        ]
+
+        if selection.topic == TOPIC_ADAPTIVE and user_id:
+            tasks = await self._select_adaptive_tasks(user_id, conditions)
+            if len(tasks) >= 3:
+                return tasks
+            # Not enough tasks in the weak topics: top up like "random"
+            query = select(Task).where(*conditions, Task.task_id.notin_([t.task_id for t in tasks]))
+            result = await self.db.execute(query.order_by(func.random()).limit(3 - len(tasks)))
+            return tasks + list(result.scalars().all())
+
+        query = select(Task).where(*conditions)
+        if selection.topic not in (TOPIC_RANDOM, TOPIC_ADAPTIVE):
             query = query.where(Task.subtype == selection.topic)
         
         # Randomize and limit to 3
@@ -107,9 +150,10 @@ class InterviewService:
         tasks = result.scalars().all()
         
         # If random topic, ensure variety
-        if selection.topic == "random" and len(tasks) < 3:
+        if selection.topic in (TOPIC_RANDOM, TOPIC_ADAPTIVE) and len(tasks) < 3:
             # Fallback: get any tasks matching tier and level
             fallback_query = select(Task).where(
+                Task.retired_at.is_(None),
                 Task.company_tier.in_(tier_filters),
                 Task.employee_level.in_(level_filters),
             ).order_by(func.random()).limit(3)
@@ -118,14 +162,41 @@ class InterviewService:
             tasks = result.scalars().all()
         
         return list(tasks)
+
+    async def _select_adaptive_tasks(self, user_id: str, conditions: list) -> List[Task]:
+        """Up to 3 tasks from subtypes sampled by the user's rollup (weaker topic → more likely)."""
+        subtypes = [t for t in get_topic_ids() if t not in (TOPIC_RANDOM, TOPIC_ADAPTIVE)]
+        stats = await load_topic_stats(self.db, user_id)
+        quota = Counter(sample_topics(topic_weights(stats, subtypes), 3))
+        if not quota:
+            return []
+
+        # At most 3 random tasks per sampled subtype in one query
+        ranked = select(
+            Task,
+            func.row_number().over(partition_by=Task.subtype, order_by=func.random()).label("rn"),
+        ).where(*conditions, Task.subtype.in_(list(quota))).subquery()
+        task_alias = aliased(Task, ranked)
+        result = await self.db.execute(select(task_alias).where(ranked.c.rn <= 3))
+        candidates = list(result.scalars().all())
+
+        picked, rest = [], []
+        for task in candidates:
+            if quota[task.subtype] > 0:
+                quota[task.subtype] -= 1
+                picked.append(task)
+            else:
+                rest.append(task)
+        picked.extend(rest[:3 - len(picked)])
+        random.shuffle(picked)
+        return picked
     
-    def get_session(self, session_id: str) -> Optional[dict]:
+    async def get_session(self, session_id: str) -> Optional[dict]:
         """Get session by ID."""
-        return _sessions.get(session_id)
+        return await self.sessions.get(session_id)
     
-    def get_current_task(self, session_id: str) -> Optional[dict]:
-        """Get current task for session."""
-        session = _sessions.get(session_id)
+    def get_current_task(self, session: Optional[dict]) -> Optional[dict]:
+        """Get current task of a session."""
         if not session or session["status"] != "active":
             return None
         
@@ -149,9 +220,9 @@ class InterviewService:
         task_id: int,
         answer: str,
         user: User,
-    ) -> None:
-        """Сохранить ответ без LLM; разбор всех задач — при завершении интервью."""
-        session = _sessions.get(session_id)
+    ) -> dict:
+        """Сохранить ответ без LLM; разбор всех задач — при завершении интервью. Returns the session."""
+        session = await self.sessions.get(session_id)
         if not session:
             raise ValueError("Session not found")
         
@@ -170,42 +241,144 @@ class InterviewService:
             "submitted_at": datetime.utcnow().isoformat(),
         })
         session["current_task_index"] += 1
+        await self.sessions.save(session)
+        return session
     
-    async def _save_feedback(
+    def _save_feedback(
         self,
         user: User,
         task_id: int,
         user_answer: str,
         feedback: TaskFeedback,
+        session_id: Optional[str] = None,
     ):
-        """Save feedback to database for quality tracking."""
-        llm_answer = LLMAnswer(
-            user_id=user.user_id,
-            feedback_id=str(uuid.uuid4()),
-            feedback_json=feedback.model_dump(),
-            provided_feedback=feedback.detailed_feedback,
-            task_id=task_id,
-            user_answer=user_answer,
+        """Queue feedback for quality tracking (written in the background, see analytics_writer)."""
+        get_analytics_writer().submit(
+            {
+                "user_id": user.user_id,
+                "session_id": session_id,
+                "feedback_id": str(uuid.uuid4()),
+                "feedback_json": feedback.model_dump(),
+                "provided_feedback": feedback.detailed_feedback,
+                "task_id": task_id,
+                "user_answer": user_answer,
+            }
         )
-        self.db.add(llm_answer)
-        await self.db.flush()
     
     async def finish_interview(
         self,
         session_id: str,
         user: User,
-    ) -> dict:
-        """Завершить интервью: один вызов LLM по всем ответам, затем итоговый отчёт."""
-        session = _sessions.get(session_id)
-        if not session:
-            raise ValueError("Session not found")
-
-        if session["status"] == "completed":
+    ) -> FinalReport:
+        """
+        Завершить интервью: один вызов LLM по всем ответам, затем итоговый отчёт.
+        The report is stored (interview_reports.report_blob); repeated calls return it,
+        and concurrent calls for the same session share one LLM call (on any worker).
+        """
+        session = await self.sessions.get(session_id)
+        if session is None or session["status"] == "completed":
+            stored = await HistoryService(self.db).get_final_report(user.user_id, session_id)
+            if stored is not None:
+                return stored
+            if session is None:
+                raise ValueError("Session not found")
             raise ValueError("Интервью уже завершено")
 
+        pending = _finishing.get(session_id)
+        if pending is None:
+            pending = asyncio.ensure_future(self._finish(session, user))
+            _finishing[session_id] = pending
+            pending.add_done_callback(_forget_finishing(session_id))
+        # Shielded: a client that disconnects doesn't cancel the LLM call others are waiting on
+        return await asyncio.shield(pending)
+
+    async def get_report(self, session_id: str, user: User) -> Optional[FinalReport]:
+        """Final report of a finished interview (waits for a /finish in progress on any worker)."""
+        session = await self.sessions.get(session_id)
+        if session is None or session["user_id"] != user.user_id:
+            return await HistoryService(self.db).get_final_report(user.user_id, session_id)
+        pending = _finishing.get(session_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        _, stored = await self._await_claim(session)
+        return stored
+
+    async def _finish(self, session: dict, user: User) -> FinalReport:
         if not session.get("answers"):
             raise ValueError("Нет сохранённых ответов для отчёта")
+        session, stored = await self._claim(session)
+        if stored is not None:
+            return stored  # finished by another worker
+        try:
+            return await self._generate_report(session, user)
+        except Exception:
+            await self._release(session)
+            raise
+
+    async def _claim(self, session: dict) -> tuple[Optional[dict], Optional[FinalReport]]:
+        """
+        Claim the session for report generation across workers: a versioned save with
+        status "finishing", so only one worker calls the LLM. Returns (claimed session, None),
+        or (None, report) if another worker finished it meanwhile. A claim older than
+        FINISH_CLAIM_SECONDS (its worker died) is taken over.
+        """
+        session_id, user_id = session["session_id"], session["user_id"]
+        while True:
+            current, stored = await self._await_claim(session)
+            if current is not None:
+                claimed = dict(current, status="finishing", finishing_at=datetime.utcnow().isoformat())
+                try:
+                    await self.sessions.save(claimed)
+                    return claimed, None
+                except ValueError:
+                    # Another worker saved the session first (its claim, an answer): look again
+                    current, stored = await self._reload(session_id, user_id)
+            if current is None:
+                if stored is None:
+                    raise ValueError("Session not found")
+                return None, stored
+            session = current
+
+    async def _await_claim(self, session: dict) -> tuple[Optional[dict], Optional[FinalReport]]:
+        """
+        Wait while another worker holds the session's finishing claim. Returns (None, report)
+        once the report is stored, else (session, None): not claimed, released or expired.
+        """
+        session_id, user_id = session["session_id"], session["user_id"]
+        while session["status"] == "finishing" and not self._claim_expired(session):
+            await asyncio.sleep(FINISH_POLL_SECONDS)
+            current, stored = await self._reload(session_id, user_id)
+            if current is None:
+                return None, stored
+            session = current
+        return session, None
+
+    def _claim_expired(self, session: dict) -> bool:
+        claimed_at = session.get("finishing_at")
+        if claimed_at is None:
+            return True
+        return datetime.utcnow() - datetime.fromisoformat(claimed_at) > timedelta(seconds=self.finish_claim_seconds)
+
+    async def _reload(self, session_id: str, user_id: str) -> tuple[Optional[dict], Optional[FinalReport]]:
+        """(session, None) while it is in the store, else (None, its stored report or None)."""
+        session = await self.sessions.get(session_id)
+        if session is not None:
+            return session, None
+        # Own short transaction: this runs between sleeps
+        async with async_session_maker() as db:
+            return None, await HistoryService(db).get_final_report(user_id, session_id)
 
+    async def _release(self, session: dict) -> None:
+        """Give the claim back: the session is active again and a later /finish retries."""
+        session["status"] = "active"
+        session.pop("finishing_at", None)
+        try:
+            await self.sessions.save(session)
+        except ValueError:
+            pass  # the claim expired and another worker took the session over
+
+    async def _generate_report(self, session: dict, user: User) -> FinalReport:
+        session_id = session["session_id"]
         tasks_by_id = {t["task_id"]: t for t in session["tasks"]}
         items: list[dict] = []
         for ans in session["answers"]:
@@ -231,27 +404,67 @@ class InterviewService:
             selection=session["selection"],
         )
 
-        for fb in task_feedbacks:
-            await self._save_feedback(user, fb.task_id, fb.user_answer, fb)
+        final_report = FinalReport(
+            session_id=session_id,
+            overall_score=report.get("overall_score", 0),
+            task_feedbacks=task_feedbacks,
+            overall_strengths=report.get("overall_strengths", []),
+            areas_to_improve=report.get("areas_to_improve", []),
+            study_recommendations=report.get("study_recommendations", []),
+            motivational_message=report.get("motivational_message", ""),
+            completed_at=datetime.utcnow(),
+        )
+        # The model wasn't reached (no API key / LLM error): the error report is only returned
+        fallback = any(fb.fallback for fb in task_feedbacks)
+        if not fallback:
+            # Stored before the session is deleted, so a repeated /finish always finds it
+            stored = await self._save_report(session, final_report)
+            if stored is not None:
+                return stored  # another worker finished this session concurrently
 
-        session["status"] = "completed"
+        with span("interview.save_feedback", count=len(task_feedbacks)):
+            for fb in task_feedbacks:
+                self._save_feedback(user, fb.task_id, fb.user_answer, fb, session_id)
 
-        feedback_payload = [fb.model_dump() for fb in task_feedbacks]
+        if fallback:
+            # Nothing stored and the session stays active: a later /finish asks the model again
+            await self._release(session)
+            return final_report
 
-        return {
-            "session_id": session_id,
-            "overall_score": report.get("overall_score", 0),
-            "task_feedbacks": feedback_payload,
-            "overall_strengths": report.get("overall_strengths", []),
-            "areas_to_improve": report.get("areas_to_improve", []),
-            "study_recommendations": report.get("study_recommendations", []),
-            "motivational_message": report.get("motivational_message", ""),
-            "completed_at": datetime.utcnow().isoformat(),
-        }
+        # The report is the record from here on (GET /session/{id} falls back to history)
+        session["status"] = "completed"
+        await self.sessions.delete(session_id)
+        return final_report
+
+    async def _save_report(self, session: dict, report: FinalReport) -> Optional[FinalReport]:
+        """
+        Store the report and add the interview to the user's history (own transaction).
+        Returns the report already stored for the session if there is one (it is kept).
+        """
+        selection = session.get("selection") or {}
+        started = session.get("started_at")
+        with span("interview.save_report"):
+            async with async_session_maker() as db:
+                inserted = await db.execute(pg_insert(InterviewReport).values(
+                    session_id=report.session_id,
+                    user_id=session["user_id"],
+                    created_dttm=report.completed_at,
+                    started_dttm=datetime.fromisoformat(started) if started else None,
+                    specialization=selection.get("specialization"),
+                    experience_level=selection.get("experience_level"),
+                    company_tier=selection.get("company_tier"),
+                    topic=selection.get("topic"),
+                    tasks_count=len(report.task_feedbacks),
+                    overall_score=report.overall_score,
+                    report_blob=pack_report(report),
+                ).on_conflict_do_nothing(index_elements=[InterviewReport.session_id]).returning(InterviewReport.id))
+                if inserted.scalar_one_or_none() is not None:
+                    await db.commit()
+                    return None
+                return await HistoryService(db).get_final_report(session["user_id"], report.session_id)
     
-    def can_continue(self, session_id: str) -> tuple[bool, int, int]:
+    def can_continue(self, session: Optional[dict]) -> tuple[bool, int, int]:
         """Check if user can continue to next task."""
-        session = _sessions.get(session_id)
         if not session:
             return False, 0, 0
         
@@ -1,8 +1,8 @@
 """LLM service: один вызов в конце интервью; OpenAI API; настройки из llm_config.yaml."""
 import json
-from typing import Any
-
-from openai import AsyncOpenAI
+import time
+from functools import lru_cache
+from typing import Any, Optional
 
 from app.llm_config_loader import (
     get_full_interview_system_prompt,
@@ -10,9 +10,14 @@ from app.llm_config_loader import (
     get_max_tokens_openai_full_interview,
     get_openai_base_url,
     get_openai_model,
+    get_prompt_version,
     resolve_openai_api_key,
 )
+from app.llm_telemetry import LLMCallRecord, get_llm_telemetry
+from app.metrics import observe_llm_call, observe_prescored
 from app.schemas.interview import TaskFeedback
+from app.services.prescorer import PRESCORE_VERBATIM, prescore_items
+from app.tracing import span
 
 
 def build_full_interview_user_message(items: list[dict[str, Any]], selection: dict) -> str:
@@ -66,19 +71,41 @@ def build_full_interview_user_message(items: list[dict[str, Any]], selection: di
     return "\n".join(lines)
 
 
+@lru_cache(maxsize=4)
+def _openai_client(key: str, base_url: str):
+    from openai import AsyncOpenAI  # тяжёлый импорт — только когда ключ задан
+
+    kwargs: dict[str, Any] = {"api_key": key}
+    if base_url:
+        kwargs["base_url"] = base_url
+    return AsyncOpenAI(**kwargs)
+
+
+def get_openai_client():
+    """
+    Process-wide AsyncOpenAI client (one connection pool per worker), or None without a key.
+    Keyed by key and base URL, so a hot-reloaded llm_config.yaml gets a new client.
+    """
+    key = resolve_openai_api_key()
+    if not key:
+        return None
+    return _openai_client(key, get_openai_base_url() or "")
+
+
+def _score(value: Any) -> int:
+    """Балл модели → int в 0..100 (вне диапазона — к границе, нечисловой — 0)."""
+    try:
+        score = round(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return 0
+    return min(100, max(0, score))
+
+
 class LLMService:
     """Генерация полного фидбека по всем ответам одним запросом к OpenAI."""
 
     def __init__(self) -> None:
-        key = resolve_openai_api_key()
-        if not key:
-            self.openai_client = None
-            return
-        base = get_openai_base_url()
-        kwargs: dict[str, Any] = {"api_key": key}
-        if base:
-            kwargs["base_url"] = base
-        self.openai_client = AsyncOpenAI(**kwargs)
+        self.openai_client = get_openai_client()
 
     def _missing_key_message(self) -> str:
         return (
@@ -94,30 +121,104 @@ class LLMService:
         """
         items: каждый элемент — task_id, task_question, task_answer (опц.), user_answer, subtype.
         Возвращает (список TaskFeedback, поля итогового отчёта для JSON ответа).
+        Тривиальные ответы (пустые, почти пустые, копия эталона) оцениваются локально
+        и в промпт не попадают; если тривиальны все — модель не вызывается.
         """
+        with span("llm.prescore", items=len(items)) as sp:
+            prescored = prescore_items(items)
+            llm_items = [it for it, (verdict, _) in zip(items, prescored) if verdict is None]
+            if sp is not None:
+                sp.attributes["prescored"] = len(items) - len(llm_items)
+        for verdict, _ in prescored:
+            if verdict:
+                observe_prescored(verdict)
+        if len(llm_items) == len(items):
+            return await self._generate_llm_bundle(items, selection)
+        if not llm_items:
+            return self._merge_bundle(prescored, [], None)
+        feedbacks, report = await self._generate_llm_bundle(
+            llm_items, selection, prescored_items=len(items) - len(llm_items),
+        )
+        return self._merge_bundle(prescored, feedbacks, report)
+
+    async def _generate_llm_bundle(
+        self,
+        items: list[dict[str, Any]],
+        selection: dict,
+        prescored_items: int = 0,
+    ) -> tuple[list[TaskFeedback], dict[str, Any]]:
+        """Один запрос к модели по items (или fallback без ключа / при ошибке)."""
         system_prompt = get_full_interview_system_prompt()
         temperature = get_full_interview_temperature()
         user_prompt = build_full_interview_user_message(items, selection)
+        call = LLMCallRecord(
+            ts=time.time(),
+            endpoint=get_openai_base_url() or "api.openai.com",
+            model=get_openai_model(),
+            prompt_version=get_prompt_version(),
+            outcome="success",
+            fallback=False,
+            item_count=len(items),
+            answer_chars=sum(len(str(it.get("user_answer", ""))) for it in items),
+            prompt_chars=len(system_prompt) + len(user_prompt),
+            max_tokens=get_max_tokens_openai_full_interview(),
+            wall_ms=0.0,
+            prescored_items=prescored_items,
+        )
 
         if not self.openai_client:
+            self._record_call(call, "fallback_no_key")
             return self._fallback_bundle(items, self._missing_key_message())
-        try:
-            response = await self.openai_client.chat.completions.create(
-                model=get_openai_model(),
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                response_format={"type": "json_object"},
-                temperature=temperature,
-                max_tokens=get_max_tokens_openai_full_interview(),
-            )
-            raw = response.choices[0].message.content
-            result = json.loads(raw or "{}")
-        except Exception as e:
-            return self._fallback_bundle(items, self._format_llm_error(e))
+        started = time.perf_counter()
+        response = None
+        with span("llm.chat_completion", model=call.model, items=call.item_count) as sp:
+            try:
+                response = await self.openai_client.chat.completions.create(
+                    model=call.model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=temperature,
+                    max_tokens=call.max_tokens,
+                )
+                raw = response.choices[0].message.content
+                result = json.loads(raw or "{}")
+            except Exception as e:
+                call.wall_ms = (time.perf_counter() - started) * 1000
+                call.error = type(e).__name__
+                self._record_call(call, "fallback_error", response)
+                if sp is not None:
+                    sp.error = call.error
+                return self._fallback_bundle(items, self._format_llm_error(e))
+            call.wall_ms = (time.perf_counter() - started) * 1000
+            self._record_call(call, "success", response)
+            if sp is not None:
+                sp.attributes.update(
+                    completion_tokens=call.completion_tokens or 0,
+                    finish_reason=call.finish_reason or "",
+                )
 
-        return self._normalize_bundle(items, result)
+        with span("llm.normalize_bundle"):
+            return self._normalize_bundle(items, result)
+
+    @staticmethod
+    def _record_call(call: LLMCallRecord, outcome: str, response: Any = None) -> None:
+        """Метрики + телеметрия вызова: токены, finish_reason, модель из ответа API."""
+        call.outcome = outcome
+        call.fallback = outcome != "success"
+        if response is not None:
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                call.prompt_tokens = getattr(usage, "prompt_tokens", None)
+                call.completion_tokens = getattr(usage, "completion_tokens", None)
+            choices = getattr(response, "choices", None) or []
+            if choices:
+                call.finish_reason = getattr(choices[0], "finish_reason", None)
+            call.model = getattr(response, "model", None) or call.model
+        observe_llm_call(outcome, call.wall_ms / 1000)
+        get_llm_telemetry().record(call)
 
     def _normalize_bundle(
         self,
@@ -133,7 +234,7 @@ class LLMService:
                     task_id=int(it["task_id"]),
                     task_question=str(it.get("task_question", "")),
                     user_answer=str(it.get("user_answer", "")),
-                    score=int(block.get("score", 0)),
+                    score=_score(block.get("score", 0)),
                     strengths=list(block.get("strengths") or []),
                     improvements=list(block.get("improvements") or []),
                     detailed_feedback=str(
@@ -143,7 +244,7 @@ class LLMService:
                 )
             )
         report = {
-            "overall_score": int(result.get("overall_score", 0)),
+            "overall_score": _score(result.get("overall_score", 0)),
             "overall_strengths": list(result.get("overall_strengths") or []),
             "areas_to_improve": list(result.get("areas_to_improve") or []),
             "study_recommendations": list(result.get("study_recommendations") or []),
@@ -159,6 +260,38 @@ class LLMService:
             report["motivational_message"] = "Спасибо за участие. Анализируйте разбор и пробуйте снова."
         return feedbacks, report
 
+    @staticmethod
+    def _merge_bundle(
+        prescored: list[tuple[Optional[str], Optional[TaskFeedback]]],
+        llm_feedbacks: list[TaskFeedback],
+        llm_report: Optional[dict[str, Any]],
+    ) -> tuple[list[TaskFeedback], dict[str, Any]]:
+        """Собрать фидбек в исходном порядке задач; overall_score — среднее по всем задачам."""
+        llm_iter = iter(llm_feedbacks)
+        feedbacks = [fb if fb is not None else next(llm_iter) for _, fb in prescored]
+        verdicts = [verdict for verdict, _ in prescored if verdict]
+        trivial = sum(1 for v in verdicts if v != PRESCORE_VERBATIM)
+        if llm_report is not None:
+            local_total = sum(fb.score for verdict, fb in prescored if verdict)
+            overall = (llm_report["overall_score"] * len(llm_feedbacks) + local_total) / len(feedbacks)
+            report = dict(llm_report, overall_score=round(overall))
+        else:
+            report = {
+                "overall_score": round(sum(fb.score for fb in feedbacks) / len(feedbacks)),
+                "overall_strengths": (
+                    ["Ответы совпадают с эталонными по содержанию."] if trivial < len(verdicts)
+                    else ["Вы дошли до конца интервью."]
+                ),
+                "areas_to_improve": ["Отвечайте своими словами: ход рассуждений, метрики, примеры из практики."],
+                "study_recommendations": ["Повторите темы вопросов и пройдите интервью ещё раз с развёрнутыми ответами."],
+                "motivational_message": "Развёрнутые ответы получат подробный разбор — попробуйте ещё раз!",
+            }
+        if trivial:
+            report["areas_to_improve"] = [
+                f"Пустых или слишком коротких ответов: {trivial} — они оценены минимальным баллом без разбора."
+            ] + list(report["areas_to_improve"])
+        return feedbacks, report
+
     @staticmethod
     def _format_llm_error(exc: Exception) -> str:
         raw = str(exc)
@@ -186,6 +319,7 @@ class LLMService:
                 strengths=[],
                 improvements=["Не удалось получить оценку от модели"],
                 detailed_feedback=f"Ошибка LLM: {error_text}",
+                fallback=True,
             )
             for it in items
         ]
@@ -1,14 +1,15 @@
 """Payment service using YooKassa."""
-import asyncio
 import uuid
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import String, case, column, func, select, update, values
 
 from app.config import get_settings
 from app.models.payment import Payment
 from app.models.user import User
 from app.schemas.payment import PricingPlan, PaymentCreate, PaymentResponse
+from app.services.yookassa_client import YooKassaError, get_yookassa_client
+from app.tracing import span
 
 settings = get_settings()
 
@@ -38,15 +39,7 @@ class PaymentService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        self._init_yookassa()
-    
-    def _init_yookassa(self):
-        """Initialize YooKassa configuration."""
-        shop_id = (settings.yookassa_shop_id or "").strip()
-        secret_key = (settings.yookassa_secret_key or "").strip()
-        if shop_id and secret_key:
-            from yookassa import Configuration
-            Configuration.configure(shop_id, secret_key)
+        self.yookassa = get_yookassa_client()
     
     def get_pricing_plans(self) -> list[PricingPlan]:
         """Get all available pricing plans."""
@@ -65,13 +58,8 @@ class PaymentService:
 
         return_url = payment_data.return_url or f"{settings.frontend_url}/payment/success"
 
-        shop_id = (settings.yookassa_shop_id or "").strip()
-        secret_key = (settings.yookassa_secret_key or "").strip()
-        if shop_id and secret_key:
+        if self.yookassa.configured:
             # Create real YooKassa payment
-            from yookassa import Payment as YKPayment
-            from requests.exceptions import HTTPError
-
             payload = {
                 "amount": {
                     "value": f"{plan.price:.2f}",
@@ -89,22 +77,17 @@ class PaymentService:
                 },
             }
             try:
-                yookassa_payment = await asyncio.to_thread(YKPayment.create, payload)
-            except HTTPError as e:
-                if e.response is not None and e.response.status_code == 401:
+                yookassa_payment = await self.yookassa.create_payment(payload)
+            except YooKassaError as e:
+                if e.status_code == 401:
                     raise ValueError(
                         "ЮKassa вернула 401: проверьте YOOKASSA_SHOP_ID и YOOKASSA_SECRET_KEY в .env "
                         "(без пробелов и переносов строк). Ключи возьмите в ЛК ЮKassa → Настройки → Ключи API."
                     ) from e
                 raise ValueError(f"Ошибка ЮKassa: {e}") from e
-            payment_id = yookassa_payment.id
-            confirmation = getattr(yookassa_payment, "confirmation", None)
-            if confirmation is None:
-                confirmation_url = return_url
-            elif isinstance(confirmation, dict):
-                confirmation_url = confirmation.get("confirmation_url") or return_url
-            else:
-                confirmation_url = getattr(confirmation, "confirmation_url", None) or return_url
+            payment_id = yookassa_payment["id"]
+            confirmation = yookassa_payment.get("confirmation") or {}
+            confirmation_url = confirmation.get("confirmation_url") or return_url
         else:
             # Fallback: mock payment when YooKassa credentials are not set
             payment_id = str(uuid.uuid4())
@@ -122,7 +105,8 @@ class PaymentService:
             ip_address=ip_address,
         )
         self.db.add(payment)
-        await self.db.flush()
+        with span("payment.save", plan=plan.plan_id):
+            await self.db.flush()
 
         return PaymentResponse(
             payment_id=payment_id,
@@ -132,69 +116,75 @@ class PaymentService:
             currency=plan.currency,
         )
     
-    async def process_webhook(self, webhook_data: dict) -> bool:
-        """Process YooKassa webhook notification."""
-        event_type = webhook_data.get("event")
-        payment_object = webhook_data.get("object", {})
-        
-        if event_type != "payment.succeeded":
-            return True  # Ignore other events
-        
-        payment_id = payment_object.get("id")
-        metadata = payment_object.get("metadata", {})
-        
-        # Find payment in database
-        result = await self.db.execute(
-            select(Payment).where(Payment.transaction_id == payment_id)
-        )
-        payment = result.scalar_one_or_none()
-        
-        if not payment:
-            return False
-        
-        # Update payment status
-        payment.status = "succeeded"
-        payment.payment_type = payment_object.get("payment_method", {}).get("type")
-        
-        # Credit questions to user
-        plan = PRICING_PLANS.get(payment.product_id)
-        if plan:
-            result = await self.db.execute(
-                select(User).where(User.user_id == payment.user_id)
-            )
-            user = result.scalar_one_or_none()
-            
-            if user:
-                user.paid_questions_number_left += plan.questions_count
-        
-        await self.db.flush()
-        return True
-    
     async def mock_complete_payment(self, payment_id: str) -> bool:
         """
         Mock payment completion for development.
         In production, this would be handled by YooKassa webhook.
         """
-        result = await self.db.execute(
-            select(Payment).where(Payment.transaction_id == payment_id)
-        )
-        payment = result.scalar_one_or_none()
-        
-        if not payment:
-            return False
-        
-        payment.status = "succeeded"
-        
-        # Credit questions to user
-        plan = PRICING_PLANS.get(payment.product_id)
-        if plan:
-            result = await self.db.execute(
-                select(User).where(User.user_id == payment.user_id)
-            )
-            user = result.scalar_one_or_none()
-            
-            if user:
-                user.paid_questions_number_left += plan.questions_count
-        
-        await self.db.flush()
-        return True
+        return await apply_payment_succeeded(self.db, payment_id) != PAYMENT_NOT_FOUND
+
+
+# Outcomes of apply_payments_succeeded
+PAYMENT_CREDITED = "credited"
+PAYMENT_ALREADY_APPLIED = "already_applied"
+PAYMENT_NOT_FOUND = "not_found"
+
+
+async def apply_payment_succeeded(
+    db, transaction_id: str, payment_type: Optional[str] = None,
+) -> str:
+    """Mark one payment succeeded and credit it (see apply_payments_succeeded)."""
+    return (await apply_payments_succeeded(db, {transaction_id: payment_type}))[transaction_id]
+
+
+async def apply_payments_succeeded(
+    db, payments: dict[str, Optional[str]],
+) -> dict[str, str]:
+    """
+    Mark payments (transaction_id → payment_type) succeeded and credit the plans'
+    questions in one statement: the credit happens only on the pending → succeeded
+    transition, so webhook redeliveries, reconciliation and concurrent callers
+    can't credit twice. Returns an outcome per transaction_id.
+    """
+    if not payments:
+        return {}
+    incoming = values(
+        column("transaction_id", String), column("payment_type", String), name="incoming",
+    ).data(list(payments.items()))
+    paid = (
+        update(Payment)
+        .where(Payment.transaction_id == incoming.c.transaction_id, Payment.status == "pending")
+        .values(status="succeeded", payment_type=func.coalesce(incoming.c.payment_type, Payment.payment_type))
+        .returning(Payment.transaction_id, Payment.user_id, Payment.product_id)
+        .cte("paid")
+    )
+    questions = case(
+        {plan.plan_id: plan.questions_count for plan in PRICING_PLANS.values()},
+        value=paid.c.product_id,
+        else_=0,
+    )
+    # One user can have several payments in the batch: sum them, UPDATE ... FROM applies one row per user
+    credits = (
+        select(paid.c.user_id, func.sum(questions).label("questions"))
+        .group_by(paid.c.user_id)
+        .cte("credits")
+    )
+    credited = (
+        update(User)
+        .where(User.user_id == credits.c.user_id)
+        .values(paid_questions_number_left=User.paid_questions_number_left + credits.c.questions)
+        .returning(User.user_id)
+        .cte("credited")
+    )
+    stmt = select(paid.c.transaction_id).where(paid.c.user_id.in_(select(credited.c.user_id)))
+    with span("payment.credit", payments=len(payments)):
+        credited_ids = set((await db.execute(stmt)).scalars().all())
+    outcomes = {tid: PAYMENT_CREDITED for tid in credited_ids}
+    rest = [tid for tid in payments if tid not in credited_ids]
+    if rest:
+        known = set((await db.execute(
+            select(Payment.transaction_id).where(Payment.transaction_id.in_(rest))
+        )).scalars().all())
+        for tid in rest:
+            outcomes[tid] = PAYMENT_ALREADY_APPLIED if tid in known else PAYMENT_NOT_FOUND
+    return outcomes
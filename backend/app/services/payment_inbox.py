@@ -0,0 +1,199 @@
+"""Inbox for YooKassa webhook notifications.
+
+/payment/webhook only stores the notification (one INSERT, a redelivery of the same
+event for the same payment is a no-op; one this process stored recently doesn't reach
+the DB at all) and answers 200 right away, so a slow DB commit or crediting never makes
+YooKassa time out and retry. The background consumer applies stored events through
+apply_payment_succeeded, which credits only on the pending → succeeded transition.
+Rows are claimed with FOR UPDATE SKIP LOCKED, so several app processes can run
+consumers side by side.
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import get_settings
+from app.models.payment import PaymentWebhookEvent
+from app.services.payment import PAYMENT_NOT_FOUND, apply_payment_succeeded
+from app.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Events the consumer acts on; everything else is stored for the record and marked "ignored"
+HANDLED_EVENTS = ("payment.succeeded",)
+RESULT_IGNORED = "ignored"
+# (event, payment id) pairs committed to the inbox by this process, newest last
+RECENT_KEYS_MAX = 10_000
+_recent_keys: "OrderedDict[tuple[str, str], None]" = OrderedDict()
+
+
+def parse_notification(payload: Any) -> tuple[str, str]:
+    """(event, payment id) of a YooKassa notification; ValueError if it isn't one."""
+    if not isinstance(payload, dict):
+        raise ValueError("Notification must be a JSON object")
+    event = payload.get("event")
+    payment_object = payload.get("object")
+    payment_id = payment_object.get("id") if isinstance(payment_object, dict) else None
+    if not isinstance(event, str) or not event or not isinstance(payment_id, str) or not payment_id:
+        raise ValueError("Notification must have 'event' and 'object.id'")
+    return event, payment_id
+
+
+async def record_webhook_event(db: AsyncSession, payload: Any) -> bool:
+    """Store a notification in the inbox and commit. Returns False for a redelivery (already stored)."""
+    event, payment_id = parse_notification(payload)
+    key = (event, payment_id)
+    if key in _recent_keys:
+        return False
+    stmt = (
+        pg_insert(PaymentWebhookEvent)
+        .values(event=event, payment_id=payment_id, payload=payload)
+        .on_conflict_do_nothing(constraint="uq_payment_webhook_inbox_event_payment")
+        .returning(PaymentWebhookEvent.id)
+    )
+    with span("payment.webhook_store", event=event):
+        stored = (await db.execute(stmt)).first() is not None
+        await db.commit()
+    _recent_keys[key] = None
+    if len(_recent_keys) > RECENT_KEYS_MAX:
+        _recent_keys.popitem(last=False)
+    return stored
+
+
+class PaymentInboxConsumer:
+    """Background task applying stored webhook events in batches."""
+
+    def __init__(
+        self,
+        database_url: str,
+        batch_size: int = 50,
+        poll_interval: float = 5.0,
+        max_attempts: int = 10,
+        retry_base_seconds: float = 5.0,
+    ):
+        self.database_url = database_url
+        self.batch_size = max(1, batch_size)
+        self.poll_interval = poll_interval
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_seconds = retry_base_seconds
+        self._engine: Optional[AsyncEngine] = None
+        self._session_maker: Optional[async_sessionmaker] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def notify(self) -> None:
+        """Wake the consumer after a new event was committed (otherwise it polls)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._engine = create_async_engine(
+            self.database_url,
+            pool_size=1,
+            max_overflow=0,
+            pool_pre_ping=True,
+        )
+        self._session_maker = async_sessionmaker(self._engine, expire_on_commit=False)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="payment-inbox")
+
+    async def stop(self) -> None:
+        """Stop the consumer; unprocessed events stay in the inbox for the next start."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+            self._session_maker = None
+
+    async def drain(self) -> int:
+        """Apply due events until none is left. Returns the number of events handled."""
+        handled = 0
+        while True:
+            batch = await self._process_batch()
+            handled += batch
+            if batch < self.batch_size:
+                return handled
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.drain()
+            except Exception:
+                logger.exception("Payment inbox iteration failed")
+
+    async def _process_batch(self) -> int:
+        assert self._session_maker is not None
+        now = datetime.utcnow()
+        async with self._session_maker() as db, db.begin():
+            events = (await db.execute(
+                select(PaymentWebhookEvent)
+                .where(PaymentWebhookEvent.processed_dttm.is_(None), PaymentWebhookEvent.next_attempt_dttm <= now)
+                .order_by(PaymentWebhookEvent.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )).scalars().all()
+            for event in events:
+                values = await self._apply(db, event, now)
+                await db.execute(
+                    update(PaymentWebhookEvent)
+                    .where(PaymentWebhookEvent.id == event.id)
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+        return len(events)
+
+    async def _apply(self, db: AsyncSession, event: PaymentWebhookEvent, now: datetime) -> dict[str, Any]:
+        """Apply one event in a savepoint; returns the inbox row update."""
+        if event.event not in HANDLED_EVENTS:
+            return {"processed_dttm": now, "result": RESULT_IGNORED}
+        payment_method = (event.payload.get("object") or {}).get("payment_method") or {}
+        try:
+            async with db.begin_nested():
+                result = await apply_payment_succeeded(db, event.payment_id, payment_method.get("type"))
+            error = "payment not found" if result == PAYMENT_NOT_FOUND else None
+        except Exception as e:
+            logger.exception("Applying webhook event %s failed", event.id)
+            result, error = None, f"{type(e).__name__}: {e}"
+        if error is None:
+            return {"processed_dttm": now, "result": result, "last_error": None}
+
+        # The payment row may not be committed yet (webhook raced /payment/create): retry with backoff
+        attempts = event.attempts + 1
+        if attempts >= self.max_attempts:
+            logger.error("Giving up on webhook event %s (%s %s): %s", event.id, event.event, event.payment_id, error)
+            return {"attempts": attempts, "last_error": error, "processed_dttm": now, "result": result or "failed"}
+        delay = min(self.retry_base_seconds * 2 ** (attempts - 1), 3600.0)
+        return {"attempts": attempts, "last_error": error, "next_attempt_dttm": now + timedelta(seconds=delay)}
+
+
+@lru_cache()
+def get_payment_inbox() -> PaymentInboxConsumer:
+    """Get the process-wide payment inbox consumer."""
+    settings = get_settings()
+    return PaymentInboxConsumer(
+        database_url=settings.database_url,
+        batch_size=settings.payment_inbox_batch_size,
+        poll_interval=settings.payment_inbox_poll_interval_seconds,
+        max_attempts=settings.payment_inbox_max_attempts,
+    )
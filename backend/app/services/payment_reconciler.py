@@ -0,0 +1,311 @@
+"""Reconciliation of pending payments against the YooKassa API.
+
+A payment whose webhook never arrived would stay "pending" forever. The reconciler
+pages through pending payments older than a few minutes (keyset pagination on id,
+served by the partial index ix_payments_pending), asks YooKassa for their status
+concurrently under a request-rate limit (no DB transaction is open meanwhile), and
+applies each page in one short transaction:
+succeeded payments go through apply_payments_succeeded (the webhook crediting path,
+so nothing is credited twice), canceled ones are marked canceled, the rest stay pending.
+Runs periodically inside the app (PAYMENT_RECONCILE_INTERVAL_SECONDS) or from the CLI;
+a Postgres advisory lock keeps several app processes from reconciling at the same time.
+
+Usage (from backend/):
+    python -m app.services.payment_reconciler                 # one pass, prints a summary
+    python -m app.services.payment_reconciler --dry-run       # only report provider statuses
+    python -m app.services.payment_reconciler --min-age-minutes 0 --rate 50
+"""
+import argparse
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import get_settings
+from app.models.payment import Payment
+from app.services.payment import PAYMENT_CREDITED, apply_payments_succeeded
+from app.services.yookassa_client import YooKassaClient, YooKassaError, get_yookassa_client
+from app.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_lock key: one reconciliation pass at a time across processes
+ADVISORY_LOCK_KEY = 0x59_4B_52_43  # "YKRC"
+
+
+class RateLimiter:
+    """Spaces acquisitions at least 1/rate seconds apart (no bursts)."""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+@dataclass
+class ReconcileSummary:
+    """Counters of one reconciliation pass."""
+    checked: int = 0
+    credited: int = 0
+    already_applied: int = 0
+    canceled: int = 0
+    still_pending: int = 0
+    errors: int = 0
+    pages: int = 0
+    seconds: float = 0.0
+    skipped: bool = False  # another process holds the lock
+    statuses: dict[str, int] = field(default_factory=dict)
+
+    def line(self) -> str:
+        if self.skipped:
+            return "reconciliation skipped: another process is running it"
+        return (
+            f"checked {self.checked} pending payments in {self.pages} pages, {self.seconds:.2f} s: "
+            f"credited {self.credited}, already applied {self.already_applied}, canceled {self.canceled}, "
+            f"still pending {self.still_pending}, errors {self.errors}"
+        )
+
+
+class PaymentReconciler:
+    """Checks pending payments with YooKassa; run_once() for one pass, start() for a periodic task."""
+
+    def __init__(
+        self,
+        database_url: str,
+        client: YooKassaClient,
+        interval: float = 600.0,
+        min_age_seconds: float = 600.0,
+        max_age_hours: float = 72.0,
+        page_size: int = 200,
+        concurrency: int = 10,
+        rate_per_second: float = 20.0,
+    ):
+        self.database_url = database_url
+        self.client = client
+        self.interval = interval
+        self.min_age = timedelta(seconds=min_age_seconds)
+        self.max_age = timedelta(hours=max_age_hours)
+        self.page_size = max(1, page_size)
+        self.concurrency = max(1, concurrency)
+        self.rate_per_second = rate_per_second
+        self._engine: Optional[AsyncEngine] = None
+        self._session_maker: Optional[async_sessionmaker] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the periodic task (no-op without YooKassa credentials or with interval 0)."""
+        if self._task is not None or self.interval <= 0 or not self.client.configured:
+            return
+        self._task = asyncio.create_task(self._run(), name="payment-reconciler")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+            self._session_maker = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                summary = await self.run_once()
+                if summary.checked or summary.skipped:
+                    logger.info("Payment reconciliation: %s", summary.line())
+            except Exception:
+                logger.exception("Payment reconciliation failed")
+
+    def _sessions(self) -> async_sessionmaker:
+        if self._session_maker is None:
+            # One connection holds the advisory lock, the other runs the pages
+            self._engine = create_async_engine(self.database_url, pool_size=2, max_overflow=0, pool_pre_ping=True)
+            self._session_maker = async_sessionmaker(self._engine, expire_on_commit=False)
+        return self._session_maker
+
+    async def run_once(self, dry_run: bool = False) -> ReconcileSummary:
+        """One pass over all due pending payments."""
+        summary = ReconcileSummary()
+        started = time.perf_counter()
+        session_maker = self._sessions()
+        assert self._engine is not None
+        # A connection, not a session: it stays checked out across the commit, and the
+        # session-level lock outlives the transaction, so it isn't left idle in one
+        async with self._engine.connect() as lock_conn:
+            locked = (await lock_conn.execute(select(func.pg_try_advisory_lock(ADVISORY_LOCK_KEY)))).scalar_one()
+            await lock_conn.commit()
+            if not locked:
+                summary.skipped = True
+                return summary
+            try:
+                with span("payment.reconcile", dry_run=dry_run) as s:
+                    await self._pages(session_maker, summary, dry_run)
+                    if s is not None:
+                        s.attributes.update(checked=summary.checked, credited=summary.credited)
+            finally:
+                await lock_conn.execute(select(func.pg_advisory_unlock(ADVISORY_LOCK_KEY)))
+                await lock_conn.commit()
+        summary.seconds = time.perf_counter() - started
+        return summary
+
+    async def _pages(self, session_maker: async_sessionmaker, summary: ReconcileSummary, dry_run: bool) -> None:
+        now = datetime.utcnow()
+        limiter = RateLimiter(self.rate_per_second)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        last_id = 0
+        while True:
+            # The page is read in its own transaction, closed before the YooKassa requests
+            async with session_maker() as db:
+                page = (await db.execute(
+                    select(Payment.id, Payment.transaction_id)
+                    .where(
+                        Payment.status == "pending",
+                        Payment.payment_provider == "yookassa",
+                        Payment.payment_dttm <= now - self.min_age,
+                        Payment.payment_dttm >= now - self.max_age,
+                        Payment.id > last_id,
+                    )
+                    .order_by(Payment.id)
+                    .limit(self.page_size)
+                )).all()
+            if not page:
+                return
+            last_id = page[-1].id
+            summary.pages += 1
+            summary.checked += len(page)
+            remote = await asyncio.gather(
+                *(self._fetch(row.transaction_id, limiter, semaphore) for row in page)
+            )
+            if not dry_run:
+                # Safe after the gap: crediting is idempotent, cancel only touches rows still pending
+                async with session_maker() as db:
+                    await self._apply(db, remote, summary)
+                    await db.commit()
+            else:
+                for payment in remote:
+                    self._count(summary, payment)
+            if len(page) < self.page_size:
+                return
+
+    async def _fetch(
+        self, transaction_id: str, limiter: RateLimiter, semaphore: asyncio.Semaphore,
+    ) -> Optional[dict[str, Any]]:
+        async with semaphore:
+            await limiter.acquire()
+            try:
+                return await self.client.get_payment(transaction_id)
+            except YooKassaError as e:
+                if e.status_code != 404:  # mock-flow payments are unknown to YooKassa
+                    logger.warning("YooKassa status of %s failed: %s", transaction_id, e)
+                return {"id": transaction_id, "status": None, "error": str(e)}
+
+    @staticmethod
+    def _count(summary: ReconcileSummary, payment: dict[str, Any]) -> None:
+        status = payment.get("status") or "error"
+        summary.statuses[status] = summary.statuses.get(status, 0) + 1
+        if status == "error":
+            summary.errors += 1
+        elif status not in ("succeeded", "canceled"):
+            summary.still_pending += 1
+
+    async def _apply(self, db: AsyncSession, remote: list[dict[str, Any]], summary: ReconcileSummary) -> None:
+        """Apply one page of provider statuses in the caller's transaction."""
+        succeeded: dict[str, Optional[str]] = {}
+        canceled: list[str] = []
+        for payment in remote:
+            self._count(summary, payment)
+            if payment["status"] == "succeeded":
+                succeeded[payment["id"]] = (payment.get("payment_method") or {}).get("type")
+            elif payment["status"] == "canceled":
+                canceled.append(payment["id"])
+        outcomes = await apply_payments_succeeded(db, succeeded)
+        for outcome in outcomes.values():
+            if outcome == PAYMENT_CREDITED:
+                summary.credited += 1
+            else:
+                summary.already_applied += 1  # the webhook got there first
+        if canceled:
+            result = await db.execute(
+                update(Payment)
+                .where(Payment.transaction_id.in_(canceled), Payment.status == "pending")
+                .values(status="canceled")
+                .execution_options(synchronize_session=False)
+            )
+            summary.canceled += result.rowcount
+
+
+@lru_cache()
+def get_payment_reconciler() -> PaymentReconciler:
+    """Get the process-wide payment reconciler."""
+    settings = get_settings()
+    return PaymentReconciler(
+        database_url=settings.database_url,
+        client=get_yookassa_client(),
+        interval=settings.payment_reconcile_interval_seconds,
+        min_age_seconds=settings.payment_reconcile_min_age_seconds,
+        max_age_hours=settings.payment_reconcile_max_age_hours,
+        page_size=settings.payment_reconcile_page_size,
+        concurrency=settings.payment_reconcile_concurrency,
+        rate_per_second=settings.payment_reconcile_rate_per_second,
+    )
+
+
+async def _main(args: argparse.Namespace) -> int:
+    settings = get_settings()
+    client = get_yookassa_client()
+    if not client.configured:
+        print("YOOKASSA_SHOP_ID / YOOKASSA_SECRET_KEY are not set: nothing to reconcile against")
+        return 1
+    reconciler = PaymentReconciler(
+        database_url=settings.database_url,
+        client=client,
+        min_age_seconds=args.min_age_minutes * 60,
+        max_age_hours=args.max_age_hours,
+        page_size=args.page_size,
+        concurrency=args.concurrency,
+        rate_per_second=args.rate,
+    )
+    try:
+        summary = await reconciler.run_once(dry_run=args.dry_run)
+    finally:
+        await reconciler.stop()
+        await client.stop()
+    print(summary.line())
+    if summary.statuses:
+        print("provider statuses: " + ", ".join(f"{k} {v}" for k, v in sorted(summary.statuses.items())))
+    return 0
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Query statuses, change nothing")
+    parser.add_argument("--min-age-minutes", type=float, default=settings.payment_reconcile_min_age_seconds / 60,
+                        help="Skip payments created more recently (the user may still be paying)")
+    parser.add_argument("--max-age-hours", type=float, default=settings.payment_reconcile_max_age_hours)
+    parser.add_argument("--page-size", type=int, default=settings.payment_reconcile_page_size)
+    parser.add_argument("--concurrency", type=int, default=settings.payment_reconcile_concurrency)
+    parser.add_argument("--rate", type=float, default=settings.payment_reconcile_rate_per_second,
+                        help="YooKassa requests per second")
+    raise SystemExit(asyncio.run(_main(parser.parse_args())))
@@ -0,0 +1,163 @@
+"""Local pre-scoring of trivial answers, so they don't go through the LLM prompt.
+
+Answers are embedded with a hashing vectorizer (word unigrams + character 3-grams inside
+words, which tolerate Russian inflection and typos; sublinear tf, L2-normalized) into
+sparse NumPy vectors and compared with the task's reference answer by cosine similarity.
+Reference vectors are computed once per task text (LRU cache, warmed at interview start).
+NumPy is imported on first use (app/warmup.py does it before a worker serves), not with the app.
+
+Verdicts (thresholds in llm_config.yaml → prescore):
+    empty       — no letters or digits at all ("", "-", "?")
+    near_empty  — one of non_answers ("не знаю", "пропуск"); a short answer on the merits
+                  ("0.25", "t-test") is never graded locally
+    verbatim    — cosine with the reference ≥ verbatim_similarity and similar length
+Anything else returns None and is graded by the model.
+"""
+from __future__ import annotations
+
+import re
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+from app.llm_config_loader import PrescoreConfig, get_prescore_config
+from app.schemas.interview import TaskFeedback
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# 2**20 hashed features: collisions are negligible for answers of ≤ 3000 characters
+N_FEATURES = 1 << 20
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+PRESCORE_EMPTY = "empty"
+PRESCORE_NEAR_EMPTY = "near_empty"
+PRESCORE_VERBATIM = "verbatim"
+
+
+@dataclass(frozen=True)
+class SparseVector:
+    """Sorted hashed feature indices with L2-normalized weights."""
+    indices: np.ndarray
+    values: np.ndarray
+    words: int
+
+
+def _words(text: str) -> list[str]:
+    return _WORD_RE.findall(text.lower().replace("ё", "е"))
+
+
+def vectorize(text: str) -> SparseVector:
+    """Hashing vectorizer: word and in-word char 3-gram features, signed by a hash bit."""
+    import numpy as np
+
+    words = _words(text)
+    features = list(words)
+    for w in words:
+        padded = f" {w} "
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    if not features:
+        empty = np.empty(0, dtype=np.int64)
+        return SparseVector(empty, np.empty(0, dtype=np.float64), 0)
+    hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint32, count=len(features))
+    signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+    buckets = (hashes & (N_FEATURES - 1)).astype(np.int64)
+    indices, inverse = np.unique(buckets, return_inverse=True)
+    tf = np.bincount(inverse, weights=signs)
+    values = np.sign(tf) * (1.0 + np.log(np.maximum(np.abs(tf), 1.0)))
+    values[tf == 0] = 0.0  # opposite-sign collisions cancel out
+    norm = np.linalg.norm(values)
+    if norm:
+        values /= norm
+    return SparseVector(indices, values, len(words))
+
+
+def cosine(a: SparseVector, b: SparseVector) -> float:
+    """Cosine similarity of two normalized sparse vectors (dot product over shared indices)."""
+    import numpy as np
+
+    if not a.indices.size or not b.indices.size:
+        return 0.0
+    _, ia, ib = np.intersect1d(a.indices, b.indices, assume_unique=True, return_indices=True)
+    return float(np.dot(a.values[ia], b.values[ib]))
+
+
+@lru_cache(maxsize=4096)
+def reference_vector(task_answer: str) -> SparseVector:
+    """Vector of a reference answer, cached by its text (tasks repeat across sessions)."""
+    return vectorize(task_answer)
+
+
+def warm_references(task_answers: Iterable[Optional[str]]) -> None:
+    """Precompute reference vectors for a new session's tasks."""
+    for ref in task_answers:
+        if ref and ref.strip():
+            reference_vector(ref.strip())
+
+
+@lru_cache(maxsize=8)
+def _non_answers(phrases: tuple[str, ...]) -> frozenset[tuple[str, ...]]:
+    return frozenset(tuple(_words(p)) for p in phrases)
+
+
+def classify(user_answer: str, task_answer: Optional[str], config: PrescoreConfig) -> tuple[Optional[str], float]:
+    """(verdict or None, similarity with the reference)."""
+    answer = vectorize(user_answer or "")
+    if answer.words == 0:
+        return PRESCORE_EMPTY, 0.0
+    ref_text = (task_answer or "").strip()
+    similarity = 0.0
+    if ref_text:
+        ref = reference_vector(ref_text)
+        similarity = cosine(answer, ref)
+        length_ratio = answer.words / max(ref.words, 1)
+        if similarity >= config.verbatim_similarity and 0.75 <= length_ratio <= 1.33:
+            return PRESCORE_VERBATIM, similarity
+    if tuple(_words(user_answer)) in _non_answers(config.non_answers):
+        return PRESCORE_NEAR_EMPTY, similarity
+    return None, similarity
+
+
+def _feedback(item: dict[str, Any], verdict: str, config: PrescoreConfig) -> TaskFeedback:
+    base = {
+        "task_id": int(item["task_id"]),
+        "task_question": str(item.get("task_question", "")),
+        "user_answer": str(item.get("user_answer", "")),
+    }
+    ref = str(item.get("task_answer") or "").strip()
+    ref_block = f"\n\n**Эталон и ключевые моменты:** {ref}" if ref else ""
+    if verdict == PRESCORE_VERBATIM:
+        return TaskFeedback(
+            **base,
+            score=config.verbatim_score,
+            strengths=["Ответ совпадает с эталонным по содержанию"],
+            improvements=["На интервью формулируйте ответ своими словами и приводите примеры из практики"],
+            detailed_feedback=(
+                "**Фидбек по ответу:** ответ практически дословно совпадает с эталоном, "
+                "поэтому оценён автоматически без разбора моделью." + ref_block
+            ),
+        )
+    return TaskFeedback(
+        **base,
+        score=config.near_empty_score,
+        strengths=[],
+        improvements=["Дайте развёрнутый ответ: ход рассуждений, формулы или метрики, пример"],
+        detailed_feedback=(
+            ("**Фидбек по ответу:** ответ пустой" if verdict == PRESCORE_EMPTY
+             else "**Фидбек по ответу:** ответа по существу нет")
+            + " — задача засчитана с минимальным баллом без разбора моделью." + ref_block
+        ),
+    )
+
+
+def prescore_items(items: list[dict[str, Any]]) -> list[tuple[Optional[str], Optional[TaskFeedback]]]:
+    """Per item: (verdict, local feedback) for trivial answers, (None, None) for the model."""
+    config = get_prescore_config()
+    if not config.enabled:
+        return [(None, None)] * len(items)
+    result: list[tuple[Optional[str], Optional[TaskFeedback]]] = []
+    for it in items:
+        verdict, _ = classify(str(it.get("user_answer") or ""), it.get("task_answer"), config)
+        result.append((verdict, _feedback(it, verdict, config) if verdict else None))
+    return result
@@ -0,0 +1,177 @@
+"""Where interview sessions in progress live (SESSION_STORE).
+
+    memory    — a dict in the process that started the session (a single worker)
+    database  — interview_sessions table, so any worker can serve any request of a session
+
+Sessions are the plain dicts built by InterviewService; callers change them and save(),
+and delete() them once the final report is stored (interview_reports has it from then on).
+The database store keeps a version per session and rejects a save made from a stale copy,
+so two workers can't both apply an answer to the same task; sessions abandoned for longer
+than SESSION_TTL_HOURS are purged in the background.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional, Union
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.database import async_session_maker
+from app.models.interview_session import InterviewSessionState
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "_version"  # version the session was loaded with (database store only)
+
+
+class MemorySessionStore:
+    """Sessions of this process."""
+
+    def __init__(self):
+        self._sessions: dict[str, dict] = {}
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        return self._sessions.get(session_id)
+
+    async def save(self, session: dict) -> None:
+        self._sessions[session["session_id"]] = session
+
+    async def delete(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+    def count_by_status(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for session in list(self._sessions.values()):
+            counts[session["status"]] = counts.get(session["status"], 0) + 1
+        return counts
+
+
+class DatabaseSessionStore:
+    """Sessions in interview_sessions (short transactions of their own)."""
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+        ttl_seconds: float = 86400.0,
+        purge_interval: float = 600.0,
+        count_interval: float = 15.0,
+    ):
+        self._session_maker = session_maker
+        self.ttl_seconds = ttl_seconds
+        self.purge_interval = purge_interval
+        self.count_interval = count_interval
+        self._counts: dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="session-store")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        async with self._session_maker() as db:
+            row = (await db.execute(
+                select(InterviewSessionState.state, InterviewSessionState.version)
+                .where(InterviewSessionState.session_id == session_id)
+            )).first()
+        if row is None:
+            return None
+        session = dict(row.state)
+        session[VERSION_KEY] = row.version
+        return session
+
+    async def save(self, session: dict) -> None:
+        """Insert a new session or update it; ValueError if another request saved it first."""
+        state = {k: v for k, v in session.items() if k != VERSION_KEY}
+        version = session.get(VERSION_KEY)
+        async with self._session_maker() as db:
+            if version is None:
+                db.add(InterviewSessionState(
+                    session_id=session["session_id"],
+                    user_id=session["user_id"],
+                    status=session["status"],
+                    state=state,
+                    version=1,
+                ))
+            else:
+                result = await db.execute(
+                    update(InterviewSessionState)
+                    .where(
+                        InterviewSessionState.session_id == session["session_id"],
+                        InterviewSessionState.version == version,
+                    )
+                    .values(status=session["status"], state=state, version=version + 1,
+                            updated_dttm=datetime.utcnow())
+                )
+                if result.rowcount == 0:
+                    raise ValueError("Сессия изменена параллельным запросом, повторите запрос")
+            await db.commit()
+        session[VERSION_KEY] = (version or 0) + 1
+
+    async def delete(self, session_id: str) -> None:
+        async with self._session_maker() as db:
+            await db.execute(delete(InterviewSessionState).where(InterviewSessionState.session_id == session_id))
+            await db.commit()
+
+    def count_by_status(self) -> dict[str, int]:
+        # All sessions in the table (the same numbers from every worker), as of the last refresh
+        return dict(self._counts)
+
+    async def purge(self) -> int:
+        """Delete sessions not saved for ttl_seconds (abandoned interviews). Returns the count."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        async with self._session_maker() as db:
+            result = await db.execute(delete(InterviewSessionState).where(InterviewSessionState.updated_dttm < cutoff))
+            await db.commit()
+        return result.rowcount
+
+    async def _refresh_counts(self) -> None:
+        async with self._session_maker() as db:
+            rows = (await db.execute(
+                select(InterviewSessionState.status, func.count()).group_by(InterviewSessionState.status)
+            )).all()
+        self._counts = {status: n for status, n in rows}
+
+    async def _run(self) -> None:
+        last_purge = time.monotonic()
+        while True:
+            try:
+                if time.monotonic() - last_purge >= self.purge_interval:
+                    last_purge = time.monotonic()
+                    purged = await self.purge()
+                    if purged:
+                        logger.info("Purged %d abandoned interview sessions", purged)
+                await self._refresh_counts()
+            except Exception:
+                logger.exception("Session store maintenance failed")
+            await asyncio.sleep(self.count_interval)
+
+
+SessionStore = Union[MemorySessionStore, DatabaseSessionStore]
+
+
+@lru_cache()
+def get_session_store() -> SessionStore:
+    """Get the process-wide session store (SESSION_STORE=memory | database)."""
+    settings = get_settings()
+    if settings.session_store == "database":
+        return DatabaseSessionStore(ttl_seconds=settings.session_ttl_hours * 3600)
+    return MemorySessionStore()
@@ -0,0 +1,89 @@
+"""Per-user topic rollups (user_topic_stats) and the "adaptive" topic.
+
+The analytics writer folds every flushed batch of llm_answers into user_topic_stats in
+the same transaction (one upsert, grouped by user and subtype), so the rollup never
+drifts from the answers and nobody has to scan feedback_json to learn a user's weak
+topics. The adaptive topic reads the user's rows (one per subtype, primary-key range)
+and samples subtypes with weights that grow as the smoothed mean score drops.
+"""
+import random
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.models.llm_answer import UserTopicStats
+
+TOPIC_ADAPTIVE = "adaptive"
+TOPIC_RANDOM = "random"
+# Smoothing: every subtype starts as PRIOR_ANSWERS answers with PRIOR_MEAN score,
+# so an unseen subtype is explored and one bad answer doesn't dominate
+PRIOR_MEAN = 50.0
+PRIOR_ANSWERS = 2
+# Weight floor: strong topics still come up now and then
+MIN_WEIGHT = 5.0
+
+_UPSERT = text(
+    """
+    INSERT INTO user_topic_stats (user_id, subtype, answers_count, score_sum, last_seen_dttm)
+    SELECT b.user_id, t.subtype, count(*), sum(b.score), max(b.seen)
+    FROM unnest(CAST(:user_ids AS varchar[]), CAST(:task_ids AS integer[]),
+                CAST(:scores AS integer[]), CAST(:seen AS timestamp[])) AS b(user_id, task_id, score, seen)
+    JOIN tasks t ON t.task_id = b.task_id
+    GROUP BY b.user_id, t.subtype
+    ON CONFLICT (user_id, subtype) DO UPDATE SET
+        answers_count = user_topic_stats.answers_count + excluded.answers_count,
+        score_sum = user_topic_stats.score_sum + excluded.score_sum,
+        last_seen_dttm = greatest(user_topic_stats.last_seen_dttm, excluded.last_seen_dttm)
+    """
+)
+
+
+def _score(row: dict[str, Any]) -> Optional[int]:
+    feedback = row.get("feedback_json")
+    if not isinstance(feedback, dict) or feedback.get("fallback"):
+        return None  # no model grade (LLM unavailable): must not mark the topic as weak
+    score = feedback.get("score")
+    return score if isinstance(score, int) and not isinstance(score, bool) else None
+
+
+async def apply_topic_stats(conn: AsyncConnection, rows: Iterable[dict[str, Any]]) -> None:
+    """Fold llm_answers rows (user_id, task_id, feedback_json.score, created_dttm) into the rollup."""
+    user_ids, task_ids, scores, seen = [], [], [], []
+    for row in rows:
+        score = _score(row)
+        if score is None or row.get("task_id") is None:
+            continue
+        user_ids.append(row["user_id"])
+        task_ids.append(int(row["task_id"]))
+        scores.append(score)
+        seen.append(row["created_dttm"])
+    if user_ids:
+        await conn.execute(_UPSERT, {"user_ids": user_ids, "task_ids": task_ids, "scores": scores, "seen": seen})
+
+
+async def load_topic_stats(db: AsyncSession, user_id: str) -> dict[str, tuple[int, int]]:
+    """subtype → (answers_count, score_sum) for one user."""
+    rows = (await db.execute(
+        select(UserTopicStats.subtype, UserTopicStats.answers_count, UserTopicStats.score_sum)
+        .where(UserTopicStats.user_id == user_id)
+    )).all()
+    return {subtype: (count, total) for subtype, count, total in rows}
+
+
+def topic_weights(stats: dict[str, tuple[int, int]], subtypes: Iterable[str]) -> dict[str, float]:
+    """Sampling weight per subtype: 100 − smoothed mean score, at least MIN_WEIGHT."""
+    weights = {}
+    for subtype in subtypes:
+        count, total = stats.get(subtype, (0, 0))
+        mean = (total + PRIOR_MEAN * PRIOR_ANSWERS) / (count + PRIOR_ANSWERS)
+        weights[subtype] = max(100.0 - mean, MIN_WEIGHT)
+    return weights
+
+
+def sample_topics(weights: dict[str, float], k: int, rng: Optional[random.Random] = None) -> list[str]:
+    """k subtypes drawn with replacement by weight (a weak topic can fill a whole session)."""
+    if not weights:
+        return []
+    rng = rng or random
+    return rng.choices(list(weights), weights=list(weights.values()), k=k)
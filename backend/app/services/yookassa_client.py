@@ -0,0 +1,314 @@
+"""Async client for the YooKassa payments API (https://yookassa.ru/developers/api).
+
+One httpx.AsyncClient per process, created at startup: checkouts reuse keep-alive
+connections to api.yookassa.ru instead of a worker thread and a fresh TLS handshake
+each (the sync SDK under asyncio.to_thread). POSTs carry an Idempotence-Key, so a
+timed-out or 5xx request is retried with the same key and YooKassa returns the payment
+it already created instead of a second one.
+
+Usage (from backend/):
+    python -m app.services.yookassa_client stub --port 8765 --latency-ms 150
+    # then YOOKASSA_API_URL=http://127.0.0.1:8765/v3 with any YOOKASSA_SHOP_ID / YOOKASSA_SECRET_KEY
+"""
+import argparse
+import asyncio
+import base64
+import logging
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+import httpx
+import orjson
+
+from app.config import get_settings
+from app.metrics import observe_yookassa_call
+from app.tracing import span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "https://api.yookassa.ru/v3"
+# Statuses worth another attempt with the same Idempotence-Key
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRY_DELAY_SECONDS = 10.0
+
+
+class YooKassaError(Exception):
+    """Error response (or no response at all) from the YooKassa API."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, code: Optional[str] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+
+
+class YooKassaClient:
+    """Pooled async YooKassa client; one per process, see get_yookassa_client()."""
+
+    def __init__(
+        self,
+        shop_id: str,
+        secret_key: str,
+        api_url: str = DEFAULT_API_URL,
+        timeout: float = 10.0,
+        connect_timeout: float = 3.0,
+        max_retries: int = 3,
+        retry_backoff_seconds: float = 0.5,
+        max_connections: int = 20,
+    ):
+        self.shop_id = (shop_id or "").strip()
+        self.secret_key = (secret_key or "").strip()
+        self.api_url = api_url.rstrip("/")
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def configured(self) -> bool:
+        """Credentials are set; otherwise payments fall back to the mock flow."""
+        return bool(self.shop_id and self.secret_key)
+
+    async def start(self) -> None:
+        """Open the connection pool (no network I/O until the first request)."""
+        if self._client is None and self.configured:
+            self._client = httpx.AsyncClient(
+                base_url=self.api_url,
+                auth=httpx.BasicAuth(self.shop_id, self.secret_key),
+                timeout=self.timeout,
+                limits=self.limits,
+                headers={"Content-Type": "application/json"},
+            )
+
+    async def stop(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def create_payment(self, payload: dict[str, Any], idempotence_key: Optional[str] = None) -> dict[str, Any]:
+        """POST /payments. Retries reuse the idempotence key, so at most one payment is created."""
+        return await self._request(
+            "POST", "/payments", "payment_create",
+            json=payload, idempotence_key=idempotence_key or str(uuid.uuid4()),
+        )
+
+    async def get_payment(self, payment_id: str) -> dict[str, Any]:
+        """GET /payments/{id}."""
+        return await self._request("GET", f"/payments/{payment_id}", "payment_get")
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        operation: str,
+        json: Optional[dict[str, Any]] = None,
+        idempotence_key: Optional[str] = None,
+    ) -> dict[str, Any]:
+        if not self.configured:
+            raise YooKassaError("YooKassa credentials are not set")
+        if self._client is None:
+            await self.start()
+        headers = {"Idempotence-Key": idempotence_key} if idempotence_key else None
+        content = orjson.dumps(json) if json is not None else None
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with span(f"yookassa.{operation}") as s:
+                for attempt in range(self.max_retries + 1):
+                    if s is not None:
+                        s.attributes["attempts"] = attempt + 1
+                    try:
+                        response = await self._client.request(method, path, content=content, headers=headers)
+                    except httpx.TransportError as e:
+                        if attempt == self.max_retries:
+                            raise YooKassaError(f"YooKassa unreachable: {type(e).__name__}: {e}") from e
+                        logger.warning("YooKassa %s %s failed (%s), retrying", method, path, type(e).__name__)
+                        await asyncio.sleep(self._retry_delay(attempt, None))
+                        continue
+                    if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                        logger.warning("YooKassa %s %s returned %s, retrying", method, path, response.status_code)
+                        await asyncio.sleep(self._retry_delay(attempt, response))
+                        continue
+                    if response.is_success:
+                        outcome = "success"
+                        return response.json()
+                    raise self._error(response)
+        finally:
+            observe_yookassa_call(operation, outcome, time.perf_counter() - started)
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), MAX_RETRY_DELAY_SECONDS)
+        delay = self.retry_backoff_seconds * 2 ** attempt
+        return min(delay * (0.5 + random.random() / 2), MAX_RETRY_DELAY_SECONDS)
+
+    @staticmethod
+    def _error(response: httpx.Response) -> YooKassaError:
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if not isinstance(body, dict):
+            body = {}
+        description = body.get("description") or response.reason_phrase
+        return YooKassaError(
+            f"{response.status_code} {description}", status_code=response.status_code, code=body.get("code"),
+        )
+
+
+@lru_cache()
+def get_yookassa_client() -> YooKassaClient:
+    """Get the process-wide YooKassa client."""
+    settings = get_settings()
+    return YooKassaClient(
+        shop_id=settings.yookassa_shop_id,
+        secret_key=settings.yookassa_secret_key,
+        api_url=settings.yookassa_api_url,
+        timeout=settings.yookassa_timeout_seconds,
+        connect_timeout=settings.yookassa_connect_timeout_seconds,
+        max_retries=settings.yookassa_max_retries,
+        max_connections=settings.yookassa_max_connections,
+    )
+
+
+# --- CLI: local YooKassa stub (payments create/get, idempotence keys, latency, failures) ---
+
+def make_stub_server(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    latency_ms: float = 0.0,
+    fail_rate: float = 0.0,
+    status: str = "pending",
+) -> ThreadingHTTPServer:
+    """Threaded YooKassa stub; call serve_forever() (e.g. in a thread) and shutdown() when done."""
+    payments: dict[str, dict[str, Any]] = {}
+    by_key: dict[str, str] = {}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+        disable_nagle_algorithm = True  # headers and body are separate writes on a reused connection
+
+        def _reply(self, status: int, body: dict[str, Any]) -> None:
+            data = orjson.dumps(body)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _authorized(self) -> bool:
+            auth = self.headers.get("Authorization", "")
+            try:
+                ok = auth.startswith("Basic ") and ":" in base64.b64decode(auth[6:]).decode()
+            except ValueError:
+                ok = False
+            if not ok:
+                self._reply(401, {"type": "error", "code": "invalid_credentials", "description": "Authentication failed"})
+            return ok
+
+        def _simulate(self) -> bool:
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            if fail_rate and random.random() < fail_rate:
+                self._reply(503, {"type": "error", "code": "internal_server_error", "description": "Stub failure"})
+                return False
+            return True
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path.rstrip("/") != "/v3/payments":
+                self._reply(404, {"type": "error", "code": "not_found", "description": "Unknown path"})
+                return
+            if not self._authorized() or not self._simulate():
+                return
+            key = self.headers.get("Idempotence-Key")
+            if not key:
+                self._reply(400, {"type": "error", "code": "invalid_request", "description": "Idempotence-Key is required"})
+                return
+            try:
+                request = orjson.loads(body)
+                amount = request["amount"]
+            except (orjson.JSONDecodeError, KeyError, TypeError):
+                self._reply(400, {"type": "error", "code": "invalid_request", "description": "Invalid payment request"})
+                return
+            with lock:
+                payment_id = by_key.get(key)
+                if payment_id is None:
+                    payment_id = str(uuid.uuid4())
+                    confirmation = request.get("confirmation") or {}
+                    payments[payment_id] = {
+                        "id": payment_id,
+                        "status": status,
+                        "paid": status == "succeeded",
+                        "amount": amount,
+                        "description": request.get("description"),
+                        "metadata": request.get("metadata") or {},
+                        "payment_method": {"type": "bank_card"},
+                        "confirmation": {
+                            "type": "redirect",
+                            "return_url": confirmation.get("return_url"),
+                            "confirmation_url": f"http://{host}:{port}/checkout/{payment_id}",
+                        },
+                        "created_at": datetime.now(timezone.utc).isoformat(),
+                        "test": True,
+                    }
+                    by_key[key] = payment_id
+                payment = payments[payment_id]
+            self._reply(200, payment)
+
+        def do_GET(self):
+            prefix = "/v3/payments/"
+            if not self.path.startswith(prefix):
+                self._reply(404, {"type": "error", "code": "not_found", "description": "Unknown path"})
+                return
+            if not self._authorized() or not self._simulate():
+                return
+            with lock:
+                payment = payments.get(self.path[len(prefix):])
+            if payment is None:
+                self._reply(404, {"type": "error", "code": "not_found", "description": "Payment not found"})
+            else:
+                self._reply(200, payment)
+
+        def log_message(self, format, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 256  # the default backlog of 5 resets connections under a burst
+
+    server = Server((host, port), Handler)
+    server.payments = payments  # for benchmarks: payments created so far, by id
+    return server
+
+
+def _stub(args: argparse.Namespace) -> None:
+    server = make_stub_server(args.host, args.port, args.latency_ms, args.fail_rate, args.status)
+    print(f"YooKassa stub on http://{args.host}:{args.port}/v3 "
+          f"(latency {args.latency_ms:g} ms, fail rate {args.fail_rate:g}, new payments {args.status})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="YooKassa API tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    stub = sub.add_parser("stub", help="Run a local YooKassa payments API stub")
+    stub.add_argument("--host", default="127.0.0.1")
+    stub.add_argument("--port", type=int, default=8765)
+    stub.add_argument("--latency-ms", type=float, default=0.0, help="Delay before every response")
+    stub.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    stub.add_argument("--status", default="pending", choices=("pending", "succeeded", "canceled"),
+                      help="Status of created payments")
+    args = parser.parse_args()
+    _stub(args)
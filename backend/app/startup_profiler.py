@@ -0,0 +1,65 @@
+"""Startup time profiler: per-phase timings for imports and lifespan initialization.
+
+Enabled with STARTUP_PROFILE=true (report printed to stderr once startup completes).
+Standalone report (imports + lifespan, no server):
+    python -m app.startup_profiler
+"""
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+# Heavy optional modules that must not be imported during startup
+LAZY_MODULES = ("openai", "yookassa", "openpyxl", "argon2", "numpy")
+
+
+class StartupProfiler:
+    """Collects (phase, seconds) pairs in the order phases finish."""
+
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+        self.phases: list[tuple[str, float]] = []
+        self.eager: list[str] | None = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - t0))
+
+    def imports_done(self) -> None:
+        """Note which LAZY_MODULES the imports pulled in (warmup loads some of them on purpose)."""
+        self.eager = [m for m in LAZY_MODULES if m in sys.modules]
+
+    def report(self) -> str:
+        total = time.perf_counter() - self.started_at
+        width = max((len(name) for name, _ in self.phases), default=10)
+        lines = ["Startup profile:"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<{width}}  {seconds * 1000:8.1f} ms")
+        lines.append(f"  {'total':<{width}}  {total * 1000:8.1f} ms")
+        eager = self.eager if self.eager is not None else [m for m in LAZY_MODULES if m in sys.modules]
+        if eager:
+            lines.append(f"  imported eagerly: {', '.join(eager)}")
+        return "\n".join(lines)
+
+
+startup_profiler = StartupProfiler()
+
+
+async def _profile_startup() -> str:
+    # Run as a script this module is __main__; app.main records into the app.startup_profiler copy
+    from app.main import app, lifespan
+    from app.startup_profiler import startup_profiler as app_profiler
+
+    async with lifespan(app):
+        pass
+    return app_profiler.report()
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    print(asyncio.run(_profile_startup()))
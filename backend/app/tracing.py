@@ -0,0 +1,444 @@
+"""Lightweight tracing: context-propagated spans, head sampling, JSONL / OTLP export.
+
+A request gets a root span in TracingMiddleware; code below it opens child spans with
+``with span("llm.chat_completion", model=...)``. The active span lives in a context
+variable, so it follows awaits, asyncio.to_thread and the SQLAlchemy greenlet.
+Sampling is decided once per trace: unsampled requests pay one random() call and
+every nested span() is a no-op. Finished traces are handed to a background thread
+that appends them to a JSONL file or POSTs OTLP/JSON to a collector.
+
+Usage (from backend/):
+    python -m app.tracing flame --top 5            # slowest traces as span trees
+    python -m app.tracing flame --route finish     # only roots whose name contains "finish"
+    python -m app.tracing collector --port 4318    # local OTLP/HTTP (JSON) collector stand-in
+"""
+import argparse
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Iterator, Optional, Union
+
+import orjson
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "mock-interview-backend"
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    duration_ms: float = 0.0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class _Trace:
+    """Spans of one sampled trace; shared by all contexts copied from the root."""
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self) -> None:
+        self.trace_id = os.urandom(16).hex()
+        self.spans: list[Span] = []
+
+
+_UNSAMPLED = object()
+_active: ContextVar[Union[None, object, tuple[_Trace, Span]]] = ContextVar("trace_span", default=None)
+
+
+def current_trace_id() -> Optional[str]:
+    current = _active.get()
+    return current[0].trace_id if isinstance(current, tuple) else None
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Open a span under the active one (or start a new, possibly sampled-out, trace)."""
+    current = _active.get()
+    if current is _UNSAMPLED:
+        yield None
+        return
+    if current is None:
+        tracer = get_tracer()
+        if not tracer.should_sample():
+            token = _active.set(_UNSAMPLED)
+            try:
+                yield None
+            finally:
+                _active.reset(token)
+            return
+        trace, parent_id = _Trace(), None
+    else:
+        trace, parent = current
+        parent_id = parent.span_id
+
+    s = Span(name, trace.trace_id, os.urandom(8).hex(), parent_id, time.time_ns(), attributes=attributes)
+    token = _active.set((trace, s))
+    started = perf_counter()
+    try:
+        yield s
+    except BaseException as e:
+        s.error = type(e).__name__
+        raise
+    finally:
+        s.duration_ms = (perf_counter() - started) * 1000
+        _active.reset(token)
+        trace.spans.append(s)
+        if parent_id is None:
+            get_tracer().export(trace)
+
+
+def add_span(name: str, seconds: float, **attributes: Any) -> None:
+    """Record an already finished child span (e.g. from SQLAlchemy cursor events)."""
+    current = _active.get()
+    if not isinstance(current, tuple):
+        return
+    trace, parent = current
+    start_ns = time.time_ns() - int(seconds * 1e9)
+    trace.spans.append(Span(
+        name, trace.trace_id, os.urandom(8).hex(), parent.span_id, start_ns,
+        duration_ms=seconds * 1000, attributes=attributes,
+    ))
+
+
+def trace_to_dict(trace: _Trace) -> dict[str, Any]:
+    root = next((s for s in trace.spans if s.parent_id is None), trace.spans[-1])
+    return {
+        "trace_id": trace.trace_id,
+        "name": root.name,
+        "start_ns": root.start_ns,
+        "duration_ms": round(root.duration_ms, 3),
+        "spans": [asdict(s) for s in trace.spans],
+    }
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(traces: list[dict[str, Any]]) -> dict[str, Any]:
+    """OTLP/JSON ExportTraceServiceRequest for a batch of traces."""
+    spans = []
+    for t in traces:
+        for s in t["spans"]:
+            otlp = {
+                "traceId": s["trace_id"],
+                "spanId": s["span_id"],
+                "name": s["name"],
+                "kind": 2 if s["parent_id"] is None else 1,  # SERVER / INTERNAL
+                "startTimeUnixNano": str(s["start_ns"]),
+                "endTimeUnixNano": str(s["start_ns"] + int(s["duration_ms"] * 1e6)),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s["attributes"].items()],
+                "status": {"code": 2, "message": s["error"]} if s["error"] else {"code": 1},
+            }
+            if s["parent_id"]:
+                otlp["parentSpanId"] = s["parent_id"]
+            spans.append(otlp)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": spans}],
+    }]}
+
+
+def from_otlp(payload: dict[str, Any]) -> list[dict[str, Any]]:
+    """Inverse of to_otlp: group OTLP spans back into JSONL trace records."""
+    by_trace: dict[str, list[dict[str, Any]]] = {}
+    for rs in payload.get("resourceSpans", []):
+        for ss in rs.get("scopeSpans", []):
+            for s in ss.get("spans", []):
+                start, end = int(s["startTimeUnixNano"]), int(s["endTimeUnixNano"])
+                status = s.get("status") or {}
+                by_trace.setdefault(s["traceId"], []).append({
+                    "name": s["name"],
+                    "trace_id": s["traceId"],
+                    "span_id": s["spanId"],
+                    "parent_id": s.get("parentSpanId") or None,
+                    "start_ns": start,
+                    "duration_ms": (end - start) / 1e6,
+                    "attributes": {a["key"]: next(iter(a["value"].values())) for a in s.get("attributes", [])},
+                    "error": status.get("message") if status.get("code") == 2 else None,
+                })
+    traces = []
+    for trace_id, spans in by_trace.items():
+        root = next((s for s in spans if s["parent_id"] is None), spans[0])
+        traces.append({
+            "trace_id": trace_id,
+            "name": root["name"],
+            "start_ns": root["start_ns"],
+            "duration_ms": round(root["duration_ms"], 3),
+            "spans": spans,
+        })
+    return traces
+
+
+class Tracer:
+    """Sampling decision + background export (JSONL file or OTLP/HTTP JSON)."""
+
+    def __init__(
+        self,
+        sample_rate: float,
+        exporter: str = "jsonl",
+        jsonl_path: str = "traces.jsonl",
+        otlp_endpoint: str = "",
+        max_queue: int = 1000,
+    ):
+        self.sample_rate = sample_rate if exporter in ("jsonl", "otlp") else 0.0
+        self.exporter = exporter
+        self.jsonl_path = Path(jsonl_path)
+        self.otlp_endpoint = otlp_endpoint
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+
+    def export(self, trace: _Trace) -> None:
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None and self.sample_rate > 0:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush queued traces and stop the exporter thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = [] if item is None else [item]
+            # Drain whatever else is queued into the same write / POST
+            while item is not None and len(batch) < 256:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    batch.append(item)
+            if batch:
+                try:
+                    self._write([trace_to_dict(t) for t in batch])
+                except Exception:
+                    logger.warning("Trace export (%s) failed, %d traces dropped",
+                                   self.exporter, len(batch), exc_info=True)
+            if item is None:
+                return
+
+    def _write(self, traces: list[dict[str, Any]]) -> None:
+        if self.exporter == "otlp":
+            request = urllib.request.Request(
+                self.otlp_endpoint,
+                data=orjson.dumps(to_otlp(traces)),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            with urllib.request.urlopen(request, timeout=5) as resp:
+                resp.read()
+        else:
+            with open(self.jsonl_path, "ab") as f:
+                f.write(b"".join(orjson.dumps(t) + b"\n" for t in traces))
+
+
+@lru_cache()
+def get_tracer() -> Tracer:
+    settings = get_settings()
+    return Tracer(
+        sample_rate=settings.tracing_sample_rate,
+        exporter=settings.tracing_exporter,
+        jsonl_path=settings.tracing_jsonl_path,
+        otlp_endpoint=settings.tracing_otlp_endpoint,
+    )
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware: root span per HTTP request, named by route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with span(f"{scope['method']} {scope['path']}") as root:
+            if root is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    root.attributes["http.status_code"] = message["status"]
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-trace-id", root.trace_id.encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                template = getattr(scope.get("route"), "path", None)
+                if template:
+                    root.name = f"{scope['method']} {template}"
+
+
+# --- CLI: flame-style breakdown and a collector stand-in ---
+
+def read_traces(path: Path) -> list[dict[str, Any]]:
+    if not path.is_file():
+        return []
+    with open(path, "rb") as f:
+        return [orjson.loads(line) for line in f if line.strip()]
+
+
+def render_trace(trace: dict[str, Any], width: int = 40) -> str:
+    """Indented span tree with self time and a bar relative to the root duration."""
+    spans = trace["spans"]
+    children: dict[Optional[str], list[dict[str, Any]]] = {}
+    for s in spans:
+        children.setdefault(s["parent_id"], []).append(s)
+    total = trace["duration_ms"] or 1.0
+    lines = [f"trace {trace['trace_id']}  {trace['name']}  {trace['duration_ms']:.1f} ms"]
+
+    def walk(parent_id: Optional[str], depth: int) -> None:
+        kids = sorted(children.get(parent_id, []), key=lambda s: s["start_ns"])
+        i = 0
+        while i < len(kids):
+            s = kids[i]
+            # Collapse runs of same-named leaf siblings (e.g. many db.query spans)
+            j = i
+            while (j + 1 < len(kids) and kids[j + 1]["name"] == s["name"]
+                   and s["span_id"] not in children and kids[j + 1]["span_id"] not in children):
+                j += 1
+            group = kids[i:j + 1]
+            ms = sum(g["duration_ms"] for g in group)
+            self_ms = ms - sum(c["duration_ms"] for g in group for c in children.get(g["span_id"], []))
+            label = "  " * depth + s["name"] + (f" x{len(group)}" if len(group) > 1 else "")
+            if s.get("error"):
+                label += f" !{s['error']}"
+            bar = "#" * max(1, round(width * ms / total)) if ms else ""
+            lines.append(f"  {label:<52} {ms:9.1f} ms  self {self_ms:8.1f}  {100 * ms / total:5.1f}%  {bar}")
+            if len(group) == 1:
+                walk(s["span_id"], depth + 1)
+            i = j + 1
+
+    walk(None, 0)
+    return "\n".join(lines)
+
+
+def self_time_by_name(traces: list[dict[str, Any]]) -> dict[str, float]:
+    """Total self time per span name across traces (where the time actually went)."""
+    totals: dict[str, float] = {}
+    for t in traces:
+        child_ms: dict[str, float] = {}
+        for s in t["spans"]:
+            if s["parent_id"]:
+                child_ms[s["parent_id"]] = child_ms.get(s["parent_id"], 0.0) + s["duration_ms"]
+        for s in t["spans"]:
+            name = s["name"] if s["parent_id"] else "(root)"
+            totals[name] = totals.get(name, 0.0) + s["duration_ms"] - child_ms.get(s["span_id"], 0.0)
+    return dict(sorted(totals.items(), key=lambda kv: -kv[1]))
+
+
+def _flame(args: argparse.Namespace) -> None:
+    traces = read_traces(Path(args.path or get_settings().tracing_jsonl_path))
+    if args.route:
+        traces = [t for t in traces if args.route in t["name"]]
+    if not traces:
+        print("No traces (set TRACING_SAMPLE_RATE > 0 and make some requests)")
+        return
+    slowest = sorted(traces, key=lambda t: -t["duration_ms"])[: args.top]
+    for t in slowest:
+        print(render_trace(t))
+        print()
+    total = sum(t["duration_ms"] for t in slowest) or 1.0
+    print(f"Self time across {len(slowest)} slowest of {len(traces)} traces:")
+    for name, ms in self_time_by_name(slowest).items():
+        print(f"  {name:<40} {ms:10.1f} ms  {100 * ms / total:5.1f}%")
+
+
+def _collector(args: argparse.Namespace) -> None:
+    out = Path(args.out)
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/v1/traces":
+                self.send_error(404)
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            try:
+                traces = from_otlp(orjson.loads(body))
+            except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+                self.send_error(400, "expected OTLP/JSON")
+                return
+            with lock, open(out, "ab") as f:
+                f.write(b"".join(orjson.dumps(t) + b"\n" for t in traces))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"OTLP/JSON collector on http://{args.host}:{args.port}/v1/traces → {out}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trace inspection tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    flame = sub.add_parser("flame", help="Render the slowest traces as span trees")
+    flame.add_argument("--path", default=None, help="Trace file (default: TRACING_JSONL_PATH)")
+    flame.add_argument("--top", type=int, default=5)
+    flame.add_argument("--route", default="", help="Only traces whose root name contains this")
+    collector = sub.add_parser("collector", help="Run a local OTLP/HTTP JSON collector writing JSONL")
+    collector.add_argument("--host", default="127.0.0.1")
+    collector.add_argument("--port", type=int, default=4318)
+    collector.add_argument("--out", default="traces.jsonl")
+    args = parser.parse_args()
+    if args.command == "flame":
+        _flame(args)
+    else:
+        _collector(args)
@@ -0,0 +1,79 @@
+"""Worker warmup: what the first requests of a fresh process would otherwise pay for.
+
+Run by the lifespan of every worker (each one has its own pool, client and caches):
+    db pool     — WARMUP_DB_CONNECTIONS connections opened up front (SELECT 1 each)
+    llm client  — the process-wide AsyncOpenAI client (import of openai + client setup)
+    catalog     — prebuilt catalog bodies and ETags
+    prescorer   — import of NumPy for the answer vectorizer
+A failed step is logged and recorded in warmup_state, it doesn't stop the worker.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.services.catalog import CATALOG_BUNDLE, CATALOG_SECTIONS, get_catalog_entry
+from app.services.llm import get_openai_client
+from app.services.prescorer import vectorize
+from app.startup_profiler import startup_profiler
+
+logger = logging.getLogger(__name__)
+
+STEP_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass
+class WarmupState:
+    """Outcome of warm_up() in this process."""
+    done: bool = False
+    seconds: float = 0.0
+    errors: dict[str, str] = field(default_factory=dict)
+
+
+warmup_state = WarmupState()
+
+
+async def _warm_db_pool(connections: int) -> None:
+    async def ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Concurrently, so each ping holds its own connection and all of them stay in the pool
+    await asyncio.gather(*(ping() for _ in range(connections)))
+
+
+async def _warm_llm_client() -> None:
+    get_openai_client()
+
+
+async def _warm_catalog() -> None:
+    for name in (*CATALOG_SECTIONS, CATALOG_BUNDLE):
+        get_catalog_entry(name)
+
+
+async def _warm_prescorer() -> None:
+    vectorize("прогрев")
+
+
+async def warm_up(db_connections: int) -> WarmupState:
+    """Run the warmup steps once; returns warmup_state."""
+    t0 = time.perf_counter()
+    steps = (
+        ("db pool", lambda: _warm_db_pool(db_connections)),
+        ("llm client", _warm_llm_client),
+        ("catalog", _warm_catalog),
+        ("prescorer", _warm_prescorer),
+    )
+    for name, step in steps:
+        with startup_profiler.phase(f"warmup: {name}"):
+            try:
+                await asyncio.wait_for(step(), STEP_TIMEOUT_SECONDS)
+            except Exception as e:
+                logger.warning("Warmup step %s failed: %r", name, e)
+                warmup_state.errors[name] = repr(e)
+    warmup_state.seconds = time.perf_counter() - t0
+    warmup_state.done = True
+    return warmup_state
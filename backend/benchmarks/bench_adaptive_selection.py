@@ -0,0 +1,117 @@
+"""
+Adaptive topic: reading a user's per-subtype scores from the rollup vs scanning llm_answers.
+Usage (from backend/, needs DATABASE_URL; set DEBUG=false so SQL echo is off):
+    python -m benchmarks.bench_adaptive_selection [--sizes 100,10000,100000] [--repeat 50]
+
+For each history size, creates a user and that many llm_answers rows over the active tasks,
+writing them in analytics-writer batches (insert + rollup upsert in one transaction), then
+times the on-demand aggregation over llm_answers.feedback_json against load_topic_stats(),
+checks both give the same numbers, and times the rollup upsert overhead per batch.
+Created rows are deleted afterwards.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, insert, select, text
+
+from app.database import async_session_maker, engine
+from app.models.llm_answer import LLMAnswer, UserTopicStats
+from app.models.task import Task
+from app.models.user import User
+from app.services.topic_stats import apply_topic_stats, load_topic_stats
+
+BATCH = 50
+
+SCAN = text(
+    """
+    SELECT t.subtype, count(*), sum((a.feedback_json ->> 'score')::int)
+    FROM llm_answers a JOIN tasks t ON t.task_id = a.task_id
+    WHERE a.user_id = :user_id AND (a.feedback_json ->> 'score') ~ '^[0-9]+$'
+    GROUP BY t.subtype
+    """
+)
+
+
+async def _seed(user_id: str, task_ids: list[int], answers: int) -> tuple[float, float]:
+    """Returns mean ms per batch for the insert alone and for the rollup upsert."""
+    insert_ms, upsert_ms = [], []
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [{
+            "user_id": user_id, "name": "Bench", "email": f"{user_id}@bench.local", "password_hash": "-",
+        }])
+    for start in range(0, answers, BATCH):
+        batch = [{
+            "user_id": user_id, "created_dttm": datetime.utcnow(), "feedback_id": str(uuid.uuid4()),
+            "feedback_json": {"score": random.randint(0, 100)}, "task_id": random.choice(task_ids),
+            "user_answer": "bench",
+        } for _ in range(min(BATCH, answers - start))]
+        async with engine.begin() as conn:
+            t0 = time.perf_counter()
+            await conn.execute(insert(LLMAnswer), batch)
+            t1 = time.perf_counter()
+            await apply_topic_stats(conn, batch)
+            t2 = time.perf_counter()
+        insert_ms.append((t1 - t0) * 1000)
+        upsert_ms.append((t2 - t1) * 1000)
+    return statistics.mean(insert_ms), statistics.mean(upsert_ms)
+
+
+async def _time(fn, repeat: int) -> tuple[float, object]:
+    samples, result = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = await fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), result
+
+
+async def _cleanup(user_ids: list[str]) -> None:
+    async with async_session_maker() as db:
+        await db.execute(delete(UserTopicStats).where(UserTopicStats.user_id.in_(user_ids)))
+        await db.execute(delete(LLMAnswer).where(LLMAnswer.user_id.in_(user_ids)))
+        await db.execute(delete(User).where(User.user_id.in_(user_ids)))
+        await db.commit()
+
+
+async def bench(sizes: list[int], repeat: int) -> None:
+    random.seed(7)
+    async with async_session_maker() as db:
+        task_ids = list((await db.execute(select(Task.task_id).where(Task.retired_at.is_(None)))).scalars().all())
+    if not task_ids:
+        print("No active tasks, import some first")
+        return
+    run_id = uuid.uuid4().hex[:8]
+    user_ids = []
+    try:
+        print(f"{len(task_ids)} active tasks, batch {BATCH}, median of {repeat} reads")
+        print(f"{'answers':>8}  {'scan ms':>8}  {'rollup ms':>9}  {'insert ms/batch':>15}  {'upsert ms/batch':>15}  match")
+        for size in sizes:
+            user_id = f"bench-{run_id}-{size}"
+            user_ids.append(user_id)
+            insert_ms, upsert_ms = await _seed(user_id, task_ids, size)
+            async with async_session_maker() as db:
+                scan_ms, _ = await _time(lambda: db.execute(SCAN, {"user_id": user_id}), repeat)
+                scanned = {s: (c, t) for s, c, t in (await db.execute(SCAN, {"user_id": user_id})).all()}
+                rollup_ms, rolled = await _time(lambda: load_topic_stats(db, user_id), repeat)
+            print(f"{size:>8}  {scan_ms:>8.2f}  {rollup_ms:>9.2f}  {insert_ms:>15.2f}  {upsert_ms:>15.2f}  "
+                  f"{'OK' if scanned == rolled else 'MISMATCH'}")
+    finally:
+        await _cleanup(user_ids)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,10000,100000", help="Comma-separated history sizes")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(bench([int(s) for s in args.sizes.split(",")], args.repeat))
@@ -0,0 +1,72 @@
+"""
+Row-wise vs column-wise (pyarrow) normalization + validation of a large task catalog.
+Usage (from backend/, needs pyarrow; no DB):
+    python -m benchmarks.bench_columnar [--rows 1000000] [--bad-every 1000]
+
+Both paths read the same Parquet file; the row-wise path is what CSV/XLSX imports use
+(normalize_row + row_error per row), the columnar one is parse_columnar.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from task_migrator.import_tasks import (
+    FileReport,
+    batched,
+    iter_rows,
+    parse_columnar,
+    prepare_rows,
+)
+
+LEVELS = ("Junior", "Middle +", "Senior", " middle ")
+TYPES = ("Product analyst", "Data analyst")
+SUBTYPES = ("AB tests", "Probability theory", "Statistics", "Python", "SQL", "Algebra & Geometry")
+
+
+def write_catalog(path: Path, rows: int, bad_every: int) -> None:
+    tiers = ["Tier 3" if bad_every and i % bad_every == 0 else ("Tier 1" if i % 2 else "tier2") for i in range(rows)]
+    table = pa.table({
+        "task_question": [f"Вопрос {i}: как проверить гипотезу о росте конверсии?" for i in range(rows)],
+        "task_answer": [f"Эталонный ответ {i}" for i in range(rows)],
+        "company_tier": tiers,
+        "employee_level": [LEVELS[i % 4] for i in range(rows)],
+        "Type": [TYPES[i % 2] for i in range(rows)],
+        "subtype": [SUBTYPES[i % 6] for i in range(rows)],
+    })
+    pq.write_table(table, path)
+
+
+def main(rows: int, bad_every: int, batch_size: int = 5000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "catalog.parquet"
+        write_catalog(path, rows, bad_every)
+
+        report = FileReport(path=str(path))
+        t0 = time.perf_counter()
+        row_valid = sum(len(b) for b in batched(prepare_rows(iter_rows(path), report.add_error), batch_size))
+        row_s = time.perf_counter() - t0
+        print(f"row-wise   {row_s:7.2f} s  {rows / row_s:12,.0f} rows/s  valid {row_valid}, errors {report.error_count}")
+
+        report = FileReport(path=str(path))
+        t0 = time.perf_counter()
+        col_valid = sum(len(b) for b in parse_columnar(path, batch_size, report))
+        col_s = time.perf_counter() - t0
+        print(f"columnar   {col_s:7.2f} s  {rows / col_s:12,.0f} rows/s  valid {col_valid}, errors {report.error_count}")
+        for message in report.errors:
+            print(f"    {message}")
+        print(f"speedup    {row_s / col_s:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--bad-every", type=int, default=1000, help="Every N-th row gets an invalid tier (0 = none)")
+    args = parser.parse_args()
+    main(args.rows, args.bad_every)
@@ -0,0 +1,119 @@
+"""
+Interview history paging: keyset (HistoryService) vs LIMIT/OFFSET at increasing depth.
+Usage (from backend/, needs DATABASE_URL; set DEBUG=false so SQL echo is off):
+    python -m benchmarks.bench_history [--reports 50000] [--other-users 200] [--page 20] [--repeat 20]
+
+Creates one heavy user with --reports finished interviews (plus other users with 25 each, so
+the index is shared), then times fetching pages at several depths with the keyset cursor and
+with OFFSET (same columns), plus the full HistoryService page, and prints the plan of the
+keyset query (expected: Index Only Scan Backward on ix_interview_reports_user_history). Created rows are deleted afterwards.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, insert, select, text, tuple_
+
+from app.database import async_session_maker, engine
+from app.models.interview_report import InterviewReport
+from app.models.user import User
+from app.services.history import HISTORY_COLUMNS, HistoryService, encode_cursor
+
+EXPLAIN = text(
+    """
+    EXPLAIN (ANALYZE, BUFFERS, COSTS OFF)
+    SELECT id, session_id, created_dttm, started_dttm, specialization, experience_level, company_tier, topic,
+           tasks_count, overall_score
+    FROM interview_reports
+    WHERE user_id = :user_id AND (created_dttm, id) < (:created, :id)
+    ORDER BY created_dttm DESC, id DESC LIMIT :limit
+    """
+)
+
+
+async def _seed(user_ids: list[str], reports: int, other_reports: int) -> None:
+    now = datetime.utcnow()
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [
+            {"user_id": uid, "name": "Bench", "email": f"{uid}@bench.local", "password_hash": "-"} for uid in user_ids
+        ])
+        rows = []
+        for n, uid in enumerate(user_ids):
+            for i in range(reports if n == 0 else other_reports):
+                created = now - timedelta(minutes=i * 7 + n)
+                rows.append({
+                    "session_id": str(uuid.uuid4()), "user_id": uid, "created_dttm": created,
+                    "started_dttm": created - timedelta(minutes=30), "specialization": "product_analyst",
+                    "experience_level": "junior", "company_tier": "tier1", "topic": "statistics",
+                    "tasks_count": 3, "overall_score": i % 101,
+                })
+        for i in range(0, len(rows), 5000):
+            await conn.execute(insert(InterviewReport), rows[i:i + 5000])
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE interview_reports"))  # visibility map for index-only scans
+
+
+async def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+async def bench(reports: int, other_users: int, page: int, repeat: int) -> None:
+    run_id = uuid.uuid4().hex[:8]
+    user_ids = [f"bench-{run_id}-{i}" for i in range(other_users + 1)]
+    heavy = user_ids[0]
+    try:
+        await _seed(user_ids, reports, 25)
+        print(f"heavy user: {reports} interviews; {other_users} other users x 25; page {page}, median of {repeat}")
+        async with async_session_maker() as db:
+            ordered = (await db.execute(
+                select(InterviewReport.created_dttm, InterviewReport.id)
+                .where(InterviewReport.user_id == heavy)
+                .order_by(InterviewReport.created_dttm.desc(), InterviewReport.id.desc())
+            )).all()
+            service = HistoryService(db)
+            order = (InterviewReport.created_dttm.desc(), InterviewReport.id.desc())
+            base = select(*HISTORY_COLUMNS).where(InterviewReport.user_id == heavy).order_by(*order)
+            print(f"{'depth':>7}  {'keyset SQL ms':>13}  {'offset SQL ms':>13}  {'endpoint page ms':>16}")
+            for depth in sorted({0, page * 10, reports // 2, reports - page}):
+                cursor = encode_cursor(*ordered[depth - 1]) if depth else None
+                keyset_query = base.limit(page + 1)
+                if depth:
+                    keyset_query = keyset_query.where(
+                        tuple_(InterviewReport.created_dttm, InterviewReport.id) < tuple_(*ordered[depth - 1]))
+                keyset_ms = await _median_ms(lambda: db.execute(keyset_query), repeat)
+                offset_ms = await _median_ms(lambda: db.execute(base.offset(depth).limit(page)), repeat)
+                service_ms = await _median_ms(lambda: service.list_reports(heavy, page, cursor), repeat)
+                print(f"{depth:>7}  {keyset_ms:>13.2f}  {offset_ms:>13.2f}  {service_ms:>16.2f}")
+            created, report_id = ordered[reports // 2]
+            plan = (await db.execute(EXPLAIN, {"user_id": heavy, "created": created, "id": report_id, "limit": page + 1})).scalars().all()
+            print("keyset plan at half depth:")
+            print("\n".join(f"    {line}" for line in plan))
+    finally:
+        async with async_session_maker() as db:
+            await db.execute(delete(InterviewReport).where(InterviewReport.user_id.in_(user_ids)))
+            await db.execute(delete(User).where(User.user_id.in_(user_ids)))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=50000)
+    parser.add_argument("--other-users", type=int, default=200)
+    parser.add_argument("--page", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(bench(args.reports, args.other_users, args.page, args.repeat))
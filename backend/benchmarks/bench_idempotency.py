@@ -0,0 +1,109 @@
+"""
+Idempotency-Key middleware: per-request overhead of the memory and database stores.
+Usage (from backend/; the database store needs DATABASE_URL):
+    python -m benchmarks.bench_idempotency [--requests 2000] [--body-kb 4] [--stores memory,database]
+
+Wraps a stub ASGI route (POST /payment/create returning --body-kb of JSON) in
+IdempotencyMiddleware and times, per store: requests without the header (pass-through),
+first requests with a fresh key (run + store the response) and retries of a stored key
+(replay). Also counts byte-identical retries and retries that ran the route again (keys
+evicted from a memory store smaller than the run) and shows what the memory store holds.
+Keys created in the database are deleted afterwards.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from sqlalchemy import delete
+
+from app.config import get_settings
+from app.database import engine
+from app.idempotency import DatabaseIdempotencyStore, IdempotencyMiddleware, MemoryIdempotencyStore, scoped_key
+from app.models.idempotency import IdempotencyKey
+
+
+def _route(body: bytes):
+    runs = 0
+
+    async def app(scope, receive, send):
+        nonlocal runs
+        runs += 1
+        await receive()
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+
+    return app, lambda: runs
+
+
+async def _timed(client: httpx.AsyncClient, keys: list, payload: bytes) -> tuple[float, list[bytes]]:
+    samples, bodies = [], []
+    for key in keys:
+        headers = {"Authorization": "Bearer bench"} | ({"Idempotency-Key": key} if key else {})
+        t0 = time.perf_counter()
+        r = await client.post("/payment/create", content=payload, headers=headers)
+        samples.append((time.perf_counter() - t0) * 1e6)
+        bodies.append(r.content)
+    return statistics.median(samples), bodies
+
+
+async def bench_store(name: str, store, requests: int, body_kb: int) -> None:
+    body = b'{"payment_id":"' + b"x" * (body_kb * 1024) + b'"}'
+    route, runs = _route(body)
+    await store.start()
+    keys = [uuid.uuid4().hex for _ in range(requests)]
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=IdempotencyMiddleware(route, store)),
+                                     base_url="http://bench") as client:
+            payload = b'{"plan_id":"100_questions"}'
+            plain_us, _ = await _timed(client, [None] * requests, payload)
+            first_us, first = await _timed(client, keys, payload)
+            before = runs()
+            replay_us, replays = await _timed(client, keys, payload)
+        rerun = runs() - before
+        replayed = sum(a == b for a, b in zip(first, replays))
+        print(f"{name:<9} pass-through {plain_us:>6.0f} us   first {first_us:>6.0f} us   "
+              f"retry {replay_us:>6.0f} us   identical {replayed}/{requests}, route re-run {rerun} (evicted keys)")
+        if isinstance(store, MemoryIdempotencyStore):
+            entries, held = store.usage()
+            print(f"{'':<9} {entries} entries, {held / 1024:.0f} KiB held "
+                  f"(bounds {store.max_entries} entries, {store.max_bytes / 1024:.0f} KiB)")
+    finally:
+        await store.stop()
+        if isinstance(store, DatabaseIdempotencyStore):
+            scope = {"method": "POST", "path": "/payment/create", "headers": [(b"authorization", b"Bearer bench")]}
+            async with engine.begin() as conn:
+                await conn.execute(delete(IdempotencyKey).where(
+                    IdempotencyKey.key.in_([scoped_key(scope, k.encode()) for k in keys])))
+            await engine.dispose()
+
+
+async def main(requests: int, body_kb: int, stores: list[str]) -> None:
+    settings = get_settings()
+    print(f"{requests} requests per phase, {body_kb} KiB response, median per request")
+    if "memory" in stores:
+        # Bounds smaller than the run, so eviction is exercised
+        await bench_store("memory", MemoryIdempotencyStore(
+            ttl_seconds=3600, max_entries=requests // 2, max_bytes=settings.idempotency_max_bytes, wait_seconds=5,
+        ), requests, body_kb)
+        await bench_store("memory", MemoryIdempotencyStore(
+            ttl_seconds=3600, max_entries=requests * 2, max_bytes=settings.idempotency_max_bytes, wait_seconds=5,
+        ), requests, body_kb)
+    if "database" in stores:
+        await bench_store("database", DatabaseIdempotencyStore(settings.database_url, 3600, 5), requests, body_kb)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--body-kb", type=int, default=4)
+    parser.add_argument("--stores", default="memory,database")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.body_kb, args.stores.split(",")))
@@ -0,0 +1,100 @@
+"""
+Task importer throughput and memory on a synthetic catalog (default 1M rows).
+Usage (from backend/, needs DATABASE_URL; set DEBUG=false so SQL echo is off):
+    python -m benchmarks.bench_import [--rows 1000000] [--batch-size 5000] [--keep] [--no-near-dups]
+
+Stages: write the CSV, parse + normalize + validate only, full import into tasks.
+Peak RSS should stay flat as --rows grows (compare 100000 vs 1000000).
+Inserted rows are tagged source=bench-<run id> and deleted afterwards unless --keep.
+The synthetic questions are templated (near-duplicates of each other), which is the worst case
+for near-duplicate detection: compare with --no-near-dups for its overhead.
+"""
+import argparse
+import asyncio
+import csv
+import resource
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete
+
+from app.database import async_session_maker, engine
+from app.models.task import Task
+from task_migrator.import_tasks import import_tasks, iter_rows, prepare_rows
+from task_migrator.near_duplicates import DEFAULT_THRESHOLD, purge_orphans
+
+LEVELS = ("Junior", "Middle +", "Senior")
+TYPES = ("Product analyst", "Data analyst")
+SUBTYPES = ("AB tests", "Probability theory", "Statistics", "Python", "SQL", "Algebra & Geometry")
+
+
+def write_catalog(path: Path, rows: int, source: str, dup_every: int = 100) -> None:
+    """Synthetic partner catalog; every dup_every-th row repeats an earlier question."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["task_question", "task_answer", "company_tier", "employee_level", "type", "subtype", "source"])
+        for i in range(rows):
+            q = i - 1 if dup_every and i and i % dup_every == 0 else i
+            w.writerow([
+                f"Вопрос {q}: как проверить гипотезу о росте конверсии в сегменте {q % 97}?",
+                f"Эталонный ответ {q}: t-тест, мощность, MDE.",
+                "Tier 1" if q % 2 else "tier2",
+                LEVELS[q % 3],
+                TYPES[q % 2],
+                SUBTYPES[q % 6],
+                source,
+            ])
+
+
+def max_rss_mb() -> float:
+    """Peak RSS of this process or of the largest parser worker (KiB on Linux)."""
+    return max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    ) / 1024
+
+
+async def run(rows: int, batch_size: int, keep: bool, near_dups: bool) -> None:
+    source = f"bench-{uuid.uuid4().hex[:8]}"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "catalog.csv"
+        t0 = time.perf_counter()
+        write_catalog(path, rows, source)
+        print(f"write csv         {time.perf_counter() - t0:8.2f} s  ({path.stat().st_size / 2**20:.0f} MiB)")
+
+        rss_before = max_rss_mb()
+        t0 = time.perf_counter()
+        parsed = sum(1 for _ in prepare_rows(iter_rows(path)))
+        dt = time.perf_counter() - t0
+        print(f"parse+normalize   {dt:8.2f} s  {parsed / dt:12,.0f} rows/s  peak RSS {max_rss_mb():.0f} MiB")
+
+        t0 = time.perf_counter()
+        summary = await import_tasks(
+            [str(path)], batch_size=batch_size, near_dup_threshold=DEFAULT_THRESHOLD if near_dups else None,
+        )
+        dt = time.perf_counter() - t0
+        print(f"full import       {dt:8.2f} s  {summary.read / dt:12,.0f} rows/s  peak RSS {max_rss_mb():.0f} MiB "
+              f"(+{max_rss_mb() - rss_before:.0f} MiB over start)")
+
+    if not keep:
+        async with async_session_maker() as session:
+            await session.execute(delete(Task).where(Task.source == source))
+            await session.commit()
+        async with engine.connect() as conn:
+            await purge_orphans(conn)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--keep", action="store_true", help="Keep the inserted rows")
+    parser.add_argument("--no-near-dups", action="store_true", help="Import without near-duplicate detection")
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.batch_size, args.keep, not args.no_near_dups))
@@ -0,0 +1,85 @@
+"""
+Overhead of MetricsMiddleware and metric updates on the request hot path.
+Usage (from backend/):
+    python -m benchmarks.bench_metrics [--requests 100000]
+
+1. Exact middleware cost: MetricsMiddleware around a stub ASGI app vs the stub alone.
+2. Baseline: end-to-end latency of GET /interview/topics on the real app in-process
+   (httpx ASGITransport, no network, no DB) — one of the cheapest routes, so the
+   ratio is an upper bound for routes that touch the DB or the LLM.
+End-to-end A/B timing of the whole app is too noisy to resolve a few microseconds,
+hence the isolated measurement.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+from app.main import app
+from app.metrics import HTTP_REQUEST_DURATION, MetricsMiddleware
+
+
+async def _stub_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _noop_send(message):
+    pass
+
+
+async def _noop_receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def _per_call(asgi_app, n: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/bench"}
+    t0 = time.perf_counter()
+    for _ in range(n):
+        await asgi_app(dict(scope), _noop_receive, _noop_send)
+    return (time.perf_counter() - t0) / n
+
+
+async def _route_latency(n: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(100):
+            await client.get("/interview/topics")
+        samples = []
+        for _ in range(n):
+            t0 = time.perf_counter()
+            await client.get("/interview/topics")
+            samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100_000)
+    args = parser.parse_args()
+
+    n = args.requests
+    per_observe = timeit.timeit(lambda: HTTP_REQUEST_DURATION.observe(0.012, "GET", "/bench", "200"), number=n) / n
+    print(f"Histogram.observe:                 {per_observe * 1e9:8.0f} ns")
+
+    bare = min(asyncio.run(_per_call(_stub_app, n)) for _ in range(3))
+    wrapped = min(asyncio.run(_per_call(MetricsMiddleware(_stub_app), n)) for _ in range(3))
+    cost = wrapped - bare
+    print(f"MetricsMiddleware cost:            {cost * 1e6:8.2f} µs/request")
+
+    route = asyncio.run(_route_latency(min(n, 5000)))
+    print(f"GET /interview/topics (median):    {route * 1e6:8.1f} µs/request")
+    print(f"Overhead on the cheapest route:    {cost / route * 100:8.2f} %")
+    for typical_ms in (5, 20):
+        print(f"Overhead on a {typical_ms:>2} ms DB-backed route: {cost / (typical_ms / 1000) * 100:8.3f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Local pre-scorer: cost per answer and how much of the LLM prompt it removes.
+Usage (from backend/):
+    python -m benchmarks.bench_prescore [--sessions 2000] [--trivial-share 0.3]
+
+Builds 3-task sessions over a few reference answers; a share of the answers is trivial
+(empty, "не знаю"-style, copied reference with small edits), the rest are genuine answers.
+Prints classify() latency with cold and cached reference vectors, verdict counts, prompt
+characters sent to the model with and without pre-scoring, and the similarity margin
+between genuine answers and copies.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.llm_config_loader import get_prescore_config
+from app.services.llm import build_full_interview_user_message
+from app.services.prescorer import PRESCORE_VERBATIM, classify, prescore_items, reference_vector, vectorize
+
+REFERENCES = [
+    "P-value — это вероятность получить наблюдаемые или более экстремальные результаты при условии, что нулевая "
+    "гипотеза верна. Если p-value меньше уровня значимости (обычно 0.05), нулевую гипотезу отвергают.",
+    "Retention N-го дня — доля пользователей когорты, вернувшихся в продукт на N-й день после первого визита. "
+    "Считаем по когортам регистрации, смотрим кривую удержания и её выход на плато.",
+    "Для A/B-теста заранее фиксируем метрику, минимальный детектируемый эффект, мощность и уровень значимости, "
+    "по ним считаем размер выборки; тест не останавливаем раньше срока из-за подглядывания.",
+    "Медиана устойчива к выбросам, поэтому для чека или времени сессии с тяжёлым хвостом она лучше среднего; "
+    "среднее удобно для суммарной выручки и линейных метрик.",
+    "ROW_NUMBER нумерует строки окна подряд, RANK даёт одинаковый ранг равным значениям с пропусками, "
+    "DENSE_RANK — без пропусков.",
+]
+GENUINE = [
+    "Я бы сначала посмотрел на распределение, потом выбрал статистический тест: для долей z-тест, для средних "
+    "t-тест или бутстрап, и проверил бы, что выборки независимы и достаточно большие.",
+    "Удержание считаю по когортам: берём пользователей, пришедших в одну неделю, и смотрим, какая часть "
+    "возвращается через 1, 7 и 30 дней; важно отделить сезонность от эффекта фич.",
+    "Сначала сформулирую гипотезу и метрику успеха, затем посчитаю размер выборки под нужный эффект, "
+    "проверю сплит на SRM и только после набора выборки смотрю на результат.",
+    "Если в данных есть выбросы, среднее сильно сдвигается, поэтому для медианного пользователя лучше медиана, "
+    "а для финансов иногда важнее именно среднее, потому что оно связано с суммой.",
+]
+SHORT = ["", "  ", "не знаю", "-", "да", "сложно сказать", "?"]
+
+
+def _copy_with_edits(ref: str) -> str:
+    """Reference with ~10% of the words dropped and a couple of typos."""
+    words = [w for w in ref.split() if random.random() > 0.1]
+    for _ in range(2):
+        i = random.randrange(len(words))
+        if len(words[i]) > 3:
+            j = random.randrange(1, len(words[i]) - 1)
+            words[i] = words[i][:j] + words[i][j + 1:]
+    return " ".join(words)
+
+
+def _answer(ref: str, trivial_share: float) -> str:
+    if random.random() < trivial_share:
+        return random.choice(SHORT) if random.random() < 0.75 else _copy_with_edits(ref)
+    return random.choice(GENUINE)
+
+
+def main(sessions: int, trivial_share: float) -> None:
+    random.seed(7)
+    config = get_prescore_config()
+    selection = {"specialization": "product_analyst", "experience_level": "junior",
+                 "company_tier": "tier1", "topic": "statistics"}
+    all_items = []
+    for s in range(sessions):
+        refs = random.sample(REFERENCES, 3)
+        all_items.append([
+            {"task_id": s * 3 + i, "task_question": f"Вопрос {i + 1}", "task_answer": ref,
+             "user_answer": _answer(ref, trivial_share), "subtype": "general"}
+            for i, ref in enumerate(refs)
+        ])
+
+    vectorize("")  # NumPy is imported on first use; keep that out of the timing
+    reference_vector.cache_clear()
+    t0 = time.perf_counter()
+    for ref in REFERENCES:
+        classify(GENUINE[0], ref, config)
+    cold_us = (time.perf_counter() - t0) / len(REFERENCES) * 1e6
+
+    verdicts: dict[str, int] = {}
+    prompt_full = prompt_sent = llm_calls = 0
+    t0 = time.perf_counter()
+    prescored_sessions = [prescore_items(items) for items in all_items]
+    warm_us = (time.perf_counter() - t0) / (sessions * 3) * 1e6
+    for items, prescored in zip(all_items, prescored_sessions):
+        rest = [it for it, (verdict, _) in zip(items, prescored) if verdict is None]
+        for verdict, _ in prescored:
+            verdicts[verdict or "llm"] = verdicts.get(verdict or "llm", 0) + 1
+        prompt_full += len(build_full_interview_user_message(items, selection))
+        if rest:
+            llm_calls += 1
+            prompt_sent += len(build_full_interview_user_message(rest, selection))
+
+    genuine_sim = [classify(g, ref, config)[1] for g in GENUINE for ref in REFERENCES]
+    copy_sim = [classify(_copy_with_edits(ref), ref, config)[1] for ref in REFERENCES for _ in range(20)]
+    copies_caught = sum(classify(_copy_with_edits(ref), ref, config)[0] == PRESCORE_VERBATIM
+                        for ref in REFERENCES for _ in range(20))
+
+    print(f"{sessions} sessions x 3 answers, trivial share {trivial_share:g}")
+    print(f"classify        {cold_us:.0f} us/answer with a cold reference, {warm_us:.0f} us/answer cached")
+    print(f"verdicts        {dict(sorted(verdicts.items()))}")
+    print(f"LLM calls       {llm_calls} of {sessions} sessions ({sessions - llm_calls} graded fully locally)")
+    print(f"user prompt     {prompt_sent:,} of {prompt_full:,} chars sent ({100 * (1 - prompt_sent / prompt_full):.1f}% saved)")
+    print(f"similarity      genuine max {max(genuine_sim):.2f} (mean {statistics.mean(genuine_sim):.2f}), "
+          f"copies min {min(copy_sim):.2f}; threshold {config.verbatim_similarity:g}, "
+          f"copies caught {copies_caught}/{len(copy_sim)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--trivial-share", type=float, default=0.3, help="Share of trivial answers")
+    args = parser.parse_args()
+    main(args.sessions, args.trivial_share)
@@ -0,0 +1,122 @@
+"""
+Reconciliation of pending payments against a local YooKassa stub.
+Usage (from backend/, needs DATABASE_URL; set DEBUG=false so SQL echo is off):
+    python -m benchmarks.bench_reconcile [--payments 2000] [--rate 200] [--concurrency 20] [--latency-ms 50]
+
+Creates users and payments (in the DB and in the stub), leaves them "pending" in the DB (as if
+every webhook was lost), flips them to succeeded / canceled / pending at the stub, then
+runs two reconciliation passes. The first must credit every succeeded payment exactly
+once, the second must change nothing. Created rows are deleted afterwards.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, func, select
+
+from app.config import get_settings
+from app.database import async_session_maker, engine
+from app.models.payment import Payment
+from app.models.user import User
+from app.services.payment import PRICING_PLANS
+from app.services.payment_reconciler import PaymentReconciler
+from app.services.yookassa_client import YooKassaClient, make_stub_server
+
+PLAN = PRICING_PLANS["100_questions"]
+USERS = 50
+
+
+async def _create(stub_payments: dict, run_id: str, payments: int) -> tuple[list[str], list[str]]:
+    user_ids = [f"bench-{run_id}-{i}" for i in range(USERS)]
+    transaction_ids = [str(uuid.uuid4()) for _ in range(payments)]
+    for tid in transaction_ids:  # as if created through the stub's POST /payments
+        stub_payments[tid] = {
+            "id": tid, "status": "pending", "amount": {"value": f"{PLAN.price:.2f}", "currency": PLAN.currency},
+            "payment_method": {"type": "bank_card"},
+        }
+    old = datetime.utcnow() - timedelta(hours=1)
+    async with async_session_maker() as db:
+        db.add_all(
+            User(user_id=uid, name="Bench", email=f"{uid}@bench.local", password_hash="-", paid_questions_number_left=0)
+            for uid in user_ids
+        )
+        await db.flush()
+        db.add_all(
+            Payment(
+                user_id=user_ids[i % USERS], transaction_id=tid, status="pending", payment_dttm=old,
+                transaction_sum=PLAN.price, product_id=PLAN.plan_id,
+            )
+            for i, tid in enumerate(transaction_ids)
+        )
+        await db.commit()
+    return user_ids, transaction_ids
+
+
+async def _cleanup(user_ids: list[str], transaction_ids: list[str]) -> None:
+    async with async_session_maker() as db:
+        await db.execute(delete(Payment).where(Payment.transaction_id.in_(transaction_ids)))
+        await db.execute(delete(User).where(User.user_id.in_(user_ids)))
+        await db.commit()
+
+
+async def bench(payments: int, rate: float, concurrency: int, latency_ms: float, port: int) -> None:
+    server = make_stub_server(port=port, latency_ms=latency_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = YooKassaClient("bench", "bench-secret", api_url=f"http://127.0.0.1:{port}/v3", max_connections=concurrency)
+    run_id = uuid.uuid4().hex[:8]
+    user_ids, transaction_ids = await _create(server.payments, run_id, payments)
+    reconciler = PaymentReconciler(
+        get_settings().database_url, client, min_age_seconds=60, concurrency=concurrency, rate_per_second=rate,
+    )
+    try:
+        outcome = {}
+        for tid in transaction_ids:
+            outcome[tid] = random.choices(("succeeded", "canceled", "pending"), weights=(6, 2, 2))[0]
+            server.payments[tid]["status"] = outcome[tid]
+        succeeded = sum(1 for s in outcome.values() if s == "succeeded")
+        print(f"{payments} pending payments (stub: {succeeded} succeeded), rate {rate:g}/s, "
+              f"concurrency {concurrency}, stub latency {latency_ms:g} ms")
+
+        for attempt in (1, 2):
+            t0 = time.perf_counter()
+            summary = await reconciler.run_once()
+            seconds = time.perf_counter() - t0
+            print(f"pass {attempt}: {summary.line()}; {summary.checked / seconds:,.0f} payments/s")
+
+        async with async_session_maker() as db:
+            balances = (await db.execute(
+                select(func.sum(User.paid_questions_number_left)).where(User.user_id.in_(user_ids))
+            )).scalar_one()
+            statuses = dict((await db.execute(
+                select(Payment.status, func.count()).where(Payment.transaction_id.in_(transaction_ids))
+                .group_by(Payment.status)
+            )).all())
+        expected = succeeded * PLAN.questions_count
+        print(f"payment rows    {statuses}")
+        print(f"credited        {balances} questions (expected {expected}) -> "
+              f"{'OK' if balances == expected else 'DOUBLE CREDIT' if balances > expected else 'MISSING'}")
+    finally:
+        await reconciler.stop()
+        await client.stop()
+        await _cleanup(user_ids, transaction_ids)
+        await engine.dispose()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payments", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=200.0, help="YooKassa requests per second")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Stub response delay")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(bench(args.payments, args.rate, args.concurrency, args.latency_ms, args.port))
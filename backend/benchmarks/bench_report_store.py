@@ -0,0 +1,81 @@
+"""
+Stored final reports: size and cost of pack_report / unpack_report.
+Usage (from backend/):
+    python -m benchmarks.bench_report_store [--reports 2000] [--tasks 3]
+
+Builds reports shaped like the model's output (Russian feedback of a few hundred words per
+task) and prints raw JSON vs zlib-compressed size, and pack / unpack time per report
+(unpack is what a repeated /finish or GET /session/{id}/report pays instead of an LLM call).
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.schemas.interview import FinalReport, TaskFeedback
+from app.serialization import encode_json
+from app.services.history import pack_report, unpack_report
+
+WORDS = (
+    "гипотеза выборка метрика конверсия p-value мощность эффект дисперсия бутстрап когорта удержание "
+    "распределение медиана среднее выброс тест контроль группа сплит значимость интервал доверительный "
+    "ошибка первого второго рода стратификация CUPED ratio-метрика дельта-метод линеаризация"
+).split()
+
+
+def _text(words: int) -> str:
+    return " ".join(random.choice(WORDS) for _ in range(words))
+
+
+def _report(i: int, tasks: int) -> FinalReport:
+    return FinalReport(
+        session_id=f"bench-{i}",
+        overall_score=random.randint(0, 100),
+        task_feedbacks=[
+            TaskFeedback(
+                task_id=i * tasks + t, task_question=_text(40), user_answer=_text(150),
+                score=random.randint(0, 100), strengths=[_text(12) for _ in range(3)],
+                improvements=[_text(12) for _ in range(3)], detailed_feedback=_text(300),
+            )
+            for t in range(tasks)
+        ],
+        overall_strengths=[_text(10) for _ in range(3)],
+        areas_to_improve=[_text(10) for _ in range(3)],
+        study_recommendations=[_text(10) for _ in range(4)],
+        motivational_message=_text(30),
+        completed_at=datetime.utcnow(),
+    )
+
+
+def main(reports: int, tasks: int) -> None:
+    random.seed(7)
+    items = [_report(i, tasks) for i in range(reports)]
+    raw = [len(encode_json(r)) for r in items]
+
+    t0 = time.perf_counter()
+    blobs = [pack_report(r) for r in items]
+    pack_us = (time.perf_counter() - t0) / reports * 1e6
+    t0 = time.perf_counter()
+    restored = [unpack_report(b) for b in blobs]
+    unpack_us = (time.perf_counter() - t0) / reports * 1e6
+    assert all(encode_json(a) == encode_json(b) for a, b in zip(items, restored))
+
+    print(f"{reports} reports x {tasks} tasks")
+    print(f"raw JSON        {statistics.mean(raw) / 1024:.1f} KiB/report")
+    print(f"zlib            {statistics.mean(len(b) for b in blobs) / 1024:.1f} KiB/report "
+          f"({sum(raw) / sum(len(b) for b in blobs):.1f}x smaller)")
+    print(f"pack            {pack_us:.0f} us/report")
+    print(f"unpack          {unpack_us:.0f} us/report (round trip is lossless)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, default=3)
+    args = parser.parse_args()
+    main(args.reports, args.tasks)
@@ -0,0 +1,79 @@
+"""
+Encode time and payload size of large final reports: stdlib path vs orjson vs MessagePack.
+Usage (from backend/):
+    python -m benchmarks.bench_serialization [--tasks 3 10 50] [--repeat 200]
+
+"fastapi default" = what FastAPI did before: jsonable_encoder(dict) + json.dumps.
+"""
+import argparse
+import gzip
+import json
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import msgpack
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from app.schemas.interview import FinalReport, TaskFeedback
+from app.serialization import encode_json
+
+
+def make_report(n_tasks: int) -> FinalReport:
+    text = "Разбор ответа: метрика, гипотеза, дизайн эксперимента. " * 55  # ~3000 chars
+    feedbacks = [
+        TaskFeedback(
+            task_id=i,
+            task_question=text[:3000],
+            user_answer=text[:3000],
+            score=70,
+            strengths=["Структура ответа", "Корректные термины"],
+            improvements=["Мощность теста", "Проверка SRM"],
+            detailed_feedback=text * 2,
+        )
+        for i in range(n_tasks)
+    ]
+    return FinalReport(
+        session_id="00000000-0000-0000-0000-000000000000",
+        overall_score=70,
+        task_feedbacks=feedbacks,
+        overall_strengths=["Хорошая база"],
+        areas_to_improve=["A/B тесты"],
+        study_recommendations=["Повторить CUPED", "Повторить bootstrap", "Повторить SQL окна"],
+        motivational_message="Отличная работа!",
+        completed_at=datetime.utcnow(),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, nargs="+", default=[3, 10, 50])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    for n in args.tasks:
+        report = make_report(n)
+        as_dict = report.model_dump(mode="json")
+        encoders = {
+            "fastapi default (jsonable_encoder + json)": lambda: json.dumps(
+                jsonable_encoder(report.model_dump()), ensure_ascii=False
+            ).encode("utf-8"),
+            "orjson (app default)": lambda: encode_json(report),
+            "pydantic model_dump_json": lambda: report.model_dump_json().encode("utf-8"),
+            "msgpack": lambda: msgpack.packb(report.model_dump(mode="json"), use_bin_type=True),
+        }
+        assert orjson.loads(encode_json(report))["task_feedbacks"][0]["task_id"] == as_dict["task_feedbacks"][0]["task_id"]
+        print(f"\n{n} task feedbacks")
+        print(f"  {'encoder':<44} {'µs/op':>10} {'bytes':>10} {'gzip':>8}")
+        for name, fn in encoders.items():
+            seconds = min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat
+            body = fn()
+            print(f"  {name:<44} {seconds * 1e6:10.1f} {len(body):10d} {len(gzip.compress(body)):8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Replay storm against POST /payment/webhook: every payment.succeeded is delivered many times
+concurrently, as YooKassa does when acks are slow.
+Usage (from backend/, needs DATABASE_URL; set DEBUG=false so SQL echo is off):
+    python -m benchmarks.bench_webhook_storm [--payments 200] [--replays 10] [--concurrency 50]
+    python -m benchmarks.bench_webhook_storm --url http://127.0.0.1:8000   # against a running server
+
+In-process mode uses httpx ASGITransport and starts the inbox consumer itself.
+Reports ack latency percentiles and throughput, then waits for the consumer and checks
+that every user was credited exactly once per payment. Created rows are deleted afterwards.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from sqlalchemy import delete, func, select
+
+from app.database import async_session_maker, engine
+from app.models.payment import Payment, PaymentWebhookEvent
+from app.models.user import User
+from app.services.payment import PRICING_PLANS
+from app.services.payment_inbox import get_payment_inbox
+
+PLAN = PRICING_PLANS["100_questions"]
+USERS = 20
+
+
+async def _create_payments(run_id: str, payments: int) -> tuple[list[str], list[str]]:
+    user_ids = [f"bench-{run_id}-{i}" for i in range(USERS)]
+    transaction_ids = [f"bench-{run_id}-pay-{i}" for i in range(payments)]
+    async with async_session_maker() as db:
+        db.add_all(
+            User(user_id=uid, name="Bench", email=f"{uid}@bench.local", password_hash="-", paid_questions_number_left=0)
+            for uid in user_ids
+        )
+        await db.flush()
+        db.add_all(
+            Payment(
+                user_id=user_ids[i % USERS], transaction_id=tid, status="pending",
+                transaction_sum=PLAN.price, product_id=PLAN.plan_id,
+            )
+            for i, tid in enumerate(transaction_ids)
+        )
+        await db.commit()
+    return user_ids, transaction_ids
+
+
+async def _cleanup(user_ids: list[str], transaction_ids: list[str]) -> None:
+    async with async_session_maker() as db:
+        await db.execute(delete(PaymentWebhookEvent).where(PaymentWebhookEvent.payment_id.in_(transaction_ids)))
+        await db.execute(delete(Payment).where(Payment.transaction_id.in_(transaction_ids)))
+        await db.execute(delete(User).where(User.user_id.in_(user_ids)))
+        await db.commit()
+
+
+async def _storm(client: httpx.AsyncClient, transaction_ids: list[str], replays: int, concurrency: int):
+    deliveries = [tid for tid in transaction_ids for _ in range(replays)]
+    random.shuffle(deliveries)
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    queue: asyncio.Queue = asyncio.Queue()
+    for tid in deliveries:
+        queue.put_nowait(tid)
+
+    async def worker():
+        while not queue.empty():
+            tid = queue.get_nowait()
+            body = {
+                "type": "notification",
+                "event": "payment.succeeded",
+                "object": {"id": tid, "status": "succeeded", "payment_method": {"type": "bank_card"}},
+            }
+            t0 = time.perf_counter()
+            r = await client.post("/payment/webhook", json=body)
+            latencies.append(time.perf_counter() - t0)
+            statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - t0
+
+
+async def run(payments: int, replays: int, concurrency: int, url: Optional[str]) -> None:
+    run_id = uuid.uuid4().hex[:8]
+    user_ids, transaction_ids = await _create_payments(run_id, payments)
+    inbox = None
+    try:
+        if url:
+            client = httpx.AsyncClient(base_url=url, timeout=30)
+        else:
+            from app.main import app
+            inbox = get_payment_inbox()
+            await inbox.start()
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+        async with client:
+            latencies, statuses, seconds = await _storm(client, transaction_ids, replays, concurrency)
+
+        latencies.sort()
+        pct = lambda p: latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+        print(f"deliveries      {len(latencies)} ({payments} payments x {replays}), concurrency {concurrency}")
+        print(f"statuses        {statuses}")
+        print(f"throughput      {len(latencies) / seconds:,.0f} req/s")
+        print(f"ack latency     p50 {pct(50):.1f} ms  p95 {pct(95):.1f} ms  p99 {pct(99):.1f} ms  "
+              f"mean {statistics.mean(latencies) * 1000:.1f} ms")
+
+        t0 = time.perf_counter()
+        async with async_session_maker() as db:
+            while True:
+                pending = (await db.execute(
+                    select(func.count()).select_from(Payment)
+                    .where(Payment.transaction_id.in_(transaction_ids), Payment.status == "pending")
+                )).scalar_one()
+                if not pending or time.perf_counter() - t0 > 60:
+                    break
+                await asyncio.sleep(0.1)
+            print(f"applied in      {time.perf_counter() - t0:.2f} s after the storm ({pending} still pending)")
+            inbox_rows = (await db.execute(
+                select(func.count()).select_from(PaymentWebhookEvent)
+                .where(PaymentWebhookEvent.payment_id.in_(transaction_ids))
+            )).scalar_one()
+            balances = (await db.execute(
+                select(func.sum(User.paid_questions_number_left)).where(User.user_id.in_(user_ids))
+            )).scalar_one()
+        expected = payments * PLAN.questions_count
+        print(f"inbox rows      {inbox_rows} (expected {payments})")
+        print(f"credited        {balances} questions (expected {expected}) -> "
+              f"{'OK' if balances == expected else 'DOUBLE CREDIT' if balances > expected else 'MISSING'}")
+    finally:
+        if inbox is not None:
+            await inbox.stop()
+        await _cleanup(user_ids, transaction_ids)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payments", type=int, default=200)
+    parser.add_argument("--replays", type=int, default=10, help="Deliveries of each notification")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--url", default=None, help="Base URL of a running server (default: in-process app)")
+    args = parser.parse_args()
+    asyncio.run(run(args.payments, args.replays, args.concurrency, args.url))
@@ -0,0 +1,153 @@
+"""
+Throughput and memory versus worker count (gunicorn.conf.py, WEB_WORKERS > 1).
+Usage (from backend/, needs DATABASE_URL; set DEBUG=false so SQL echo is off):
+    python -m benchmarks.bench_workers [--workers 1,2,4] [--requests 2000] [--concurrency 32] [--port 8031]
+
+For each worker count starts `gunicorn -c gunicorn.conf.py` (SESSION_STORE=database, no
+recycling), waits for /health, then loads two routes: GET /interview/catalog (cheap, I/O-
+bound) and POST /auth/login (an Argon2 verify, CPU-bound). Prints req/s and p50 / p99 per
+route, and the memory of the workers (sum of PSS from /proc/<pid>/smaps_rollup, so pages
+shared copy-on-write are split between them) with and without WEB_PRELOAD. The load generator
+runs on the same host: throughput can't grow past the cores left to the workers.
+The bench user is deleted afterwards.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from sqlalchemy import delete
+
+from app.database import async_session_maker, engine
+from app.models.user import User
+from app.services.auth import hash_password
+
+BACKEND = Path(__file__).resolve().parent.parent
+PASSWORD = "bench-password"
+
+
+def _start(workers: int, port: int, preload: bool) -> subprocess.Popen:
+    env = os.environ | {
+        "WEB_WORKERS": str(workers),
+        "WEB_BIND": f"127.0.0.1:{port}",
+        "WEB_PRELOAD": str(preload).lower(),
+        "WEB_MAX_REQUESTS": "0",
+        "SESSION_STORE": "database",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--access-logfile", "/dev/null"],
+        cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def _stop(proc: subprocess.Popen) -> None:
+    proc.terminate()
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+async def _wait_ready(client: httpx.AsyncClient, proc: subprocess.Popen, workers: int) -> None:
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            if (await client.get("/health")).status_code == 200 and len(_worker_pids(proc.pid)) == workers:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("gunicorn didn't become ready in 60 s")
+
+
+def _worker_pids(master: int) -> list[int]:
+    try:
+        return [int(p) for p in Path(f"/proc/{master}/task/{master}/children").read_text().split()]
+    except OSError:
+        return []
+
+
+def _pss_mib(pid: int) -> float:
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        if line.startswith("Pss:"):
+            return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def _load(client: httpx.AsyncClient, requests: int, concurrency: int, send) -> tuple[float, float, float]:
+    latencies: list[float] = []
+    queue = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in queue:
+            t0 = time.perf_counter()
+            r = await send(client)
+            r.raise_for_status()
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    q = statistics.quantiles(latencies, n=100)
+    return requests / elapsed, q[49], q[98]
+
+
+async def bench(workers: int, preload: bool, port: int, requests: int, concurrency: int, email: str) -> None:
+    proc = _start(workers, port, preload)
+    limits = httpx.Limits(max_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60, limits=limits) as client:
+            await _wait_ready(client, proc, workers)
+            routes = {
+                "catalog": (requests, lambda c: c.get("/interview/catalog")),
+                "login": (max(requests // 10, concurrency), lambda c: c.post(
+                    "/auth/login", json={"login": email, "password": PASSWORD})),
+            }
+            results = []
+            for name, (count, send) in routes.items():
+                await _load(client, concurrency, concurrency, send)  # every worker has seen the route
+                rps, p50, p99 = await _load(client, count, concurrency, send)
+                results.append(f"{name} {rps:>7.0f} req/s  p50 {p50:>6.1f} ms  p99 {p99:>6.1f} ms")
+        pss = sum(_pss_mib(pid) for pid in _worker_pids(proc.pid))
+        print(f"{workers:>2} workers  preload {'on ' if preload else 'off'}  "
+              f"{' | '.join(results)}  | workers PSS {pss:>6.1f} MiB")
+    finally:
+        _stop(proc)
+
+
+async def main(worker_counts: list[int], requests: int, concurrency: int, port: int) -> None:
+    print(f"{os.cpu_count()} CPUs, {requests} catalog / {max(requests // 10, concurrency)} login requests, "
+          f"concurrency {concurrency}")
+    email = f"bench-{uuid.uuid4().hex[:8]}@bench.local"
+    async with async_session_maker() as db:
+        db.add(User(user_id=str(uuid.uuid4()), name="Bench", email=email, password_hash=hash_password(PASSWORD)))
+        await db.commit()
+    try:
+        for workers in worker_counts:
+            await bench(workers, True, port, requests, concurrency, email)
+        await bench(max(worker_counts), False, port, requests, concurrency, email)
+    finally:
+        async with async_session_maker() as db:
+            await db.execute(delete(User).where(User.email == email))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8031)
+    args = parser.parse_args()
+    asyncio.run(main([int(n) for n in args.workers.split(",")], args.requests, args.concurrency, args.port))
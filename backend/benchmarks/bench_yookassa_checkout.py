@@ -0,0 +1,100 @@
+"""
+Checkout creation against a local YooKassa stub: the pooled async client vs the sync SDK
+under asyncio.to_thread (the previous implementation).
+Usage (from backend/):
+    python -m benchmarks.bench_yookassa_checkout [--requests 500] [--concurrency 50] [--latency-ms 100]
+    python -m benchmarks.bench_yookassa_checkout --fail-rate 0.2   # 503s: retries must not duplicate payments
+
+The "sdk" mode runs only when the yookassa package is installed.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.yookassa_client import YooKassaClient, make_stub_server
+
+PAYLOAD = {
+    "amount": {"value": "20.00", "currency": "RUB"},
+    "confirmation": {"type": "redirect", "return_url": "http://localhost:3000/payment/success"},
+    "capture": True,
+    "description": "Mock Interview: Basic",
+    "metadata": {"user_id": "bench", "plan_id": "100_questions"},
+}
+
+
+async def _run(create, requests: int, concurrency: int) -> tuple[list[float], int, float, int]:
+    latencies: list[float] = []
+    errors = 0
+    peak_threads = threading.active_count()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors, peak_threads
+        async with semaphore:
+            t0 = time.perf_counter()
+            try:
+                await create()
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - t0)
+            peak_threads = max(peak_threads, threading.active_count())
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies, errors, time.perf_counter() - t0, peak_threads
+
+
+def _report(mode: str, latencies: list[float], errors: int, seconds: float, peak_threads: int, created: int) -> None:
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+    print(f"{mode:<6} {len(latencies) / seconds:8.0f} req/s  p50 {pct(50):7.1f} ms  p95 {pct(95):7.1f} ms  "
+          f"mean {statistics.mean(latencies) * 1000:7.1f} ms  errors {errors}  "
+          f"payments created {created}  peak threads {peak_threads}")
+
+
+async def bench(requests: int, concurrency: int, latency_ms: float, fail_rate: float, port: int) -> None:
+    server = make_stub_server(port=port, latency_ms=latency_ms, fail_rate=fail_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{port}/v3"
+    print(f"{requests} checkouts, concurrency {concurrency}, stub latency {latency_ms:g} ms, fail rate {fail_rate:g}")
+    try:
+        try:
+            from yookassa import Configuration, Payment as YKPayment
+        except ImportError:
+            print("sdk    skipped (yookassa not installed)")
+        else:
+            Configuration.configure("bench", "bench-secret", api_url=api_url, timeout=10, max_attempts=3)
+            before = len(server.payments)
+            results = await _run(lambda: asyncio.to_thread(YKPayment.create, PAYLOAD, str(uuid.uuid4())),
+                                 requests, concurrency)
+            _report("sdk", *results, len(server.payments) - before)
+
+        client = YooKassaClient("bench", "bench-secret", api_url=api_url, max_connections=concurrency,
+                                retry_backoff_seconds=0.05)
+        await client.start()
+        try:
+            before = len(server.payments)
+            results = await _run(lambda: client.create_payment(PAYLOAD), requests, concurrency)
+            _report("async", *results, len(server.payments) - before)
+        finally:
+            await client.stop()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Stub response delay")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of stub responses that are 503")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(bench(args.requests, args.concurrency, args.latency_ms, args.fail_rate, args.port))
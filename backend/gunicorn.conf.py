@@ -0,0 +1,69 @@
+"""Gunicorn settings for the multi-process mode (WEB_WORKERS > 1, see start.sh).
+
+A gunicorn master with uvicorn workers; everything comes from the app settings (env / .env):
+WEB_WORKERS, WEB_BIND, WEB_PRELOAD, WEB_MAX_REQUESTS (+ _JITTER), WEB_GRACEFUL_TIMEOUT, WEB_TIMEOUT.
+
+With WEB_PRELOAD the master imports the app (and PRELOAD_MODULES) once and freezes the GC,
+so workers share those pages copy-on-write instead of importing everything again. Each
+worker then runs the lifespan on its own: own DB pool, LLM client and background tasks,
+warmed up by app/warmup.py before it serves.
+
+Signals to the master:
+    HUP        — rolling restart: new workers are started, old ones finish in-flight requests
+                 (up to WEB_GRACEFUL_TIMEOUT). With preload the code is not re-imported: to deploy
+                 new code send USR2 (new master + workers) and then TERM to the old master,
+                 or restart the container
+    TTIN/TTOU  — one worker more / less
+    TERM       — graceful stop
+Workers are also recycled after WEB_MAX_REQUESTS requests (jittered), which caps slow leaks.
+"""
+import gc
+import importlib
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Heavy modules the app imports lazily; loaded once in the master with preload
+PRELOAD_MODULES = ("openai", "argon2", "numpy", "msgpack")
+
+wsgi_app = "app.main:app"
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = settings.web_bind
+workers = settings.web_workers
+preload_app = settings.web_preload
+max_requests = settings.web_max_requests
+max_requests_jitter = settings.web_max_requests_jitter
+graceful_timeout = settings.web_graceful_timeout
+timeout = settings.web_timeout
+keepalive = 5
+accesslog = "-"
+
+
+def on_starting(server):
+    if server.cfg.workers > 1 and settings.session_store != "database":
+        raise RuntimeError(
+            "WEB_WORKERS > 1 needs SESSION_STORE=database: a session's requests may land on any worker"
+        )
+    if server.cfg.workers > 1 and settings.idempotency_store != "database":
+        raise RuntimeError(
+            "WEB_WORKERS > 1 needs IDEMPOTENCY_STORE=database: a retry landing on another worker would run again"
+        )
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        for name in PRELOAD_MODULES:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+        # Objects of the master stay out of the collector, so workers don't dirty shared pages
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    # Connections must not be shared with the master (the master shouldn't have any; be safe)
+    from app.database import engine
+
+    engine.sync_engine.dispose(close=False)
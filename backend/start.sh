@@ -1,10 +1,16 @@
 #!/bin/sh
-# Entrypoint for backend container: runs DB migrations, then starts FastAPI (uvicorn).
+# Entrypoint for backend container: runs DB migrations, then starts FastAPI
+# (uvicorn; gunicorn with uvicorn workers when WEB_WORKERS > 1, see gunicorn.conf.py).
 # Used by backend/Dockerfile CMD — do not remove.
 set -e
 
 echo "Running migrations..."
 alembic upgrade head
 
+if [ "${WEB_WORKERS:-1}" -gt 1 ]; then
+    echo "Starting FastAPI server (gunicorn, $WEB_WORKERS workers)..."
+    exec gunicorn -c gunicorn.conf.py
+fi
+
 echo "Starting FastAPI server..."
 exec uvicorn app.main:app --host 0.0.0.0 --port 8000
@@ -5,26 +5,57 @@ Usage:
    сначала загрузить tasks.xlsx в корень сервера, потом выполнить этим команды
    cd ~/AI-for-mock-interview/backend
    python -m task_migrator.import_tasks ~/tasks.xlsx
+   python -m task_migrator.import_tasks ~/catalogs/ 'partners/*.xlsx' extra.csv --workers 8
+   python -m task_migrator.import_tasks ~/catalogs/ --dry-run     # validate only, no DB
+   python -m task_migrator.import_tasks ~/catalogs/ --sync        # update changed, retire removed
+   python -m task_migrator.import_tasks ~/catalogs/ --sync --dry-run   # print the diff, write nothing
 
 First row = headers. Map your column names to DB fields below (COLUMN_MAPPING).
 
+The file is streamed: read → normalize → validate → batched multi-row INSERT with a
+commit per batch, so memory stays flat for 100k+ row catalogs. Several files (paths, globs
+or directories) are parsed and normalized in a process pool; their rows are merged into
+one batched writer, and invalid rows are collected into a per-file error report.
+
+--sync treats the files as the full catalog: tasks are matched by content_hash, rows whose
+other fields changed (payload_hash) get batched UPDATEs, tasks missing from the files are
+soft-deleted (retired_at), and a diff summary is printed. Duplicates are detected
+by tasks.content_hash (question with case/whitespace normalized) via
+INSERT ... ON CONFLICT (content_hash) DO NOTHING: re-runs and concurrent imports are safe.
+Paraphrased questions are not exact duplicates: newly inserted tasks (by a plain import or
+--sync) are MinHash-signed and near-duplicate clusters are printed at the end
+(near_duplicates.py, --no-near-dups to skip).
+
 Excel format → DB:
   employee_level: "Junior", "Middle +" → junior, middle (Senior → senior)
   type: "Product analyst", "Data analyst" → product_analyst, data_analyst
   subtype: "AB tests", "Probability theory", "Statistics", "Python", "SQL", "Algebra & Geometry" → ab_testing, probability, statistics, python, sql, random
 """
+import argparse
 import asyncio
 import csv
+import glob
+import multiprocessing
+import os
+import queue
 import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
+from functools import partial
+from typing import Awaitable, Callable, Iterable, Iterator, Optional
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from sqlalchemy import select
-from openpyxl import load_workbook
+from sqlalchemy import bindparam, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection
 
-from app.database import async_session_maker, init_db
-from app.models.task import Task
+from app.database import async_session_maker, engine, init_db
+from app.models.task import TASK_PAYLOAD_FIELDS, Task, task_content_hash, task_payload_hash
+from task_migrator.near_duplicates import DEFAULT_THRESHOLD, Cluster, NearDuplicateDetector, print_clusters
 
 # Map your sheet column names -> Task model fields.
 # Edit keys to match your CSV/Excel header row; values are DB column names.
@@ -38,6 +69,16 @@ COLUMN_MAPPING = {
     "source": "source",
 }
 
+# Rows per INSERT + commit
+BATCH_SIZE = 5000
+# Error lines kept per file in the report (the rest are only counted)
+MAX_REPORTED_ERRORS = 20
+# Parquet / Arrow IPC: read with pyarrow, normalized and validated column-wise
+COLUMNAR_SUFFIXES = (".parquet", ".arrow", ".feather", ".ipc")
+SUPPORTED_SUFFIXES = (".csv", ".xlsx", ".xls") + COLUMNAR_SUFFIXES
+# Changed tasks listed in the --sync diff summary
+MAX_DIFF_EXAMPLES = 10
+
 REQUIRED = {"task_question", "company_tier", "employee_level", "type", "subtype"}
 OPTIONAL = {"task_answer", "source"}
 
@@ -69,8 +110,7 @@ SUBTYPE_MAP = {
 def _normalize_header(h: str) -> str:
     return (h or "").strip().lower().replace(" ", "_").replace("-", "_")
 
-def _read_csv(path: Path) -> list[dict]:
-    rows = []
+def _read_csv(path: Path) -> Iterator[dict]:
     with open(path, newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         raw_headers = reader.fieldnames or []
@@ -89,17 +129,18 @@ def _read_csv(path: Path) -> list[dict]:
                 if val:
                     rec[db_field] = val
             if rec:
-                rows.append(rec)
-    return rows
+                yield rec
+
+def _read_xlsx(path: Path) -> Iterator[dict]:
+    from openpyxl import load_workbook
 
-def _read_xlsx(path: Path) -> list[dict]:
     wb = load_workbook(path, read_only=True, data_only=True)
     ws = wb.active
     rows_iter = ws.iter_rows(values_only=True)
     header_row = next(rows_iter, None)
     if not header_row:
         wb.close()
-        return []
+        return
     raw_headers = [str(h).strip() if h is not None else "" for h in header_row]
     header_to_field = {}
     for i, raw in enumerate(raw_headers):
@@ -108,27 +149,34 @@ def _read_xlsx(path: Path) -> list[dict]:
             if _normalize_header(map_key) == norm:
                 header_to_field[i] = db_field
                 break
-    rows = []
-    for row in rows_iter:
-        rec = {}
-        for i, db_field in header_to_field.items():
-            if i < len(row):
-                val = row[i]
-                if val is not None and str(val).strip():
-                    rec[db_field] = str(val).strip()
-        if rec:
-            rows.append(rec)
-    wb.close()
-    return rows
+    try:
+        for row in rows_iter:
+            rec = {}
+            for i, db_field in header_to_field.items():
+                if i < len(row):
+                    val = row[i]
+                    if val is not None and str(val).strip():
+                        rec[db_field] = str(val).strip()
+            if rec:
+                yield rec
+    finally:
+        wb.close()
 
 
-def load_rows(path: Path) -> list[dict]:
+def iter_rows(path: Path) -> Iterator[dict]:
+    """Stream raw rows (header-mapped dicts) from a CSV or XLSX file."""
     suf = path.suffix.lower()
     if suf == ".csv":
         return _read_csv(path)
     if suf in (".xlsx", ".xls"):
         return _read_xlsx(path)
-    raise SystemExit(f"Unsupported format: {suf}. Use .csv or .xlsx")
+    if suf in COLUMNAR_SUFFIXES:
+        return _read_columnar_rows(path)
+    raise SystemExit(f"Unsupported format: {suf}. Use .csv, .xlsx, .parquet or .arrow")
+
+
+def load_rows(path: Path) -> list[dict]:
+    return list(iter_rows(path))
 
 
 def _normalize_value_for_map(s: str) -> str:
@@ -136,89 +184,699 @@ def _normalize_value_for_map(s: str) -> str:
     return " ".join(str(s or "").strip().lower().split())
 
 
+def normalize_company_tier(value: str) -> str:
+    """tier1, tier2 (or "Tier 1" → tier1); anything else is left as is."""
+    v = _normalize_value_for_map(value).replace(" ", "_")
+    if v == "tier_1" or v == "tier1":
+        return "tier1"
+    if v == "tier_2" or v == "tier2":
+        return "tier2"
+    return value
+
+
+def normalize_employee_level(value: str) -> str:
+    """"Junior", "Middle +" → junior, middle."""
+    v = _normalize_value_for_map(value).replace("+", " ").strip()
+    return EMPLOYEE_LEVEL_MAP.get(v, v.replace(" ", "_"))
+
+
+def normalize_type(value: str) -> str:
+    """"Product analyst" → product_analyst."""
+    v = _normalize_value_for_map(value)
+    return TYPE_MAP.get(v, v.replace(" ", "_"))
+
+
+def normalize_subtype(value: str) -> str:
+    """"AB tests", "Probability theory", ... → ab_testing, probability, ..."""
+    v = _normalize_value_for_map(value)
+    return SUBTYPE_MAP.get(v, v.replace(" ", "_").replace("&", "and"))
+
+
+# Categorical columns: per-value normalizer (row-wise, and on the dictionary of unique
+# values in the columnar path) and the values accepted after normalization
+CATEGORICAL_NORMALIZERS = {
+    "company_tier": normalize_company_tier,
+    "employee_level": normalize_employee_level,
+    "type": normalize_type,
+    "subtype": normalize_subtype,
+}
+ALLOWED_VALUES = {
+    "company_tier": ("tier1", "tier2"),
+    "employee_level": ("junior", "middle", "senior"),
+    "type": ("product_analyst", "data_analyst"),
+    "subtype": ("statistics", "ab_testing", "probability", "python", "sql", "random", "algebra_and_geometry"),
+}
+
+
 def normalize_row(row: dict) -> None:
     """Normalize values for DB: map Excel format → DB, empty → None."""
     if "task_answer" in row and (row["task_answer"] or "").strip() == "":
         row["task_answer"] = None
     if "source" in row and (row["source"] or "").strip() == "":
         row["source"] = None
-    # company_tier: tier1, tier2 (or "Tier 1" → tier1)
-    if row.get("company_tier"):
-        v = _normalize_value_for_map(row["company_tier"]).replace(" ", "_")
-        if v == "tier_1" or v == "tier1":
-            row["company_tier"] = "tier1"
-        elif v == "tier_2" or v == "tier2":
-            row["company_tier"] = "tier2"
-    # employee_level: "Junior", "Middle +" → junior, middle
-    if row.get("employee_level"):
-        v = _normalize_value_for_map(row["employee_level"]).replace("+", " ").strip()
-        row["employee_level"] = EMPLOYEE_LEVEL_MAP.get(v, v.replace(" ", "_"))
-    # type: "Product analyst" → product_analyst
-    if row.get("type"):
-        v = _normalize_value_for_map(row["type"])
-        row["type"] = TYPE_MAP.get(v, v.replace(" ", "_"))
-    # subtype: "AB tests", "Probability theory", ... → ab_testing, probability, ...
-    if row.get("subtype"):
-        v = _normalize_value_for_map(row["subtype"])
-        row["subtype"] = SUBTYPE_MAP.get(v, v.replace(" ", "_").replace("&", "and"))
+    for db_field, normalize in CATEGORICAL_NORMALIZERS.items():
+        if row.get(db_field):
+            row[db_field] = normalize(row[db_field])
 
 
-def validate_row(row: dict, index: int) -> None:
+def row_error(row: dict) -> Optional[str]:
+    """First validation problem of a normalized row, or None if it is valid."""
     missing = REQUIRED - set(row.keys())
     if missing:
-        raise SystemExit(f"Row {index + 1}: missing required fields: {missing}. Row keys: {list(row.keys())}")
-    tier = row.get("company_tier", "")
-    if tier not in ("tier1", "tier2"):
-        raise SystemExit(f"Row {index + 1}: company_tier must be tier1 or tier2, got: {row.get('company_tier')}")
-    level = row.get("employee_level", "")
-    if level not in ("junior", "middle", "senior"):
-        raise SystemExit(f"Row {index + 1}: employee_level must be junior|middle|senior, got: {row.get('employee_level')}")
-    typ = row.get("type", "")
-    if typ not in ("product_analyst", "data_analyst"):
-        raise SystemExit(f"Row {index + 1}: type must be product_analyst or data_analyst, got: {row.get('type')}")
-    subtype = row.get("subtype", "")
-    allowed_sub = ("statistics", "ab_testing", "probability", "python", "sql", "random", "algebra_and_geometry")
-    if subtype not in allowed_sub:
-        raise SystemExit(f"Row {index + 1}: subtype must be one of {allowed_sub}, got: {row.get('subtype')}")
-
-
-async def import_tasks(file_path: str) -> None:
-    path = Path(file_path).resolve()
-    if not path.is_file():
-        raise SystemExit(f"File not found: {path}")
-
-    rows = load_rows(path)
-    if not rows:
-        raise SystemExit("No data rows found (or headers did not match COLUMN_MAPPING).")
+        return f"missing required fields: {missing}. Row keys: {list(row.keys())}"
+    for db_field, allowed in ALLOWED_VALUES.items():
+        if row.get(db_field, "") not in allowed:
+            return f"{db_field} must be one of {allowed}, got: {row.get(db_field)}"
+    return None
+
+
+def validate_row(row: dict, index: int) -> None:
+    error = row_error(row)
+    if error:
+        raise SystemExit(f"Row {index + 1}: {error}")
+
+
+def prepare_rows(
+    rows: Iterable[dict],
+    on_error: Optional[Callable[[str], None]] = None,
+) -> Iterator[dict]:
+    """Normalize and validate rows one by one.
 
+    Invalid rows are passed to on_error ("Row N: ...") and skipped; without on_error
+    the first invalid row raises SystemExit.
+    """
     for i, row in enumerate(rows):
         row.setdefault("task_answer", None)
         row.setdefault("source", None)
         normalize_row(row)
-        validate_row(row, i)
-
-    await init_db()
-    async with async_session_maker() as session:
-        # Load existing task_question texts to skip duplicates
-        result = await session.execute(select(Task.task_question))
-        existing_questions = {row[0] for row in result.fetchall()}
-
-        added = 0
-        skipped = 0
-        for row in rows:
-            if row["task_question"] in existing_questions:
-                skipped += 1
+        if on_error is None:
+            validate_row(row, i)
+        else:
+            error = row_error(row)
+            if error:
+                on_error(f"Row {i + 1}: {error}")
                 continue
-            session.add(Task(**row))
-            existing_questions.add(row["task_question"])
-            added += 1
-        await session.commit()
+        yield row
+
+
+def batched(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    it = iter(rows)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+async def insert_batch(session, batch: list[dict], detector: Optional[NearDuplicateDetector] = None) -> int:
+    """Insert rows with a new content hash (and sign them for near-dup search); commit. Returns the number inserted."""
+    unique: dict[str, dict] = {}
+    for row in batch:
+        row["content_hash"] = task_content_hash(row["task_question"])
+        unique.setdefault(row["content_hash"], row)
+    # executemany → multi-row INSERT ... VALUES (...), (...) ON CONFLICT DO NOTHING RETURNING
+    stmt = (
+        pg_insert(Task)
+        .on_conflict_do_nothing(index_elements=[Task.content_hash])
+        .returning(Task.task_id, Task.task_question)
+    )
+    result = await session.execute(stmt, list(unique.values()))
+    inserted = result.all()
+    if detector is not None:
+        await detector.add_batch(session, [r[0] for r in inserted], [r[1] for r in inserted])
+    await session.commit()
+    return len(inserted)
+
+
+@dataclass
+class SyncDiff:
+    inserted: int = 0
+    updated: int = 0
+    restored: int = 0
+    unchanged: int = 0
+    retired: int = 0
+    retire_skipped: bool = False
+    changed_fields: dict[str, int] = field(default_factory=dict)
+    examples: list[str] = field(default_factory=list)
+
+
+class CatalogSync:
+    """--sync writer: diff each batch against the DB by content hash, then retire what is missing.
+
+    Runs on one connection, so the temp table of seen keys survives per-batch commits;
+    in dry-run mode nothing is committed and the whole sync is rolled back at the end.
+    With a detector, inserted tasks are signed in the same transaction (as in a plain import)
+    and finish() collects their near-duplicate clusters.
+    """
+
+    def __init__(
+        self,
+        conn: AsyncConnection,
+        dry_run: bool = False,
+        source: Optional[str] = None,
+        detector: Optional[NearDuplicateDetector] = None,
+    ):
+        self.conn = conn
+        self.dry_run = dry_run
+        self.source = source
+        self.detector = detector
+        self.diff = SyncDiff()
+        self.clusters: Optional[list[Cluster]] = None
+
+    async def start(self) -> None:
+        await self.conn.execute(text(
+            "CREATE TEMP TABLE sync_keys (content_hash varchar(64) PRIMARY KEY)"
+        ))
+
+    async def write_batch(self, batch: list[dict]) -> int:
+        """Apply one batch; returns the number of inserted + updated + restored tasks."""
+        rows: dict[str, dict] = {}
+        for row in batch:
+            row["content_hash"] = task_content_hash(row["task_question"])
+            row["payload_hash"] = task_payload_hash(row)
+            rows.setdefault(row["content_hash"], row)
+        await self.conn.execute(
+            text("INSERT INTO sync_keys VALUES (:h) ON CONFLICT DO NOTHING"),
+            [{"h": h} for h in rows],
+        )
+        existing = {
+            r.content_hash: r
+            for r in await self.conn.execute(
+                select(Task.content_hash, Task.payload_hash, Task.retired_at,
+                       *(getattr(Task, f) for f in TASK_PAYLOAD_FIELDS))
+                .where(Task.content_hash.in_(list(rows)))
+            )
+        }
+
+        new, changed = [], []
+        for key, row in rows.items():
+            old = existing.get(key)
+            if old is None:
+                new.append(row)
+            elif old.payload_hash != row["payload_hash"] or old.retired_at is not None:
+                changed.append(row)
+                self._count_change(old, row)
+            else:
+                self.diff.unchanged += 1
+
+        if new:
+            result = await self.conn.execute(
+                pg_insert(Task).on_conflict_do_nothing(index_elements=[Task.content_hash])
+                .returning(Task.task_id, Task.task_question),
+                new,
+            )
+            inserted = result.all()
+            self.diff.inserted += len(inserted)
+            if self.detector is not None:
+                await self.detector.add_batch(self.conn, [r[0] for r in inserted], [r[1] for r in inserted])
+        if changed:
+            # One executemany UPDATE per batch, only for rows that actually differ
+            stmt = (
+                update(Task.__table__)
+                .where(Task.__table__.c.content_hash == bindparam("b_content_hash"))
+                .values({
+                    **{f: bindparam(f"b_{f}") for f in TASK_PAYLOAD_FIELDS},
+                    "payload_hash": bindparam("b_payload_hash"),
+                    "retired_at": None,
+                })
+            )
+            await self.conn.execute(stmt, [
+                {f"b_{k}": row.get(k) for k in (*TASK_PAYLOAD_FIELDS, "content_hash", "payload_hash")}
+                for row in changed
+            ])
+        if not self.dry_run:
+            await self.conn.commit()
+        return len(new) + len(changed)
+
+    def _count_change(self, old, row: dict) -> None:
+        if old.retired_at is not None:
+            self.diff.restored += 1
+        if old.payload_hash == row["payload_hash"]:
+            return
+        self.diff.updated += 1
+        fields = [f for f in TASK_PAYLOAD_FIELDS if (getattr(old, f) or None) != (row.get(f) or None)]
+        for f in fields:
+            self.diff.changed_fields[f] = self.diff.changed_fields.get(f, 0) + 1
+        if len(self.diff.examples) < MAX_DIFF_EXAMPLES:
+            question = " ".join(row["task_question"].split())
+            self.diff.examples.append(f"{question[:70]!r}: {', '.join(fields)}")
+
+    async def finish(self, retire: bool) -> SyncDiff:
+        """Soft-delete active tasks absent from the files (legacy duplicates included)."""
+        if retire:
+            table = Task.__table__
+            stmt = (
+                update(table)
+                .where(
+                    table.c.retired_at.is_(None),
+                    or_(
+                        table.c.content_hash.is_(None),
+                        ~select(text("1")).select_from(text("sync_keys"))
+                        .where(text("sync_keys.content_hash = tasks.content_hash")).exists(),
+                    ),
+                )
+                .values(retired_at=func.now())
+                .returning(table.c.task_id)
+            )
+            if self.source is not None:
+                stmt = stmt.where(table.c.source == self.source)
+            self.diff.retired = len((await self.conn.execute(stmt)).all())
+        else:
+            self.diff.retire_skipped = True
+        if self.detector is not None:
+            # Before the rollback of a dry run; tasks retired above drop out of the clusters
+            self.clusters = await self.detector.clusters(self.conn)
+        if self.dry_run:
+            await self.conn.rollback()
+        else:
+            await self.conn.commit()
+        return self.diff
+
+
+class Progress:
+    """Single-line progress on stderr: rows read, written (inserted or changed), skipped, rate."""
+
+    def __init__(self, label: str, verb: str = "inserted"):
+        self.label = label
+        self.verb = verb
+        self.read = 0
+        self.added = 0
+        self.started = time.perf_counter()
+
+    @property
+    def skipped(self) -> int:
+        return self.read - self.added
+
+    def update(self, read: int, added: int) -> None:
+        self.read += read
+        self.added += added
+        rate = self.read / max(time.perf_counter() - self.started, 1e-9)
+        print(
+            f"\r{self.label}: {self.read} rows, {self.added} {self.verb}, {self.skipped} skipped ({rate:,.0f} rows/s)",
+            end="", file=sys.stderr, flush=True,
+        )
+
+    def done(self) -> None:
+        if self.read:
+            print(file=sys.stderr)
+
+
+@dataclass
+class FileReport:
+    """Parse/validation result of one input file."""
+    path: str
+    rows: int = 0
+    valid: int = 0
+    error_count: int = 0
+    errors: list[str] = field(default_factory=list)
+    fatal: Optional[str] = None  # file could not be read at all
+
+    def add_error(self, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    @property
+    def ok(self) -> bool:
+        return self.fatal is None and self.error_count == 0
+
+
+def expand_paths(specs: Iterable[str]) -> list[Path]:
+    """Files, glob patterns and directories (their .csv/.xlsx files) → unique sorted paths."""
+    found: dict[Path, None] = {}
+    for spec in specs:
+        p = Path(spec).expanduser()
+        if p.is_dir():
+            matches = [c for c in sorted(p.iterdir()) if c.suffix.lower() in SUPPORTED_SUFFIXES]
+        elif glob.has_magic(spec):
+            matches = [Path(m) for m in sorted(glob.glob(str(p), recursive=True))]
+        else:
+            matches = [p]
+        for m in matches:
+            found.setdefault(m.resolve(), None)
+    return list(found)
+
+
+# --- Parquet / Arrow IPC input (vectorized) ---
+
+def iter_record_batches(path: Path, batch_size: int = BATCH_SIZE):
+    """Stream pyarrow RecordBatches of at most batch_size rows from Parquet or Arrow IPC."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if path.suffix.lower() == ".parquet":
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+        return
+    try:
+        reader = pa.ipc.open_file(path)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    except pa.ArrowInvalid:
+        batches = pa.ipc.open_stream(path)  # IPC stream format
+    for rb in batches:
+        for offset in range(0, rb.num_rows, batch_size):
+            yield rb.slice(offset, batch_size)
+
+
+def _columnar_fields(names: list[str]) -> dict[str, str]:
+    """File column name → DB field (same matching as the CSV/XLSX readers)."""
+    header_to_field = {}
+    for raw in names:
+        norm = _normalize_header(raw)
+        for map_key, db_field in COLUMN_MAPPING.items():
+            if _normalize_header(map_key) == norm:
+                header_to_field[raw] = db_field
+                break
+    return header_to_field
+
+
+def _read_columnar_rows(path: Path) -> Iterator[dict]:
+    """Raw header-mapped rows (for load_rows / the row-wise path)."""
+    for rb in iter_record_batches(path):
+        fields = _columnar_fields(rb.schema.names)
+        for rec in rb.select(list(fields)).to_pylist():
+            row = {fields[k]: str(v).strip() for k, v in rec.items() if v is not None and str(v).strip()}
+            if row:
+                yield row
+
+
+def _clean_text(arr):
+    """Cast to string, trim, empty → null (vectorized)."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    arr = pc.utf8_trim_whitespace(pc.cast(arr, pa.string()))
+    return pc.if_else(pc.equal(arr, ""), pa.scalar(None, pa.string()), arr)
+
+
+def _map_categorical(arr, normalize: Callable[[str], str]):
+    """Dictionary-encode, normalize only the unique values, then take() back to rows."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    encoded = pc.dictionary_encode(arr)
+    mapped = pa.array(
+        [None if v is None else normalize(v) for v in encoded.dictionary.to_pylist()],
+        pa.string(),
+    )
+    return pc.take(mapped, encoded.indices)
+
+
+class ColumnErrors:
+    """Aggregated validation errors of one column: count, first row numbers, top bad values."""
+
+    def __init__(self, field_name: str, kind: str):
+        self.field = field_name
+        self.kind = kind  # "empty" or "invalid"
+        self.count = 0
+        self.first_rows: list[int] = []
+        self.values: dict[str, int] = {}
+
+    def add(self, mask, raw, row_offset: int) -> None:
+        import pyarrow.compute as pc
+
+        n = pc.sum(mask).as_py() or 0
+        if not n:
+            return
+        self.count += n
+        if len(self.first_rows) < 5:
+            idx = pc.indices_nonzero(mask).slice(0, 5 - len(self.first_rows)).to_pylist()
+            self.first_rows.extend(row_offset + i + 1 for i in idx)
+        if self.kind == "invalid":
+            for item in pc.value_counts(pc.filter(raw, mask)).to_pylist():
+                key = str(item["values"])
+                if key in self.values or len(self.values) < 1000:
+                    self.values[key] = self.values.get(key, 0) + item["counts"]
+
+    def message(self) -> str:
+        rows = ", ".join(map(str, self.first_rows)) + (", ..." if self.count > len(self.first_rows) else "")
+        text = f"{self.field}: {self.count} rows {self.kind} (rows {rows})"
+        if self.kind == "invalid":
+            top = sorted(self.values.items(), key=lambda kv: -kv[1])[:5]
+            text += f"; must be one of {ALLOWED_VALUES[self.field]}, got: " + ", ".join(
+                f"{v!r} x{n}" for v, n in top
+            )
+        return text
+
+
+def parse_columnar(path: Path, batch_size: int, report: FileReport) -> Iterator[list[dict]]:
+    """Normalize + validate Parquet/Arrow record batches column-wise; yield valid rows per batch.
+
+    Invalid rows are skipped and reported per column (count, first rows, top values)
+    instead of one message per row.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    errors: dict[tuple[str, str], ColumnErrors] = {}
+    offset = 0
+    for rb in iter_record_batches(path, batch_size):
+        fields = _columnar_fields(rb.schema.names)
+        missing = REQUIRED - set(fields.values())
+        if missing:
+            raise SystemExit(f"missing required columns: {sorted(missing)}")
+        columns = {db_field: _clean_text(rb.column(name)) for name, db_field in fields.items()}
+        raw = dict(columns)
+        for db_field, normalize in CATEGORICAL_NORMALIZERS.items():
+            columns[db_field] = _map_categorical(columns[db_field], normalize)
+
+        valid = pa.repeat(pa.scalar(True), rb.num_rows)
+        for db_field in sorted(REQUIRED):
+            empty = pc.is_null(columns[db_field])
+            errors.setdefault((db_field, "empty"), ColumnErrors(db_field, "empty")).add(empty, None, offset)
+            valid = pc.and_(valid, pc.invert(empty))
+        for db_field, allowed in ALLOWED_VALUES.items():
+            col = columns[db_field]
+            bad = pc.and_(pc.is_valid(col), pc.invert(pc.is_in(col, value_set=pa.array(allowed))))
+            errors.setdefault((db_field, "invalid"), ColumnErrors(db_field, "invalid")).add(
+                bad, raw[db_field], offset,
+            )
+            valid = pc.and_(valid, pc.invert(bad))
+
+        for optional in OPTIONAL:
+            columns.setdefault(optional, pa.nulls(rb.num_rows, pa.string()))
+        report.rows += rb.num_rows
+        report.error_count += rb.num_rows - (pc.sum(valid).as_py() or 0)
+        offset += rb.num_rows
+        rows = pa.table(columns).filter(valid).to_pylist()
+        if rows:
+            yield rows
+
+    for col_errors in errors.values():
+        if col_errors.count:
+            report.errors.append(col_errors.message())
+
+
+# Set in each pool worker by _init_worker: rows go to the parent's writer through it
+_rows_queue: Optional[multiprocessing.Queue] = None
+
+
+def _init_worker(rows_queue: multiprocessing.Queue) -> None:
+    global _rows_queue
+    _rows_queue = rows_queue
+
+
+def parse_file(path: str, batch_size: int, ship_rows: bool) -> FileReport:
+    """Pool worker: read + normalize + validate one file, ship valid rows in batches."""
+    report = FileReport(path=path)
+    try:
+        p = Path(path)
+        if not p.is_file():
+            report.fatal = "file not found"
+            return report
+        if p.suffix.lower() in COLUMNAR_SUFFIXES:
+            batches = parse_columnar(p, batch_size, report)
+        else:
+            batches = batched(prepare_rows(_count_rows(iter_rows(p), report), report.add_error), batch_size)
+        for batch in batches:
+            report.valid += len(batch)
+            if ship_rows:
+                _rows_queue.put(("rows", batch))
+        if not report.rows:
+            report.fatal = "no data rows found (or headers did not match COLUMN_MAPPING)"
+    except SystemExit as e:
+        report.fatal = str(e)
+    except Exception as e:
+        report.fatal = f"{type(e).__name__}: {e}"
+    finally:
+        if ship_rows:
+            _rows_queue.put(("done", path))
+    return report
+
+
+def _count_rows(rows: Iterable[dict], report: FileReport) -> Iterator[dict]:
+    for row in rows:
+        report.rows += 1
+        yield row
+
+
+async def _write_rows(
+    rows_queue: multiprocessing.Queue,
+    futures: list[Future],
+    batch_size: int,
+    write_batch: Callable[[list[dict]], Awaitable[int]],
+    progress: Progress,
+) -> None:
+    """Merge row batches from all workers into one batched writer."""
+    loop = asyncio.get_running_loop()
+    pending: list[dict] = []
+    done_files = 0
+    while done_files < len(futures):
+        try:
+            kind, payload = await loop.run_in_executor(None, rows_queue.get, True, 0.5)
+        except queue.Empty:
+            # A worker killed hard never sends "done": stop once every future has failed/finished
+            if all(f.done() for f in futures) and any(f.exception() for f in futures):
+                break
+            continue
+        if kind == "done":
+            done_files += 1
+        else:
+            pending.extend(payload)
+        while len(pending) >= batch_size or (pending and done_files == len(futures)):
+            batch, pending = pending[:batch_size], pending[batch_size:]
+            progress.update(len(batch), await write_batch(batch))
+
+
+@dataclass
+class ImportSummary:
+    files: list[FileReport]
+    read: int = 0
+    added: int = 0
+    seconds: float = 0.0
+    sync: Optional[SyncDiff] = None
+    near_duplicates: Optional[list[Cluster]] = None
+
+    @property
+    def skipped(self) -> int:
+        return self.read - self.added
+
+    @property
+    def ok(self) -> bool:
+        return all(r.ok for r in self.files)
+
+
+async def import_tasks(
+    paths: Iterable[str],
+    batch_size: int = BATCH_SIZE,
+    workers: Optional[int] = None,
+    dry_run: bool = False,
+    sync: bool = False,
+    sync_source: Optional[str] = None,
+    near_dup_threshold: Optional[float] = DEFAULT_THRESHOLD,
+) -> ImportSummary:
+    files = expand_paths(paths)
+    if not files:
+        raise SystemExit("No input files found.")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files)))
+    started = time.perf_counter()
+
+    # A sync dry run still diffs against the DB (and rolls back); a plain dry run never connects
+    ship_rows = sync or not dry_run
+    rows_queue = multiprocessing.Queue(maxsize=workers * 4)
+    label = files[0].name if len(files) == 1 else f"{len(files)} files"
+    progress = Progress(label, verb="changed" if sync else "inserted")
+    diff: Optional[SyncDiff] = None
+    clusters: Optional[list[Cluster]] = None
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(rows_queue,)) as pool:
+        # Workers are forked before the parent opens any DB connection
+        futures = [pool.submit(parse_file, str(f), batch_size, ship_rows) for f in files]
+        try:
+            if sync:
+                await init_db()
+                async with engine.connect() as conn:
+                    detector = NearDuplicateDetector(near_dup_threshold) if near_dup_threshold is not None else None
+                    syncer = CatalogSync(conn, dry_run=dry_run, source=sync_source, detector=detector)
+                    await syncer.start()
+                    await _write_rows(rows_queue, futures, batch_size, syncer.write_batch, progress)
+                    reports = await _collect_reports(files, futures)
+                    # A row that failed validation must not be retired as "removed"
+                    diff = await syncer.finish(retire=all(r.ok for r in reports))
+                    clusters = syncer.clusters
+            elif not dry_run:
+                await init_db()
+                # New rows are signed in the same transaction as their INSERT
+                detector = NearDuplicateDetector(near_dup_threshold) if near_dup_threshold is not None else None
+                async with async_session_maker() as session:
+                    write = partial(insert_batch, session, detector=detector)
+                    await _write_rows(rows_queue, futures, batch_size, write, progress)
+                    if detector is not None:
+                        clusters = await detector.clusters(session)
+                reports = await _collect_reports(files, futures)
+            else:
+                reports = await _collect_reports(files, futures)
+        finally:
+            progress.done()
+
+    return ImportSummary(
+        files=reports,
+        read=progress.read,
+        added=progress.added,
+        seconds=time.perf_counter() - started,
+        sync=diff,
+        near_duplicates=clusters,
+    )
+
+
+async def _collect_reports(files: list[Path], futures: list[Future]) -> list[FileReport]:
+    reports = []
+    for f, future in zip(files, futures):
+        try:
+            reports.append(await asyncio.wrap_future(future))
+        except Exception as e:
+            reports.append(FileReport(path=str(f), fatal=f"worker failed: {type(e).__name__}: {e}"))
+    return reports
+
+
+def print_report(summary: ImportSummary, dry_run: bool) -> None:
+    for r in summary.files:
+        status = f"ERROR: {r.fatal}" if r.fatal else f"{r.rows} rows, {r.valid} valid, {r.error_count} errors"
+        print(f"{Path(r.path).name}: {status}")
+        for message in r.errors:
+            print(f"    {message}")
+        if r.error_count > len(r.errors):
+            print(f"    ... and {r.error_count - len(r.errors)} more")
+    rows = sum(r.rows for r in summary.files)
+    valid = sum(r.valid for r in summary.files)
+    errors = sum(r.error_count for r in summary.files)
+    line = f"Total: {len(summary.files)} files, {rows} rows, {valid} valid, {errors} errors"
+    if summary.sync is not None:
+        line += " (dry run, rolled back)" if dry_run else ""
+    elif dry_run:
+        line += " (dry run, nothing written)"
+    else:
+        line += f"; imported {summary.added} tasks, skipped {summary.skipped} duplicates"
+    print(f"{line} in {summary.seconds:.1f} s")
+
+    if summary.near_duplicates:
+        print_clusters(summary.near_duplicates)
 
-    print(f"Imported {added} tasks from {path.name}." + (f" Skipped {skipped} duplicates." if skipped else ""))
+    diff = summary.sync
+    if diff is None:
+        return
+    retired = "skipped (input had errors)" if diff.retire_skipped else str(diff.retired)
+    print(f"Sync: {diff.inserted} new, {diff.updated} updated, {diff.restored} restored, "
+          f"{diff.unchanged} unchanged, retired {retired}")
+    if diff.changed_fields:
+        print("  changed fields: " + ", ".join(f"{f} {n}" for f, n in diff.changed_fields.items()))
+    for example in diff.examples:
+        print(f"    {example}")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python -m task_migrator.import_tasks <path/to/tasks.csv or tasks.xlsx>")
-        sys.exit(1)
-    asyncio.run(import_tasks(sys.argv[1]))
+    parser = argparse.ArgumentParser(description="Import tasks from CSV/XLSX files into the tasks table")
+    parser.add_argument("paths", nargs="+", help="Files, glob patterns or directories")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Parse and validate only (with --sync: compute the diff and roll back)")
+    parser.add_argument("--sync", action="store_true",
+                        help="Files are the full catalog: update changed tasks, retire tasks not in the files")
+    parser.add_argument("--sync-source", default=None,
+                        help="With --sync, only retire tasks whose source equals this value")
+    parser.add_argument("--near-dup-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Report new tasks whose estimated shingle similarity to another task is at least this")
+    parser.add_argument("--no-near-dups", action="store_true", help="Skip near-duplicate detection")
+    args = parser.parse_args()
+    summary = asyncio.run(import_tasks(
+        args.paths, args.batch_size, args.workers, args.dry_run, args.sync, args.sync_source,
+        None if args.no_near_dups else args.near_dup_threshold,
+    ))
+    print_report(summary, args.dry_run)
+    sys.exit(0 if summary.ok else 1)
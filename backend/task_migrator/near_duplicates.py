@@ -0,0 +1,366 @@
+"""
+Near-duplicate task questions: character shingles → MinHash signatures → LSH banding.
+
+Paraphrases like "Что такое p-value?" / "Объясните, что такое p-value" pass the exact
+content-hash dedup. Each question gets a NUM_PERM MinHash signature (computed for a whole
+batch at once with numpy, stored in task_minhash) and BANDS bucket hashes (postings in
+task_minhash_buckets); two tasks are candidates when they share a bucket, and a candidate
+pair is kept when the estimated Jaccard similarity (share of equal signature slots) ≥ threshold.
+Buckets with more than MAX_BUCKET_SIZE tasks (templated questions) are not expanded.
+
+import_tasks indexes newly inserted rows per batch, so an incremental import compares only
+the new rows against the catalog. Standalone (from backend/):
+    python -m task_migrator.near_duplicates                  # sign missing tasks, report clusters
+    python -m task_migrator.near_duplicates --threshold 0.6 --json clusters.json
+"""
+import argparse
+import asyncio
+import hashlib
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import orjson
+from sqlalchemy import text
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS  # LSH threshold ≈ (1 / BANDS) ** (1 / ROWS_PER_BAND) ≈ 0.5
+SHINGLE = 5
+DEFAULT_THRESHOLD = 0.5
+# Texts hashed per numpy pass (bounds the NUM_PERM x shingles matrix)
+SIGNATURE_CHUNK = 512
+# Buckets this large are boilerplate (templated questions); not expanded into pairs
+MAX_BUCKET_SIZE = 50
+
+_U32 = np.uint64(0xFFFFFFFF)
+
+
+def _perm_params() -> tuple[np.ndarray, np.ndarray]:
+    """Multiply-shift hash parameters derived from sha256: identical on every run and numpy version."""
+    a, b = [], []
+    for i in range(NUM_PERM):
+        digest = hashlib.sha256(f"minhash-{i}".encode()).digest()
+        a.append(int.from_bytes(digest[:8], "little") | 1)
+        b.append(int.from_bytes(digest[8:16], "little"))
+    return np.array(a, dtype=np.uint64), np.array(b, dtype=np.uint64)
+
+
+_A, _B = _perm_params()
+_POW = np.array([31 ** (SHINGLE - 1 - k) for k in range(SHINGLE)], dtype=np.uint64)
+_BAND_SALT = np.array(
+    [int.from_bytes(hashlib.sha256(f"band-{i}".encode()).digest()[:8], "little") for i in range(BANDS)],
+    dtype=np.uint64,
+)
+
+
+def normalize_text(question: str) -> str:
+    """Case-folded words joined by single spaces (punctuation dropped)."""
+    return " ".join(re.findall(r"\w+", str(question).casefold()))
+
+
+def _chunk_shingles(questions: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """32-bit hashes of the character SHINGLE-grams of each normalized text, concatenated,
+    and the offset of each text's run. Repeated shingles are kept: they don't change a minimum."""
+    texts = [normalize_text(q).ljust(SHINGLE) for q in questions]
+    codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    lengths = np.array([len(t) for t in texts])
+    ends = np.cumsum(lengths)
+    n = len(codes) - SHINGLE + 1
+    h = sum(codes[k:k + n] * _POW[k] for k in range(SHINGLE))
+    # Drop the windows that straddle two texts
+    valid = np.ones(n, dtype=bool)
+    valid[(ends[:-1, None] - np.arange(1, SHINGLE)[None, :]).ravel()] = False
+    counts = lengths - SHINGLE + 1
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    h = h[valid]
+    return (h ^ (h >> np.uint64(32))) & _U32, offsets
+
+
+def signatures(questions: list[str]) -> np.ndarray:
+    """MinHash signatures, shape (len(questions), NUM_PERM), uint32."""
+    out = np.empty((len(questions), NUM_PERM), dtype=np.uint32)
+    for start in range(0, len(questions), SIGNATURE_CHUNK):
+        x, offsets = _chunk_shingles(questions[start:start + SIGNATURE_CHUNK])
+        # All permutations x all shingles of the chunk, then the min per question segment
+        hashed = ((_A[:, None] * x[None, :] + _B[:, None]) >> np.uint64(32)).astype(np.uint32)
+        out[start:start + len(offsets)] = np.minimum.reduceat(hashed, offsets, axis=1).T
+    return out
+
+
+def band_buckets(sigs: np.ndarray) -> np.ndarray:
+    """One signed 64-bit bucket per band (band index mixed in), shape (n, BANDS)."""
+    bands = sigs.reshape(len(sigs), BANDS, ROWS_PER_BAND).astype(np.uint64)
+    h = np.broadcast_to(_BAND_SALT, (len(sigs), BANDS)).copy()
+    for r in range(ROWS_PER_BAND):
+        h = (h ^ bands[:, :, r]) * np.uint64(0x100000001B3)
+    return h.view(np.int64)
+
+
+def _decode(signature: bytes) -> np.ndarray:
+    return np.frombuffer(signature, dtype="<u4")
+
+
+@dataclass
+class Cluster:
+    task_ids: list[int]
+    questions: dict[int, str] = field(default_factory=dict)
+    pairs: list[tuple[int, int, float]] = field(default_factory=list)  # the links that joined the cluster
+
+
+class SimilarityForest:
+    """Union-find over task ids. Keeps only the pairs that joined two groups, so memory is
+    O(tasks) even when a templated catalog makes almost every pair similar."""
+
+    def __init__(self):
+        self.parent: dict[int, int] = {}
+        self.links: list[tuple[int, int, float]] = []
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def link(self, a: int, b: int, sim: float) -> bool:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        self.parent[ra] = rb
+        self.links.append((min(a, b), max(a, b), round(sim, 3)))
+        return True
+
+    def link_similar(self, ids: list[int], sim: np.ndarray, threshold: float) -> None:
+        """Link ids[x] and ids[y] for sim[x, y] ≥ threshold (y > x), stopping once the ids form one group."""
+        groups = len({self.find(t) for t in ids})
+        if groups == 1:
+            return
+        for x, y in zip(*np.nonzero(np.triu(sim >= threshold, k=1))):
+            if self.link(ids[x], ids[y], float(sim[x, y])):
+                groups -= 1
+                if groups == 1:
+                    return
+
+    def clusters(self) -> list[Cluster]:
+        """Connected components, largest first."""
+        groups: dict[int, Cluster] = {}
+        for x in self.parent:
+            groups.setdefault(self.find(x), Cluster(task_ids=[])).task_ids.append(x)
+        for a, b, sim in self.links:
+            groups[self.find(a)].pairs.append((a, b, sim))
+        clusters = list(groups.values())
+        for c in clusters:
+            c.task_ids.sort()
+        return sorted(clusters, key=lambda c: (-len(c.task_ids), c.task_ids[0]))
+
+
+async def _store(conn, task_ids: list[int], sigs: np.ndarray, buckets: np.ndarray) -> None:
+    """Insert signatures and band postings of tasks not signed yet; one round trip each (unnest
+    of arrays). No ON CONFLICT (it doubles the cost of the postings insert): purge_orphans
+    removes the postings of tasks without a signature before they could be re-signed."""
+    await conn.execute(
+        text(
+            "INSERT INTO task_minhash (task_id, signature) "
+            "SELECT * FROM unnest(CAST(:ids AS integer[]), CAST(:sigs AS bytea[]))"
+        ),
+        {"ids": task_ids, "sigs": [sig.astype("<u4").tobytes() for sig in sigs]},
+    )
+    await conn.execute(
+        text(
+            "INSERT INTO task_minhash_buckets (bucket, task_id) "
+            "SELECT * FROM unnest(CAST(:buckets AS bigint[]), CAST(:ids AS integer[]))"
+        ),
+        {"buckets": buckets.ravel().tolist(), "ids": np.repeat(task_ids, BANDS).tolist()},
+    )
+
+
+class NearDuplicateDetector:
+    """Signs new tasks batch by batch and collects similar pairs (new vs. catalog and new vs. new)."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.forest = SimilarityForest()
+        self.signed = 0
+
+    async def add_batch(self, conn, task_ids: list[int], questions: list[str]) -> None:
+        """Record near duplicates of the given (just inserted) tasks, then store their signatures."""
+        if not task_ids:
+            return
+        sigs = signatures(questions)
+        buckets = band_buckets(sigs)
+
+        # Distinct buckets of the batch and the rows in each (sorted runs, no per-row Python loop)
+        flat = buckets.ravel()
+        order = np.argsort(flat, kind="stable")
+        distinct, first, counts = np.unique(flat[order], return_index=True, return_counts=True)
+        row_of = order // BANDS
+        # At most MAX_BUCKET_SIZE + 1 postings per bucket: an index range scan that stops early,
+        # so templated catalogs (every row in the same buckets) stay linear
+        result = await conn.execute(
+            text(
+                "SELECT b.n, p.task_id FROM unnest(CAST(:buckets AS bigint[])) WITH ORDINALITY AS b(bucket, n) "
+                "CROSS JOIN LATERAL (SELECT task_id FROM task_minhash_buckets t "
+                "WHERE t.bucket = b.bucket LIMIT :cap) p"
+            ),
+            {"buckets": distinct.tolist(), "cap": MAX_BUCKET_SIZE + 1},
+        )
+        old_members: dict[int, list[int]] = {}
+        for n, task_id in result.all():  # .all(): iterating the result row by row is quadratic in asyncpg's adapter
+            old_members.setdefault(n - 1, []).append(task_id)
+
+        groups = []  # (new row indices, existing task ids) per expandable bucket
+        for k in sorted(set(np.flatnonzero(counts > 1).tolist()) | set(old_members)):
+            old = old_members.get(k, [])
+            if counts[k] + len(old) <= MAX_BUCKET_SIZE:
+                groups.append((row_of[first[k]:first[k] + counts[k]], old))
+        old_ids = sorted({t for _, old in groups for t in old})
+        known = {}
+        if old_ids:
+            result = await conn.execute(
+                text("SELECT task_id, signature FROM task_minhash WHERE task_id = ANY(:ids)"), {"ids": old_ids},
+            )
+            known = {tid: _decode(sig) for tid, sig in result.all()}
+        for rows, old in groups:
+            ids = [task_ids[i] for i in rows.tolist()] + [t for t in old if t in known]
+            if len({self.forest.find(t) for t in ids}) == 1:
+                continue  # already one cluster: skip the comparison
+            members = np.vstack([sigs[rows]] + [known[t] for t in old if t in known])
+            # New vs. all members; pairs of existing tasks were checked when they were added
+            sim = (members[:len(rows), None, :] == members[None, :, :]).mean(axis=2)
+            self.forest.link_similar(ids, sim, self.threshold)
+
+        await _store(conn, task_ids, sigs, buckets)
+        self.signed += len(task_ids)
+
+    async def clusters(self, conn) -> list[Cluster]:
+        return await _with_questions(conn, self.forest.clusters())
+
+
+async def _with_questions(conn, clusters: list[Cluster]) -> list[Cluster]:
+    """Attach question texts; drop retired tasks (and clusters left with one task)."""
+    ids = sorted({tid for c in clusters for tid in c.task_ids})
+    if not ids:
+        return []
+    result = await conn.execute(
+        text("SELECT task_id, task_question FROM tasks WHERE task_id = ANY(:ids) AND retired_at IS NULL"),
+        {"ids": ids},
+    )
+    questions = dict(result.all())
+    kept = []
+    for c in clusters:
+        c.task_ids = [t for t in c.task_ids if t in questions]
+        c.pairs = [p for p in c.pairs if p[0] in questions and p[1] in questions]
+        if len(c.task_ids) > 1:
+            c.questions = {t: questions[t] for t in c.task_ids}
+            kept.append(c)
+    return kept
+
+
+async def sign_missing(conn, batch_size: int = 5000) -> int:
+    """Compute signatures for tasks that have none (keyset-paginated; run purge_orphans first). Returns the count."""
+    signed, last_id = 0, 0
+    while True:
+        rows = (await conn.execute(
+            text(
+                "SELECT t.task_id, t.task_question FROM tasks t "
+                "LEFT JOIN task_minhash m ON m.task_id = t.task_id "
+                "WHERE m.task_id IS NULL AND t.task_id > :last ORDER BY t.task_id LIMIT :n"
+            ),
+            {"last": last_id, "n": batch_size},
+        )).all()
+        if not rows:
+            return signed
+        sigs = signatures([q for _, q in rows])
+        await _store(conn, [tid for tid, _ in rows], sigs, band_buckets(sigs))
+        await conn.commit()
+        signed += len(rows)
+        last_id = rows[-1][0]
+
+
+async def catalog_forest(conn, threshold: float) -> SimilarityForest:
+    """Similar pairs over the whole signed catalog, streamed bucket by bucket."""
+    forest = SimilarityForest()
+    result = await conn.stream(
+        text(
+            "SELECT array_agg(b.task_id), array_agg(m.signature) FROM task_minhash_buckets b "
+            "JOIN task_minhash m ON m.task_id = b.task_id "
+            "GROUP BY b.bucket HAVING count(*) BETWEEN 2 AND :cap"
+        ),
+        {"cap": MAX_BUCKET_SIZE},
+    )
+    async for ids, sigs in result:
+        if len({forest.find(t) for t in ids}) == 1:
+            continue
+        members = np.vstack([_decode(sig) for sig in sigs])
+        forest.link_similar(ids, (members[:, None, :] == members[None, :, :]).mean(axis=2), threshold)
+    return forest
+
+
+async def purge_orphans(conn) -> int:
+    """Delete bucket postings of tasks that no longer exist (the postings table has no FK)."""
+    result = await conn.execute(text(
+        "DELETE FROM task_minhash_buckets b "
+        "WHERE NOT EXISTS (SELECT 1 FROM task_minhash m WHERE m.task_id = b.task_id)"
+    ))
+    await conn.commit()
+    return result.rowcount
+
+
+def print_clusters(clusters: list[Cluster], limit: Optional[int] = 20) -> None:
+    total = sum(len(c.task_ids) for c in clusters)
+    print(f"Near-duplicate clusters: {len(clusters)} ({total} tasks)")
+    for n, c in enumerate(clusters[:limit], 1):
+        best = max(sim for _, _, sim in c.pairs) if c.pairs else 0.0
+        print(f"  cluster {n}: {len(c.task_ids)} tasks, max similarity {best:.2f}")
+        for tid in c.task_ids:
+            question = " ".join(c.questions.get(tid, "").split())
+            print(f"    #{tid} {question[:100]}")
+    if limit is not None and len(clusters) > limit:
+        print(f"  ... and {len(clusters) - limit} more (use --json for the full list)")
+
+
+def write_clusters_json(clusters: Iterable[Cluster], path: str) -> None:
+    payload = [
+        {
+            "task_ids": c.task_ids,
+            "questions": {str(k): v for k, v in c.questions.items()},
+            "pairs": [{"a": a, "b": b, "similarity": s} for a, b, s in c.pairs],
+        }
+        for c in clusters
+    ]
+    Path(path).write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+
+
+async def main(threshold: float, json_path: Optional[str]) -> None:
+    from app.database import engine, init_db
+
+    await init_db()
+    async with engine.connect() as conn:
+        purged = await purge_orphans(conn)
+        if purged:
+            print(f"Purged {purged} bucket postings of deleted tasks")
+        signed = await sign_missing(conn)
+        if signed:
+            print(f"Signed {signed} tasks without a signature")
+        clusters = await _with_questions(conn, (await catalog_forest(conn, threshold)).clusters())
+    await engine.dispose()
+    print_clusters(clusters)
+    if json_path:
+        write_clusters_json(clusters, json_path)
+        print(f"Clusters written to {json_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find near-duplicate task questions (MinHash/LSH)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Minimum estimated Jaccard similarity of 5-char shingles")
+    parser.add_argument("--json", default=None, help="Write all clusters to this JSON file")
+    args = parser.parse_args()
+    asyncio.run(main(args.threshold, args.json))
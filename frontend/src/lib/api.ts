@@ -92,6 +92,15 @@ export const authApi = {
 
 // Interview API
 export const interviewApi = {
+  // All four catalog sections in one request (ETag-cached on the backend)
+  getCatalog: () =>
+    apiRequest<{
+      specializations: { id: string; name: string }[]
+      levels: { id: string; name: string }[]
+      tiers: { id: string; name: string; description: string }[]
+      topics: { id: string; name: string }[]
+    }>('/interview/catalog'),
+
   getSpecializations: () =>
     apiRequest<{ specializations: { id: string; name: string }[] }>('/interview/specializations'),
   